@@ -9,6 +9,8 @@ import tempfile
 import os
 import logging
 import hashlib
+import importlib
+import inspect
 import random
 import json
 import types
@@ -191,6 +193,27 @@ ANDROID_LOGO_PROPERTY_MAPPING = {
 LATEST_APK_VALUE = 'latest'
 LATEST_APP_VALUE = 0
 
+# Bump this when the way forms are compiled changes outside of
+# FORM_BUILD_MODULES, so that builds stop reusing compiled forms from builds
+# made before the change
+FORM_BUILD_HASH_VERSION = 1
+# Modules with the code that compiles forms. Changing any of them also stops
+# builds from reusing compiled forms from earlier builds.
+FORM_BUILD_MODULES = (
+    'corehq.apps.app_manager.models',
+    'corehq.apps.app_manager.xform',
+    'corehq.apps.app_manager.xpath',
+    'corehq.apps.app_manager.util',
+    'corehq.apps.app_manager.suite_xml.post_process.instances',
+)
+# Application fields that differ between builds but don't affect compiled forms
+FORM_BUILD_HASH_EXCLUDED_FIELDS = (
+    '_id', '_rev', '_attachments', 'external_blobs', 'version', 'copy_of',
+    'date_created', 'built_on', 'built_with', 'build_comment', 'comment_from',
+    'is_released', 'last_modified', 'multimedia_map', 'form_build_hashes',
+    'short_url', 'short_odk_url', 'short_odk_media_url',
+)
+
 
 def jsonpath_update(datum_context, value):
     field = datum_context.path.fields[0]
@@ -228,6 +251,15 @@ def _rename_key(dct, old, new):
         del dct[old]
 
 
+@memoized
+def get_form_build_code_hash():
+    code_hash = hashlib.sha1()
+    for module_name in FORM_BUILD_MODULES:
+        with open(inspect.getsourcefile(importlib.import_module(module_name)), 'rb') as f:
+            code_hash.update(f.read())
+    return code_hash.hexdigest()
+
+
 @memoized
 def load_case_reserved_words():
     with open(
@@ -5103,9 +5135,9 @@ class ApplicationBase(VersionedDoc, SnapshotMixin,
             settings['Build-Number'] = self.version
         return settings
 
-    def create_build_files(self, save=False, build_profile_id=None):
+    def create_build_files(self, save=False, build_profile_id=None, previous_version=None):
         built_on = datetime.datetime.utcnow()
-        all_files = self.create_all_files(build_profile_id)
+        all_files = self.create_all_files(build_profile_id, previous_version=previous_version)
         if save:
             self.date_created = built_on
             self.built_on = built_on
@@ -5288,7 +5320,7 @@ class ApplicationBase(VersionedDoc, SnapshotMixin,
             force_new_forms = True
         copy.set_form_versions(previous_version, force_new_forms)
         copy.set_media_versions(previous_version)
-        copy.create_build_files(save=True)
+        copy.create_build_files(save=True, previous_version=previous_version)
 
         # since this hard to put in a test
         # I'm putting this assert here if copy._id is ever None
@@ -5453,6 +5485,8 @@ class Application(ApplicationBase, TranslationMixin, HQMediaMixin):
                                      choices=['none', 'all', 'some'])
     add_ons = DictProperty()
     smart_lang_display = BooleanProperty()  # null means none set so don't default to false/true
+    # builds only: form file name -> hash of everything the compiled form was generated from
+    form_build_hashes = DictProperty()
 
     def has_modules(self):
         return len(self.modules) > 0 and not self.is_remote_app()
@@ -5547,6 +5581,56 @@ class Application(ApplicationBase, TranslationMixin, HQMediaMixin):
             form = self.get_module(module_id).get_form(form_id)
         return form.validate_form().render_xform(build_profile_id).encode('utf-8')
 
+    def get_form_build_hash_base(self):
+        """
+        Hash of the parts of the app and domain that every compiled form may
+        depend on, leaving out fields that change with every build, and of
+        the code that compiles forms
+        """
+        source = deepcopy(self.to_json())
+        for field in FORM_BUILD_HASH_EXCLUDED_FIELDS:
+            source.pop(field, None)
+        for module in source.get('modules', []):
+            for form in module.get('forms', []):
+                # each form's own version is added in get_form_build_hash
+                form.pop('version', None)
+        content = json.dumps([
+            FORM_BUILD_HASH_VERSION,
+            get_form_build_code_hash(),
+            self._get_form_build_domain_inputs(),
+            source,
+        ], sort_keys=True)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def _get_form_build_domain_inputs(self):
+        """The domain settings that ``XForm.add_missing_instances`` reads"""
+        from corehq.apps.app_manager.suite_xml.features.mobile_ucr import get_uuids_by_instance_id
+        from corehq.apps.locations.models import LocationFixtureConfiguration
+        mobile_ucr = toggles.MOBILE_UCR.enabled(self.domain)
+        return [
+            mobile_ucr,
+            toggles.CUSTOM_CALENDAR_FIXTURE.enabled(self.domain),
+            toggles.HIERARCHICAL_LOCATION_FIXTURE.enabled(self.domain),
+            LocationFixtureConfiguration.for_domain(self.domain).sync_flat_fixture,
+            sorted(get_uuids_by_instance_id(self.domain).items()) if mobile_ucr else None,
+        ]
+
+    def get_form_build_hash(self, form, base_hash, build_profile_id=None):
+        """
+        Hash of everything the compiled xml of ``form`` is generated from.
+        Forms with the same hash in two builds compile to the same xml.
+        """
+        content = json.dumps([base_hash, build_profile_id, form.unique_id, form.get_version(), form.source])
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def _get_previous_form_xml(self, previous_version, filename, form_hash):
+        if previous_version and previous_version.form_build_hashes.get(filename) == form_hash:
+            try:
+                return previous_version.fetch_attachment('files/%s' % filename)
+            except ResourceNotFound:
+                pass
+        return None
+
     def set_form_versions(self, previous_version, force_new_version=False):
         """
         Set the 'version' property on each form as follows to the current app version if the form is new
@@ -5556,8 +5640,10 @@ class Application(ApplicationBase, TranslationMixin, HQMediaMixin):
             return hashlib.md5(val).hexdigest()
 
         if previous_version:
+            base_hash = None if force_new_version else self.get_form_build_hash_base()
             for form_stuff in self.get_forms(bare=False):
-                filename = 'files/%s' % self.get_form_filename(**form_stuff)
+                form_filename = self.get_form_filename(**form_stuff)
+                filename = 'files/%s' % form_filename
                 form = form_stuff["form"]
                 if not force_new_version:
                     form_version = None
@@ -5575,8 +5661,11 @@ class Application(ApplicationBase, TranslationMixin, HQMediaMixin):
                         # so that that's not treated as the diff
                         previous_form_version = previous_form.get_version()
                         form.version = previous_form_version
-                        my_hash = _hash(self.fetch_xform(form=form))
-                        if previous_hash == my_hash:
+                        form_hash = self.get_form_build_hash(form, base_hash)
+                        if previous_version.form_build_hashes.get(form_filename) == form_hash:
+                            # compiled from the same inputs, no need to compile it again
+                            form_version = previous_form_version
+                        elif previous_hash == _hash(self.fetch_xform(form=form)):
                             form_version = previous_form_version
 
                     form.version = form_version
@@ -5811,7 +5900,12 @@ class Application(ApplicationBase, TranslationMixin, HQMediaMixin):
     def get_form_filename(cls, type=None, form=None, module=None):
         return 'modules-%s/forms-%s.xml' % (module.id, form.id)
 
-    def create_all_files(self, build_profile_id=None):
+    def create_all_files(self, build_profile_id=None, previous_version=None):
+        """
+        :param previous_version: An earlier build of this app. Compiled forms are
+        taken from it instead of being compiled again when nothing they are
+        generated from has changed.
+        """
         prefix = '' if not build_profile_id else build_profile_id + '/'
         files = {
             '{}profile.xml'.format(prefix): self.create_profile(is_odk=False, build_profile_id=build_profile_id),
@@ -5857,6 +5951,8 @@ class Application(ApplicationBase, TranslationMixin, HQMediaMixin):
         for lang in ['default'] + langs_for_build:
             files["{prefix}{lang}/app_strings.txt".format(
                 prefix=prefix, lang=lang)] = self.create_app_strings(lang, build_profile_id)
+        # only builds record hashes, and only builds are reused
+        base_hash = self.get_form_build_hash_base() if self.copy_of or previous_version else None
         for form_stuff in self.get_forms(bare=False):
             def exclude_form(form):
                 return isinstance(form, ShadowForm) or form.is_a_disabled_release_form()
@@ -5864,6 +5960,14 @@ class Application(ApplicationBase, TranslationMixin, HQMediaMixin):
             if not exclude_form(form_stuff['form']):
                 filename = prefix + self.get_form_filename(**form_stuff)
                 form = form_stuff['form']
+                if base_hash:
+                    form_hash = self.get_form_build_hash(form, base_hash, build_profile_id)
+                    if self.copy_of:
+                        self.form_build_hashes[filename] = form_hash
+                    previous_xml = self._get_previous_form_xml(previous_version, filename, form_hash)
+                    if previous_xml is not None:
+                        files[filename] = previous_xml
+                        continue
                 try:
                     files[filename] = self.fetch_xform(form=form, build_profile_id=build_profile_id)
                 except XFormValidationFailed:
@@ -6369,7 +6473,7 @@ class RemoteApp(ApplicationBase):
     def SUITE_XPATH(self):
         return 'suite/resource/location[@authority="local"]'
 
-    def create_all_files(self, build_profile_id=None):
+    def create_all_files(self, build_profile_id=None, previous_version=None):
         langs_for_build = self.get_build_langs()
         files = {
             'profile.xml': self.create_profile(langs=langs_for_build),
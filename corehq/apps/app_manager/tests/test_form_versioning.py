@@ -7,6 +7,7 @@ from corehq.apps.app_manager.suite_xml import xml_models as suite_models
 from corehq.apps.app_manager.models import Application, Module, Form, import_app, FormLink
 from corehq.apps.app_manager.tests.util import add_build, patch_default_builds
 from corehq.apps.builds.models import BuildSpec
+from corehq.util.test_utils import flag_enabled
 
 
 BLANK_TEMPLATE = """<?xml version="1.0" encoding="UTF-8" ?>
@@ -108,6 +109,50 @@ class FormVersioningTest(TestCase):
         self.assertEqual(self.get_form_versions(xxx_build1), [1, 1])
         self.assertEqual(self.get_form_versions(xxx_build2), [2, 1])
 
+    @patch_default_builds
+    @patch('corehq.apps.app_manager.models.validate_xform', return_value=None)
+    def test_unchanged_forms_not_compiled_again(self, mock):
+        add_build(version='2.7.0', build_number=20655)
+        app = Application.new_app('form-versioning-test', 'Foo')
+        app.modules.append(Module(forms=[Form(), Form()]))
+        app.build_spec = BuildSpec.from_string('2.7.0/latest')
+        app.get_module(0).get_form(0).source = BLANK_TEMPLATE.format(xmlns='xmlns-0.0')
+        app.get_module(0).get_form(1).source = BLANK_TEMPLATE.format(xmlns='xmlns-1')
+        app.save()
+        build1 = app.make_build(previous_version=None)
+        build1.save()
+
+        app.get_module(0).get_form(0).source = BLANK_TEMPLATE.format(xmlns='xmlns-0.1')
+        app.save()
+        render_xform = Form.render_xform
+        with patch.object(Form, 'render_xform', autospec=True, side_effect=render_xform) as render:
+            build2 = app.make_build(previous_version=build1)
+            build2.save()
+
+        changed_form_id = app.get_module(0).get_form(0).unique_id
+        self.assertEqual({call[0][0].unique_id for call in render.call_args_list}, {changed_form_id})
+        self.assertEqual(self.get_form_versions(build2), [2, 1])
+        filename = 'files/modules-0/forms-1.xml'
+        self.assertEqual(build2.fetch_attachment(filename), build1.fetch_attachment(filename))
+        self.assertNotEqual(build2.form_build_hashes['modules-0/forms-0.xml'],
+                            build1.form_build_hashes['modules-0/forms-0.xml'])
+
+    @patch_default_builds
+    @patch('corehq.apps.app_manager.models.validate_xform', return_value=None)
+    def test_form_build_hashes(self, mock):
+        add_build(version='2.7.0', build_number=20655)
+        app = Application.new_app('form-versioning-test', 'Foo')
+        app.modules.append(Module(forms=[Form()]))
+        app.build_spec = BuildSpec.from_string('2.7.0/latest')
+        app.get_module(0).get_form(0).source = BLANK_TEMPLATE.format(xmlns='xmlns-0')
+        app.save()
+        app.create_all_files()
+        self.assertEqual(app.form_build_hashes, {})
+
+        base_hash = app.get_form_build_hash_base()
+        with flag_enabled('HIERARCHICAL_LOCATION_FIXTURE'):
+            self.assertNotEqual(app.get_form_build_hash_base(), base_hash)
+
     @staticmethod
     def get_form_versions(build):
         from lxml import etree
@@ -1,6 +1,6 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 
 from celery.schedules import crontab
 from celery.task import task
@@ -20,6 +20,7 @@ from corehq.apps.users.models import CouchUser
 from corehq.apps.export.tasks import add_inferred_export_properties
 from corehq.form_processor.interfaces.dbaccessors import CaseAccessors
 from couchdbkit.exceptions import ResourceNotFound
+from dimagi.utils.chunked import chunked
 from corehq.util.soft_assert import soft_assert
 from corehq.toggles import BULK_UPLOAD_DATE_OPENED
 import uuid
@@ -28,6 +29,7 @@ from soil.progress import set_task_progress
 POOL_SIZE = 10
 PRIME_VIEW_FREQUENCY = 500
 CASEBLOCK_CHUNKSIZE = 100
+LOOKUP_CHUNKSIZE = 1000
 
 RowAndCase = namedtuple('RowAndCase', ['row', 'case'])
 
@@ -73,8 +75,72 @@ def do_import(spreadsheet, config, domain, task=None, chunksize=CASEBLOCK_CHUNKS
     # keep a cache of id lookup successes to help performance
     id_cache = {}
     name_cache = {}
+    # cases looked up in bulk for the rows currently being imported
+    case_lookups = {}  # (search_field, case_type, search_id) -> (case, error)
+    parent_cases = {}  # case_id -> case, or None if there is no such case
     caseblocks = []
     ids_seen = set()
+    written_ids = set()  # search and external ids of the cases written in caseblocks
+
+    def _iter_rows():
+        for rows in chunked(enumerate(spreadsheet.iter_rows()), LOOKUP_CHUNKSIZE):
+            _lookup_rows([row for i, row in rows if i != 0])  # skip header row
+            for i, row in rows:
+                yield i, row
+
+    def _lookup_rows(rows):
+        """Look up the cases, parent cases and owners of ``rows`` in bulk"""
+        search_ids = set()
+        parent_ids = set()
+        parent_external_ids = defaultdict(set)
+        owner_names = set()
+        owner_ids = set()
+        for row in rows:
+            fields = importer_util.populate_updated_fields(config, columns, row)
+            search_ids.add(importer_util.parse_search_id(config, columns, row))
+            parent_ids.add(fields.get('parent_id'))
+            parent_external_ids[fields.get('parent_type', config.case_type)].add(fields.get('parent_external_id'))
+            owner_names.add(fields.get('owner_name'))
+            owner_ids.add(fields.get('owner_id'))
+
+        case_lookups.clear()
+        results = importer_util.lookup_cases(config.search_field, search_ids, domain, config.case_type)
+        for search_id, result in results.items():
+            case_lookups[(config.search_field, config.case_type, search_id)] = result
+        for parent_type, external_ids in parent_external_ids.items():
+            results = importer_util.lookup_cases('external_id', external_ids, domain, parent_type)
+            for external_id, result in results.items():
+                case_lookups[('external_id', parent_type, external_id)] = result
+
+        parent_cases.clear()
+        parent_ids = [parent_id for parent_id in parent_ids if parent_id]
+        if parent_ids:
+            parent_cases.update({parent_id: None for parent_id in parent_ids})
+            parent_cases.update({case.case_id: case for case in CaseAccessors(domain).get_cases(parent_ids)})
+
+        importer_util.cache_ids_from_names(owner_names, domain, name_cache)
+        owner_ids.update(name_cache.get(name) for name in owner_names if name)
+        importer_util.cache_valid_ids(owner_ids, domain, id_cache)
+
+    def _forget_written_lookups():
+        # lookups done before the cases in caseblocks were written may not match them
+        for key in [key for key in case_lookups if key[2] in written_ids]:
+            del case_lookups[key]
+        written_ids.clear()
+
+    def _lookup_case(search_field, search_id, case_type):
+        try:
+            return case_lookups[(search_field, case_type, search_id)]
+        except KeyError:
+            return importer_util.lookup_case(search_field, search_id, domain, case_type)
+
+    def _get_parent_case(parent_id):
+        if parent_id not in parent_cases:
+            return CaseAccessors(domain).get_case(parent_id)
+        parent_case = parent_cases[parent_id]
+        if parent_case is None:
+            raise ResourceNotFound(parent_id)
+        return parent_case
 
     def _submit_caseblocks(domain, case_type, caseblocks):
         err = False
@@ -121,7 +187,7 @@ def do_import(spreadsheet, config, domain, task=None, chunksize=CASEBLOCK_CHUNKS
         return err
 
     row_count = spreadsheet.max_row
-    for i, row in enumerate(spreadsheet.iter_rows()):
+    for i, row in _iter_rows():
         if task:
             set_task_progress(task, i, row_count)
 
@@ -157,12 +223,12 @@ def do_import(spreadsheet, config, domain, task=None, chunksize=CASEBLOCK_CHUNKS
             _submit_caseblocks(domain, config.case_type, caseblocks)
             num_chunks += 1
             caseblocks = []
+            _forget_written_lookups()
             ids_seen = set()  # also clear ids_seen, since all the cases will now be in the database
 
-        case, error = importer_util.lookup_case(
+        case, error = _lookup_case(
             config.search_field,
             search_id,
-            domain,
             config.case_type
         )
 
@@ -209,7 +275,7 @@ def do_import(spreadsheet, config, domain, task=None, chunksize=CASEBLOCK_CHUNKS
         extras = {}
         if parent_id:
             try:
-                parent_case = CaseAccessors(domain).get_case(parent_id)
+                parent_case = _get_parent_case(parent_id)
 
                 if parent_case.domain == domain:
                     extras['index'] = {
@@ -219,10 +285,9 @@ def do_import(spreadsheet, config, domain, task=None, chunksize=CASEBLOCK_CHUNKS
                 errors.add(ImportErrors.InvalidParentId, i + 1, 'parent_id')
                 continue
         elif parent_external_id:
-            parent_case, error = importer_util.lookup_case(
+            parent_case, error = _lookup_case(
                 'external_id',
                 parent_external_id,
-                domain,
                 parent_type
             )
             if parent_case:
@@ -260,11 +325,15 @@ def do_import(spreadsheet, config, domain, task=None, chunksize=CASEBLOCK_CHUNKS
                 created_count += 1
                 if external_id:
                     ids_seen.add(external_id)
+                written_ids.update([search_id, extras.get('external_id')])
             except CaseBlockError:
                 errors.add(ImportErrors.CaseGeneration, i + 1)
         else:
             if external_id:
                 extras['external_id'] = external_id
+                ids_seen.add(external_id)
+                # the case no longer matches its old external id, and now matches the new one
+                written_ids.update([external_id, case.external_id])
             if uploaded_owner_id:
                 extras['owner_id'] = owner_id
             if to_close == 'yes':
@@ -290,6 +359,7 @@ def do_import(spreadsheet, config, domain, task=None, chunksize=CASEBLOCK_CHUNKS
             _submit_caseblocks(domain, config.case_type, caseblocks)
             num_chunks += 1
             caseblocks = []
+            _forget_written_lookups()
 
     # final purge of anything left in the queue
     if _submit_caseblocks(domain, config.case_type, caseblocks):
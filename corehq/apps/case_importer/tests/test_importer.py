@@ -2,6 +2,7 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 from django.test import TestCase
 from django.utils.dateparse import parse_datetime
+from mock import patch
 
 from casexml.apps.case.mock import CaseFactory, CaseStructure
 from casexml.apps.case.tests.util import delete_all_cases
@@ -156,6 +157,56 @@ class ImporterTest(TestCase):
         # shouldn't touch existing properties
         self.assertEqual('foo', case.get_case_property('importer_test_prop'))
 
+    @run_with_all_backends
+    def test_bulk_lookups(self):
+        [case] = self.factory.create_or_update_case(CaseStructure(attrs={'create': True}))
+        [parent_case] = self.factory.create_or_update_case(CaseStructure(attrs={'create': True}))
+        config = self._config(['case_id', 'parent_id', 'age'])
+        file = make_worksheet_wrapper(
+            ['case_id', 'parent_id', 'age'],
+            [case.case_id, '', 'age-0'],
+            ['', parent_case.case_id, 'age-1'],
+            ['', parent_case.case_id, 'age-2'],
+        )
+        with patch('corehq.apps.case_importer.util.lookup_case') as lookup_case:
+            res = do_import(file, config, self.domain)
+        self.assertFalse(lookup_case.called)
+        self.assertEqual(2, res['created_count'])
+        self.assertEqual(1, res['match_count'])
+        self.assertFalse(res['errors'])
+
+    @run_with_all_backends
+    def test_repeated_external_id_after_chunk_submitted(self):
+        config = self._config(['age'], search_column='id_column', search_field='external_id')
+        file = make_worksheet_wrapper(
+            ['id_column', 'age'],
+            ['external-id-repeated', 'age-0'],
+            ['external-id-repeated', 'age-1'],
+        )
+        res = do_import(file, config, self.domain, chunksize=1)
+        self.assertFalse(res['errors'])
+        self.assertEqual(1, res['created_count'])
+        self.assertEqual(1, res['match_count'])
+        self.assertEqual(1, len(self.accessor.get_case_ids_in_domain()))
+
+    @run_with_all_backends
+    def test_external_id_set_by_update_after_chunk_submitted(self):
+        self.factory.create_or_update_case(CaseStructure(attrs={
+            'create': True,
+            'external_id': 'external-id-old',
+        }))
+        config = self._config(['external_id', 'age'], search_column='id_column', search_field='external_id')
+        file = make_worksheet_wrapper(
+            ['id_column', 'external_id', 'age'],
+            ['external-id-old', 'external-id-new', 'age-0'],
+            ['external-id-new', '', 'age-1'],
+        )
+        res = do_import(file, config, self.domain, chunksize=1)
+        self.assertFalse(res['errors'])
+        self.assertEqual(0, res['created_count'])
+        self.assertEqual(2, res['match_count'])
+        self.assertEqual(1, len(self.accessor.get_case_ids_in_domain()))
+
     @run_with_all_backends
     def testCaseLookupTypeCheck(self):
         [case] = self.factory.create_or_update_case(CaseStructure(attrs={
@@ -3,6 +3,8 @@ from __future__ import unicode_literals
 from contextlib import contextmanager
 import json
 from collections import defaultdict, namedtuple
+from django.conf import settings
+from django.db.models.functions import Lower
 from django.utils.translation import ugettext_lazy as _
 from couchdbkit import NoResultFound
 
@@ -17,7 +19,8 @@ from corehq.apps.case_importer.exceptions import (
     ImporterRefError,
     InvalidCustomFieldNameException,
 )
-from corehq.apps.users.cases import get_wrapped_owner
+from corehq.apps.users.cases import get_wrapped_owner, get_wrapped_owners
+from corehq.apps.users.dbaccessors import get_user_docs_by_username
 from corehq.apps.users.models import CouchUser
 from corehq.apps.users.util import format_username
 from corehq.apps.locations.models import SQLLocation
@@ -293,6 +296,34 @@ def lookup_case(search_field, search_id, domain, case_type):
         return (None, LookupErrors.NotFound)
 
 
+def lookup_cases(search_field, search_ids, domain, case_type):
+    """
+    Bulk version of ``lookup_case``
+
+    :returns: dict of search_id -> (case, error) for each of ``search_ids``
+    """
+    results = {search_id: (None, LookupErrors.NotFound) for search_id in search_ids}
+    search_ids = [search_id for search_id in results if search_id]
+    if not search_ids:
+        return results
+
+    case_accessors = CaseAccessors(domain)
+    if search_field == 'case_id':
+        for case in case_accessors.get_cases(search_ids):
+            if case.domain == domain and case.type == case_type:
+                results[case.case_id] = (case, None)
+    elif search_field == EXTERNAL_ID:
+        cases_by_external_id = defaultdict(list)
+        for case in case_accessors.get_cases_by_external_ids(search_ids, case_type=case_type):
+            cases_by_external_id[case.external_id].append(case)
+        for external_id, cases in cases_by_external_id.items():
+            if len(cases) > 1:
+                results[external_id] = (None, LookupErrors.MultipleResults)
+            else:
+                results[external_id] = (cases[0], None)
+    return results
+
+
 def populate_updated_fields(config, columns, row):
     """
     Returns a dict map of fields that were marked to be updated
@@ -365,6 +396,17 @@ def is_valid_id(uploaded_id, domain, cache):
     return is_valid_owner(owner, domain)
 
 
+def cache_valid_ids(uploaded_ids, domain, cache):
+    """
+    Bulk version of ``is_valid_id`` that stores whether each of
+    ``uploaded_ids`` is a valid owner in ``cache``
+    """
+    uploaded_ids = {uploaded_id for uploaded_id in uploaded_ids if uploaded_id and uploaded_id not in cache}
+    owners = get_wrapped_owners(uploaded_ids)
+    for uploaded_id in uploaded_ids:
+        cache[uploaded_id] = is_valid_owner(owners.get(uploaded_id), domain)
+
+
 def is_valid_owner(owner, domain):
     return (
         (isinstance(owner, CouchUser) and owner.is_member_of(domain)) or
@@ -410,6 +452,62 @@ def get_id_from_name(name, domain, cache):
     return id
 
 
+def cache_ids_from_names(names, domain, cache):
+    """
+    Bulk version of ``get_id_from_name`` that stores the ids of ``names`` in
+    ``cache``
+
+    Names that match more than one location are not cached, so that
+    ``get_id_from_name`` raises ``MultipleObjectsReturned`` for them.
+    """
+    names = {name for name in names if name and name not in cache}
+    if not names:
+        return
+
+    ids = {}
+    usernames = {
+        (name if '@' in name else format_username(name, domain)): name
+        for name in names
+    }
+    for user_doc in get_user_docs_by_username(list(usernames)):
+        name = usernames.get(user_doc['username'])
+        if name:
+            ids[name] = user_doc['_id']
+
+    remaining = names - set(ids)
+    if remaining:
+        for row in Group.get_db().view('groups/by_name', keys=[[domain, name] for name in remaining],
+                                       stale=settings.COUCH_STALE_QUERY):
+            ids.setdefault(row['key'][1], row['id'])
+
+    remaining = names - set(ids)
+    if remaining:
+        for location in SQLLocation.objects.filter(domain=domain, site_code__in=remaining):
+            ids[location.site_code] = location.location_id
+
+    remaining = names - set(ids)
+    multiple_locations = set()
+    if remaining:
+        names_by_lower = defaultdict(list)
+        for name in remaining:
+            names_by_lower[name.lower()].append(name)
+        locations = (SQLLocation.objects
+                     .annotate(lower_name=Lower('name'))
+                     .filter(domain=domain, lower_name__in=list(names_by_lower)))
+        locations_by_name = defaultdict(list)
+        for location in locations:
+            locations_by_name[location.lower_name].append(location.location_id)
+        for lower_name, location_ids in locations_by_name.items():
+            for name in names_by_lower[lower_name]:
+                if len(location_ids) > 1:
+                    multiple_locations.add(name)
+                else:
+                    ids[name] = location_ids[0]
+
+    for name in names - multiple_locations:
+        cache[name] = ids.get(name)
+
+
 def get_importer_error_message(e):
     if isinstance(e, ImporterRefError):
         # I'm not totally sure this is the right error, but it's what was being
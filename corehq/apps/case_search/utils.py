@@ -1,6 +1,12 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+import hashlib
+import json
 import re
+import time
+import uuid
+
+from dimagi.utils.couch.cache.cache_core import get_redis_default_cache
 
 from corehq.apps.es.case_search import CaseSearchES
 from corehq.pillows.mappings.case_search_mapping import CASE_SEARCH_MAX_RESULTS
@@ -118,3 +124,85 @@ class CaseSearchCriteria(object):
             new_query = merge_queries(self.search_es.get_query(), query_addition)
             self.query_addition_debug_details['new_query'] = new_query
             self.search_es = self.search_es.set_query(new_query)
+
+
+# Rendered search results are cached briefly, and cleared by the case search
+# pillow when a case of the searched type changes (see
+# clear_case_search_results_cache). The results for a case type are keyed on a
+# random "generation" of that case type, so clearing them only means changing it.
+CASE_SEARCH_RESULTS_TIMEOUT = 5 * 60
+CASE_SEARCH_GENERATION_TIMEOUT = 24 * 60 * 60
+# The pillow clears the results as soon as it has sent a case to ES, but
+# searches only see it once the index is refreshed (every 5s by default)
+CASE_SEARCH_INDEX_REFRESH_SECONDS = 10
+# The pillow clears the results for a case type at most this often, so that
+# they can still be cached while cases of that type are changing
+CASE_SEARCH_CLEAR_INTERVAL = 30
+
+
+def get_case_search_results_cache_key(domain, case_type, criteria):
+    """
+    :param criteria: dict of the search criteria, other than case type, as sent by the phone
+    :returns: cache key for the results of the search, or None if they should not be cached
+    """
+    generation = _get_case_search_generation(domain, case_type)
+    if generation is None:
+        return None
+    search = json.dumps([domain, case_type, generation[0], sorted(criteria.items())])
+    return 'case-search-results-{}'.format(hashlib.md5(search.encode('utf-8')).hexdigest())
+
+
+def get_cached_case_search_results(cache_key):
+    return get_redis_default_cache().get(cache_key)
+
+
+def cache_case_search_results(domain, case_type, cache_key, results, searched_at):
+    """
+    :param searched_at: ``time.time()`` from before the cache key was made.
+    A search made shortly after the results were last cleared may be missing
+    changes that the pillow did not clear them for (see
+    ``CASE_SEARCH_CLEAR_INTERVAL``), so its results are only cached until
+    those changes would show up in a new search.
+    """
+    generation = _get_case_search_generation(domain, case_type)
+    cleared_at = generation[1] if generation else None
+    timeout = CASE_SEARCH_RESULTS_TIMEOUT
+    if cleared_at is not None:
+        stale_until = cleared_at + CASE_SEARCH_CLEAR_INTERVAL + CASE_SEARCH_INDEX_REFRESH_SECONDS
+        if searched_at <= stale_until:
+            timeout = min(timeout, int(stale_until - time.time()))
+    if timeout > 0:
+        get_redis_default_cache().set(cache_key, results, timeout)
+
+
+def clear_case_search_results_cache(domain, case_type):
+    """Clear the cached search results for the case type
+
+    Changes to cases of the type for ``CASE_SEARCH_CLEAR_INTERVAL`` seconds
+    after this may be left out of cached results until they expire.
+    """
+    get_redis_default_cache().set(
+        _get_case_search_generation_key(domain, case_type),
+        (uuid.uuid4().hex, time.time()),
+        CASE_SEARCH_GENERATION_TIMEOUT,
+    )
+
+
+def _get_case_search_generation(domain, case_type):
+    """
+    :returns: (random generation, time it was last cleared or None)
+    """
+    cache = get_redis_default_cache()
+    key = _get_case_search_generation_key(domain, case_type)
+    generation = cache.get(key)
+    if generation is None:
+        generation = (uuid.uuid4().hex, None)
+        if not cache.add(key, generation, CASE_SEARCH_GENERATION_TIMEOUT):
+            generation = cache.get(key)
+    return generation
+
+
+def _get_case_search_generation_key(domain, case_type):
+    return 'case-search-generation-v2-{}'.format(
+        hashlib.md5(json.dumps([domain, case_type]).encode('utf-8')).hexdigest()
+    )
@@ -56,7 +56,7 @@ class KafkaChangeFeed(ChangeFeed):
             raise ValueError("This function requires a single topic but found {}!".format(self._topics))
         return self._topics[0]
 
-    def iter_changes(self, since, forever):
+    def iter_changes(self, since, forever, idle_timeout_ms=None):
         """
         Since must be a dictionary of topic partition offsets.
         """
@@ -66,7 +66,10 @@ class KafkaChangeFeed(ChangeFeed):
             raise ValueError("'since' must be None or a topic offset dictionary")
 
         # in milliseconds, -1 means wait forever for changes
-        timeout = -1 if forever else MIN_TIMEOUT
+        if forever:
+            timeout = idle_timeout_ms or -1
+        else:
+            timeout = MIN_TIMEOUT
 
         start_from_latest = since is None
 
@@ -90,13 +93,19 @@ class KafkaChangeFeed(ChangeFeed):
             # this is how you tell the consumer to start from a certain point in the sequence
             consumer.set_topic_partitions(*offsets)
 
-        try:
-            for message in consumer:
-                self._processed_topic_offsets[(message.topic, message.partition)] = message.offset
-                yield change_from_kafka_message(message)
-        except ConsumerTimeout:
-            assert not forever, 'Kafka pillow should not timeout when waiting forever!'
-            # no need to do anything since this is just telling us we've reached the end of the feed
+        while True:
+            try:
+                for message in consumer:
+                    self._processed_topic_offsets[(message.topic, message.partition)] = message.offset
+                    yield change_from_kafka_message(message)
+                return
+            except ConsumerTimeout:
+                if not forever:
+                    # no need to do anything since this is just telling us we've reached the end of the feed
+                    return
+                assert idle_timeout_ms, 'Kafka pillow should not timeout when waiting forever!'
+                # let the pillow know the feed is idle, then carry on waiting
+                yield None
 
     def get_current_checkpoint_offsets(self):
         # the way kafka works, the checkpoint should increment by 1 because
@@ -4,7 +4,7 @@ from __future__ import unicode_literals
 import jsonfield
 import pytz
 import re
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 from casexml.apps.case.models import CommCareCase
 from casexml.apps.case.xform import get_case_updates
@@ -51,7 +51,7 @@ from django.conf import settings
 from django.contrib.postgres.fields import JSONField
 from django.db import models, transaction
 from django.db.models import Q
-from corehq.apps.hqcase.utils import update_case
+from corehq.apps.hqcase.utils import bulk_update_cases, update_case
 from corehq.form_processor.models import CommCareCaseSQL, CommCareCaseIndexSQL
 from django.utils.translation import ugettext_lazy
 from jsonobject.api import JsonObject
@@ -251,14 +251,41 @@ class AutomaticUpdateRule(models.Model):
         return date
 
     @classmethod
-    def get_case_ids(cls, domain, case_type, boundary_date=None, db=None):
+    def get_case_filter(cls, rules):
+        """
+        Returns a Q object on CommCareCaseSQL that every case matching at least
+        one of the given rules also matches, or None if the rules' criteria can't
+        be used to narrow down the cases. Cases not matching the filter may be
+        skipped when running rules that only act on matching cases.
+        """
+        case_filter = Q()
+        for rule in rules:
+            rule_filter = Q()
+            for criteria in rule.memoized_criteria:
+                criteria_filter = criteria.definition.get_case_filter()
+                if criteria_filter is not None:
+                    rule_filter &= criteria_filter
+
+            if not rule_filter:
+                return None
+
+            case_filter |= rule_filter
+
+        return case_filter or None
+
+    @classmethod
+    def get_case_ids(cls, domain, case_type, boundary_date=None, db=None, case_filter=None):
+        """
+        :param case_filter: See get_case_filter. Only applied to cases in postgres.
+        """
         if should_use_sql_backend(domain):
-            return cls._get_case_ids_from_postgres(domain, case_type, boundary_date=boundary_date, db=db)
+            return cls._get_case_ids_from_postgres(domain, case_type, boundary_date=boundary_date, db=db,
+                case_filter=case_filter)
         else:
             return cls._get_case_ids_from_es(domain, case_type, boundary_date=boundary_date)
 
     @classmethod
-    def _get_case_ids_from_postgres(cls, domain, case_type, boundary_date=None, db=None):
+    def _get_case_ids_from_postgres(cls, domain, case_type, boundary_date=None, db=None, case_filter=None):
         q_expression = Q(
             domain=domain,
             type=case_type,
@@ -269,6 +296,9 @@ class AutomaticUpdateRule(models.Model):
         if boundary_date:
             q_expression = q_expression & Q(server_modified_on__lte=boundary_date)
 
+        if case_filter:
+            q_expression = q_expression & case_filter
+
         if db:
             for c_id in CommCareCaseSQL.objects.using(db).filter(q_expression).values_list('case_id', flat=True):
                 yield c_id
@@ -338,10 +368,7 @@ class AutomaticUpdateRule(models.Model):
             'create_schedule_instance_definition',
         ))
 
-    def run_rule(self, case, now):
-        """
-        :return: CaseRuleActionResult object aggregating the results from all actions.
-        """
+    def _validate_run(self, case):
         if not self.migrated:
             raise self.MigrationError("Attempted to call new method on non-migrated model.")
 
@@ -354,11 +381,57 @@ class AutomaticUpdateRule(models.Model):
         if not isinstance(case, (CommCareCase, CommCareCaseSQL)) or case.domain != self.domain:
             raise self.RuleError("Invalid case given")
 
+    def run_rule(self, case, now):
+        """
+        :return: CaseRuleActionResult object aggregating the results from all actions.
+        """
+        self._validate_run(case)
+
         if self.criteria_match(case, now):
             return self.run_actions_when_case_matches(case)
         else:
             return self.run_actions_when_case_does_not_match(case)
 
+    def run_rule_for_cases(self, cases, now):
+        """
+        Runs the rule against many cases at once. The changes that
+        UpdateCaseDefinition actions make to all of the cases are submitted
+        together in one form instead of one form per case, after all other
+        actions have run.
+
+        :return: dict of case_id -> CaseRuleActionResult for each of the cases
+        """
+        results = {}
+        case_changes = CaseChanges()
+
+        for case in cases:
+            self._validate_run(case)
+
+            result = CaseRuleActionResult()
+            case_matches = self.criteria_match(case, now)
+            for action in self.memoized_actions:
+                definition = action.definition
+                if case_matches and isinstance(definition, UpdateCaseDefinition):
+                    action_result = definition.add_case_changes(case, case_changes)
+                elif case_matches:
+                    action_result = definition.when_case_matches(case, self)
+                else:
+                    action_result = definition.when_case_does_not_match(case, self)
+
+                if not isinstance(action_result, CaseRuleActionResult):
+                    raise TypeError("Expected CaseRuleActionResult")
+
+                result.add_result(action_result)
+
+            results[case.case_id] = result
+
+        if case_changes:
+            result = bulk_update_cases(self.domain, case_changes.get_updates(), device_id=None,
+                user_id=SYSTEM_USER_ID, xmlns=AUTO_UPDATE_XMLNS)
+            self.log_submission(result[0].form_id)
+
+        return results
+
     def criteria_match(self, case, now):
         if not self.migrated:
             raise self.MigrationError("Attempted to call new method on non-migrated model.")
@@ -515,6 +588,13 @@ class CaseRuleCriteriaDefinition(models.Model):
     def matches(self, case, now):
         raise NotImplementedError()
 
+    def get_case_filter(self):
+        """
+        :return: A Q object on CommCareCaseSQL that every case matching this
+        definition also matches, or None if there isn't one
+        """
+        return None
+
 
 class MatchPropertyDefinition(CaseRuleCriteriaDefinition):
     # True when today < (the date in property_name + property_value days)
@@ -640,6 +720,23 @@ class MatchPropertyDefinition(CaseRuleCriteriaDefinition):
             self.MATCH_REGEX: self.check_regex,
         }.get(self.match_type)(case, now)
 
+    def get_case_filter(self):
+        # Only plain dynamic case properties are stored in case_json;
+        # everything else is resolved on the case
+        sql_fields = [field.name for field in CommCareCaseSQL._meta.fields]
+        if '/' in self.property_name or self.property_name in sql_fields + ['_id']:
+            return None
+
+        if self.match_type == self.MATCH_EQUAL and self.property_value is not None:
+            return Q(case_json__contains={self.property_name: self.property_value})
+
+        if self.match_type in (self.MATCH_DAYS_BEFORE, self.MATCH_DAYS_AFTER, self.MATCH_HAS_VALUE):
+            # Date formats vary too much to compare the dates in the query,
+            # but there is nothing to compare if the property isn't set
+            return Q(case_json__has_key=self.property_name)
+
+        return None
+
 
 class CustomMatchDefinition(CaseRuleCriteriaDefinition):
     name = models.CharField(max_length=126)
@@ -923,7 +1020,11 @@ class UpdateCaseDefinition(CaseRuleActionDefinition):
 
         self.properties_to_update = result
 
-    def when_case_matches(self, case, rule):
+    def get_cases_to_update(self, case):
+        """
+        :return: dict of case_id -> properties to update for the case and any
+        parent or host cases referenced by the properties to update
+        """
         cases_to_update = defaultdict(dict)
 
         def _get_case_property_value(current_case, name):
@@ -966,6 +1067,33 @@ class UpdateCaseDefinition(CaseRuleActionDefinition):
             if value != _get_case_property_value(case, prop.name):
                 _add_update_property(prop.name, value, case)
 
+        return cases_to_update
+
+    def add_case_changes(self, case, case_changes):
+        """
+        Like when_case_matches, but adds the changes to case_changes to be
+        submitted later instead of submitting them
+        """
+        cases_to_update = self.get_cases_to_update(case)
+        num_related_updates = 0
+        for case_id, properties in cases_to_update.items():
+            if case_id != case.case_id:
+                case_changes.add(case_id, properties, close=False)
+                num_related_updates += 1
+
+        properties = cases_to_update[case.case_id]
+        if self.close_case or properties:
+            case_changes.add(case.case_id, properties, close=self.close_case)
+
+        return CaseRuleActionResult(
+            num_updates=1 if properties else 0,
+            num_closes=1 if self.close_case else 0,
+            num_related_updates=num_related_updates,
+        )
+
+    def when_case_matches(self, case, rule):
+        cases_to_update = self.get_cases_to_update(case)
+
         num_updates = 0
         num_closes = 0
         num_related_updates = 0
@@ -1001,6 +1129,36 @@ class UpdateCaseDefinition(CaseRuleActionDefinition):
         )
 
 
+class CaseChanges(object):
+    """
+    Collects updates to many cases so that they can be submitted in one form.
+    Later updates to a case's properties take precedence over earlier ones.
+    """
+
+    def __init__(self):
+        self.properties = OrderedDict()
+        self.closed_case_ids = set()
+
+    def __bool__(self):
+        return bool(self.properties)
+
+    __nonzero__ = __bool__
+
+    def add(self, case_id, properties, close=False):
+        self.properties.setdefault(case_id, {}).update(properties)
+        if close:
+            self.closed_case_ids.add(case_id)
+
+    def get_updates(self):
+        """
+        :return: list of (case_id, properties, close) tuples as expected by bulk_update_cases
+        """
+        return [
+            (case_id, properties, case_id in self.closed_case_ids)
+            for case_id, properties in six.iteritems(self.properties)
+        ]
+
+
 class CustomActionDefinition(CaseRuleActionDefinition):
     name = models.CharField(max_length=126)
 
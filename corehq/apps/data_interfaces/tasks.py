@@ -26,6 +26,7 @@ from corehq.sql_db.util import get_db_aliases_for_partitioned_query
 from .interfaces import FormManagementMode, BulkFormManagementInterface
 from .dispatcher import EditDataInterfaceDispatcher
 from corehq.util.log import send_HTML_email
+from dimagi.utils.chunked import chunked
 from dimagi.utils.couch import CriticalSection
 from dimagi.utils.logging import notify_error
 import six
@@ -34,6 +35,7 @@ import six
 logger = get_task_logger('data_interfaces')
 ONE_HOUR = 60 * 60
 HALT_AFTER = 23 * 60 * 60
+CASE_CHUNK_SIZE = 100
 
 
 @task(ignore_result=True)
@@ -105,6 +107,45 @@ def run_rules_for_case(case, rules, now):
     return aggregated_result
 
 
+def run_rules_for_cases(domain, cases, rules, now):
+    """
+    Same as running run_rules_for_case for each of the cases, but each rule
+    is run against all of the cases at once so that its case updates are
+    submitted in one form.
+
+    :return: CaseRuleActionResult aggregated over all of the cases
+    """
+    aggregated_result = CaseRuleActionResult()
+    cases = list(cases)
+    for rule in rules:
+        if not cases:
+            break
+
+        results = rule.run_rule_for_cases(cases, now)
+        remaining_cases = []
+        changed_case_ids = []
+        for case in cases:
+            result = results[case.case_id]
+            aggregated_result.add_result(result)
+            if result.num_closes > 0:
+                continue
+
+            remaining_cases.append(case)
+            if result.num_updates > 0 or result.num_related_updates > 0 or result.num_related_closes > 0:
+                changed_case_ids.append(case.case_id)
+
+        if changed_case_ids:
+            changed_cases = {
+                case.case_id: case
+                for case in CaseAccessors(domain).get_cases(changed_case_ids)
+            }
+            remaining_cases = [changed_cases.get(case.case_id, case) for case in remaining_cases]
+
+        cases = remaining_cases
+
+    return aggregated_result
+
+
 def check_data_migration_in_progress(domain, last_migration_check_time):
     utcnow = datetime.utcnow()
     if last_migration_check_time is None or (utcnow - last_migration_check_time) > timedelta(minutes=1):
@@ -151,9 +192,11 @@ def run_case_update_rules_for_domain_and_db(domain, now, run_id, db=None):
 
     for case_type, rules in six.iteritems(rules_by_case_type):
         boundary_date = AutomaticUpdateRule.get_boundary_date(rules, now)
-        case_ids = list(AutomaticUpdateRule.get_case_ids(domain, case_type, boundary_date, db=db))
+        case_filter = AutomaticUpdateRule.get_case_filter(rules)
+        case_ids = list(AutomaticUpdateRule.get_case_ids(domain, case_type, boundary_date, db=db,
+            case_filter=case_filter))
 
-        for case in CaseAccessors(domain).iter_cases(case_ids):
+        for case_id_chunk in chunked(case_ids, CASE_CHUNK_SIZE):
             migration_in_progress, last_migration_check_time = check_data_migration_in_progress(domain,
                 last_migration_check_time)
 
@@ -168,8 +211,9 @@ def run_case_update_rules_for_domain_and_db(domain, now, run_id, db=None):
                 notify_error("Halting rule run for domain %s." % domain)
                 return
 
-            case_update_result.add_result(run_rules_for_case(case, rules, now))
-            cases_checked += 1
+            cases = CaseAccessors(domain).get_cases(list(case_id_chunk))
+            case_update_result.add_result(run_rules_for_cases(domain, cases, rules, now))
+            cases_checked += len(cases)
 
     run = DomainCaseRuleRun.done(run_id, DomainCaseRuleRun.STATUS_FINISHED, cases_checked, case_update_result,
         db=db)
@@ -34,6 +34,7 @@ from corehq.form_processor.utils.general import should_use_sql_backend
 from corehq.form_processor.signals import sql_case_post_save
 
 from corehq.util.test_utils import set_parent_case as set_actual_parent_case, update_case
+from django.db.models import Q
 from django.test import TestCase, override_settings
 from mock import patch
 
@@ -1593,6 +1594,73 @@ class CaseRuleEndToEndTests(BaseCaseRuleTest):
                 self.assertRuleRunCount(3)
                 self.assertLastRuleRun(1)
 
+    @run_with_all_backends
+    def test_scheduled_task_run_submits_one_form_per_chunk(self):
+        rule = _create_empty_rule(self.domain)
+        rule.add_criteria(
+            MatchPropertyDefinition,
+            property_name='do_update',
+            property_value='Y',
+            match_type=MatchPropertyDefinition.MATCH_EQUAL,
+        )
+
+        _, definition = rule.add_action(UpdateCaseDefinition, close_case=False)
+        definition.set_properties_to_update([
+            UpdateCaseDefinition.PropertyDefinition(
+                name='result',
+                value_type=UpdateCaseDefinition.VALUE_TYPE_EXACT,
+                value='abc',
+            ),
+        ])
+        definition.save()
+
+        with _with_case(self.domain, 'person', datetime.utcnow()) as case1, \
+                _with_case(self.domain, 'person', datetime.utcnow()) as case2, \
+                _with_case(self.domain, 'person', datetime.utcnow()) as case3:
+            for case in (case1, case2):
+                hqcase.utils.update_case(self.domain, case.case_id, case_properties={'do_update': 'Y'})
+
+            with patch('corehq.apps.data_interfaces.models.AutomaticUpdateRule.get_case_ids') as case_ids_patch:
+                case_ids_patch.return_value = [case1.case_id, case2.case_id, case3.case_id]
+                run_case_update_rules_for_domain(self.domain)
+
+            self.assertLastRuleRun(3, num_updates=2)
+            self.assertEqual(CaseRuleSubmission.objects.filter(rule=rule).count(), 1)
+            results = [
+                case.get_case_property('result')
+                for case in CaseAccessors(self.domain).get_cases([case1.case_id, case2.case_id, case3.case_id],
+                    ordered=True)
+            ]
+            self.assertEqual(results, ['abc', 'abc', None])
+
+    def test_get_case_filter(self):
+        rule1 = _create_empty_rule(self.domain)
+        rule1.add_criteria(
+            MatchPropertyDefinition,
+            property_name='do_update',
+            property_value='Y',
+            match_type=MatchPropertyDefinition.MATCH_EQUAL,
+        )
+        rule1.add_criteria(
+            MatchPropertyDefinition,
+            property_name='last_visit_date',
+            property_value='30',
+            match_type=MatchPropertyDefinition.MATCH_DAYS_AFTER,
+        )
+        rule2 = _create_empty_rule(self.domain)
+        rule2.add_criteria(
+            MatchPropertyDefinition,
+            property_name='parent/do_update',
+            property_value='Y',
+            match_type=MatchPropertyDefinition.MATCH_EQUAL,
+        )
+
+        self.assertEqual(
+            str(AutomaticUpdateRule.get_case_filter([rule1])),
+            str(Q(case_json__contains={'do_update': 'Y'}) & Q(case_json__has_key='last_visit_date'))
+        )
+        self.assertIsNone(AutomaticUpdateRule.get_case_filter([rule1, rule2]))
+
 
 class TestParentCaseReferences(BaseCaseRuleTest):
 
@@ -38,7 +38,11 @@ from corehq.messaging.scheduling.scheduling_partitioned.models import (
     CaseTimedScheduleInstance,
 )
 from corehq.messaging.scheduling.tests.util import delete_alert_schedules, delete_timed_schedules
-from corehq.messaging.tasks import run_messaging_rule, sync_case_for_messaging_rule
+from corehq.messaging.tasks import (
+    run_messaging_rule,
+    sync_case_chunk_for_messaging_rule,
+    sync_case_for_messaging_rule,
+)
 from corehq.sql_db.util import run_query_across_partitioned_databases
 from datetime import datetime, date, time
 from django.db.models import Q
@@ -870,7 +874,8 @@ class CaseRuleSchedulingIntegrationTest(TestCase):
             self.assertTrue(instances[0].active)
 
     @run_with_all_backends
-    @patch('corehq.messaging.tasks.sync_case_for_messaging_rule.delay')
+    @patch('corehq.messaging.tasks.MESSAGING_RULE_CASE_CHUNK_SIZE', 1)
+    @patch('corehq.messaging.tasks.sync_case_chunk_for_messaging_rule.delay')
     def test_run_messaging_rule(self, task_patch):
         schedule = AlertSchedule.create_simple_alert(
             self.domain,
@@ -892,12 +897,45 @@ class CaseRuleSchedulingIntegrationTest(TestCase):
             self.assertEqual(task_patch.call_count, 2)
             task_patch.assert_has_calls(
                 [
-                    call(self.domain, case1.case_id, rule.pk),
-                    call(self.domain, case2.case_id, rule.pk),
+                    call(self.domain, [case1.case_id], rule.pk),
+                    call(self.domain, [case2.case_id], rule.pk),
                 ],
                 any_order=True
             )
 
+    @run_with_all_backends
+    @patch('corehq.messaging.tasks.MessagingRuleProgressHelper')
+    def test_sync_case_chunk_for_messaging_rule(self, progress_patch):
+        schedule = AlertSchedule.create_simple_alert(
+            self.domain,
+            SMSContent(message={'en': 'Hello'})
+        )
+
+        rule = create_empty_rule(self.domain, AutomaticUpdateRule.WORKFLOW_SCHEDULING)
+
+        rule.add_action(
+            CreateScheduleInstanceActionDefinition,
+            alert_schedule_id=schedule.schedule_id,
+            recipients=(('Self', None),),
+        )
+
+        AutomaticUpdateRule.clear_caches(self.domain, AutomaticUpdateRule.WORKFLOW_SCHEDULING)
+
+        with create_case(self.domain, 'person') as case1, create_case(self.domain, 'person') as case2:
+            for case in (case1, case2):
+                for instance in get_case_alert_schedule_instances_for_schedule(case.case_id, schedule):
+                    delete_case_schedule_instance(instance)
+
+            sync_case_chunk_for_messaging_rule(self.domain, [case1.case_id, case2.case_id, 'missing'], rule.pk)
+
+            for case in (case1, case2):
+                instances = get_case_alert_schedule_instances_for_schedule(case.case_id, schedule)
+                self.assertEqual(instances.count(), 1)
+                self.assertEqual(instances[0].case_id, case.case_id)
+                self.assertEqual(instances[0].recipient_type, 'Self')
+
+        progress_patch.return_value.increment_current_case_count.assert_called_once_with(3)
+
     @run_with_all_backends
     @patch('corehq.messaging.scheduling.models.content.SMSContent.send')
     @patch('corehq.messaging.scheduling.util.utcnow')
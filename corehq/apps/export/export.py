@@ -34,6 +34,9 @@ from corehq.apps.export.const import MAX_EXPORTABLE_ROWS
 import six
 from io import open
 
+# Number of rows for a table that are held before writing them to the export
+ROW_WRITE_BATCH_SIZE = 1000
+
 
 class ExportFile(object):
     # This is essentially coppied from couchexport.files.ExportFiles
@@ -113,6 +116,14 @@ class _ExportWriter(object):
         """
         return self.writer.write([(table, [FormattedRow(data=row.data)])])
 
+    def write_rows(self, table, rows):
+        """
+        Write the given rows to the given table of the export.
+        :param table: A TableConfiguration
+        :param rows: A list of ExportRows
+        """
+        return self.writer.write([(table, [FormattedRow(data=row.data) for row in rows])])
+
     def get_preview(self):
         return self.writer.get_preview()
 
@@ -253,16 +264,33 @@ class _PaginatedExportWriter(object):
         :param table: A TableConfiguration
         :param row: An ExportRow
         """
-        if self.rows_written[table] >= MAX_EXPORTABLE_ROWS * (self.pages[table] + 1):
-            self.pages[table] += 1
-            self.writer.add_table(
-                self._paged_table_index(table),
-                self._get_paginated_headers()[self._paged_table_index(table)][0],
-                table_title=self._get_paginated_table_titles()[self._paged_table_index(table)],
-            )
+        self.write_rows(table, [row])
 
-        self.writer.write([(self._paged_table_index(table), [FormattedRow(data=row.data)])])
-        self.rows_written[table] += 1
+    def write_rows(self, table, rows):
+        """
+        Write the given rows to the given table of the export, opening new
+        tables as write() does.
+        :param table: A TableConfiguration
+        :param rows: A list of ExportRows
+        """
+        while rows:
+            if self._rows_left_on_page(table) <= 0:
+                self.pages[table] += 1
+                self.writer.add_table(
+                    self._paged_table_index(table),
+                    self._get_paginated_headers()[self._paged_table_index(table)][0],
+                    table_title=self._get_paginated_table_titles()[self._paged_table_index(table)],
+                )
+
+            rows_left_on_page = self._rows_left_on_page(table)
+            page_rows, rows = rows[:rows_left_on_page], rows[rows_left_on_page:]
+            self.writer.write([
+                (self._paged_table_index(table), [FormattedRow(data=row.data) for row in page_rows])
+            ])
+            self.rows_written[table] += len(page_rows)
+
+    def _rows_left_on_page(self, table):
+        return MAX_EXPORTABLE_ROWS * (self.pages[table] + 1) - self.rows_written[table]
 
 
 def get_export_writer(export_instances, temp_path, allow_pagination=True):
@@ -358,17 +386,27 @@ def write_export_instance(writer, export_instance, documents, progress_tracker=N
     compute_total = 0
     write_total = 0
 
+    row_extractors = [
+        (table, table.get_row_extractor(
+            split_columns=export_instance.split_multiselects,
+            transform_dates=export_instance.transform_dates,
+        ))
+        for table in export_instance.selected_tables
+    ]
+    pending_rows = {table: [] for table, row_extractor in row_extractors}
+
+    def write_pending_rows(table):
+        write_start = _time_in_milliseconds()
+        writer.write_rows(table, pending_rows[table])
+        pending_rows[table] = []
+        return _time_in_milliseconds() - write_start
+
     for row_number, doc in enumerate(documents):
         total_bytes += sys.getsizeof(doc)
-        for table in export_instance.selected_tables:
+        for table, row_extractor in row_extractors:
             compute_start = _time_in_milliseconds()
             try:
-                rows = table.get_rows(
-                    doc,
-                    row_number,
-                    split_columns=export_instance.split_multiselects,
-                    transform_dates=export_instance.transform_dates,
-                )
+                rows = row_extractor.get_rows(doc, row_number)
             except Exception as e:
                 notify_exception(None, "Error exporting doc", details={
                     'domain': export_instance.domain,
@@ -380,18 +418,19 @@ def write_export_instance(writer, export_instance, documents, progress_tracker=N
                 raise
             compute_total += _time_in_milliseconds() - compute_start
 
-            write_start = _time_in_milliseconds()
-            for row in rows:
-                # It might be bad to write one row at a time when you can do more (from a performance perspective)
-                # Regardless, we should handle the batching of rows in the _Writer class, not here.
-                writer.write(table, row)
-            write_total += _time_in_milliseconds() - write_start
+            pending_rows[table].extend(rows)
+            if len(pending_rows[table]) >= ROW_WRITE_BATCH_SIZE:
+                write_total += write_pending_rows(table)
 
             total_rows += len(rows)
 
         if progress_tracker:
             DownloadBase.set_progress(progress_tracker, row_number + 1, documents.count)
 
+    for table, row_extractor in row_extractors:
+        if pending_rows[table]:
+            write_total += write_pending_rows(table)
+
     end = _time_in_milliseconds()
     tags = ['format:{}'.format(writer.format)]
     _record_datadog_export_write_rows(write_total, total_bytes, total_rows, tags)
@@ -18,6 +18,7 @@ from corehq.apps.export.multiprocess import (
     MultiprocessExporter, RetryResult,
     UNPROCESSED_PAGES_DIR, _add_compressed_page_to_zip)
 from corehq.util.files import safe_filename
+from couchexport.archives import StreamingZipFile
 from six.moves import input
 from io import open
 
@@ -112,7 +113,8 @@ class Command(BaseCommand):
             final_path = os.path.join(final_dir, final_name)
         print('Recompiling export')
         export_name = safe_filename(export_instance.name or 'Export')
-        with zipfile.ZipFile(final_path, mode='w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as final_zip:
+        with StreamingZipFile(final_path, mode='w', compression=zipfile.ZIP_DEFLATED,
+                              allowZip64=True) as final_zip:
             for result in successful_pages:
                 print('  Adding page {} to final file'.format(result.page))
                 _add_compressed_page_to_zip(final_zip, result.page, result.path)
@@ -29,6 +29,7 @@ from .new import (
     CaseInferredSchema,
     ExportGroupSchema,
     TableConfiguration,
+    TableRowExtractor,
     LabelItem,
     ScalarItem,
     GeopointItem,
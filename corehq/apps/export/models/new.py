@@ -262,7 +262,22 @@ class ExportColumn(DocumentSchema):
         assert base_path == self.item.path[:len(base_path)], "ExportItem's path doesn't start with the base_path"
         # Get the path from the doc root to the desired ExportItem
         path = [x.name for x in self.item.path[len(base_path):]]
-        return self._transform(NestedDictGetter(path)(doc), doc, transform_dates)
+        return self.format_value(
+            NestedDictGetter(path)(doc),
+            domain,
+            doc_id,
+            doc,
+            transform_dates=transform_dates,
+            split_column=split_column,
+        )
+
+    def format_value(self, value, domain, doc_id, doc, transform_dates=False, split_column=False):
+        """
+        Turn the value found at self.item's path in doc into what is written to the export.
+        Subclasses that only change the presentation of that value override this rather than get_value,
+        which lets TableRowExtractor look up the value itself.
+        """
+        return self._transform(value, doc, transform_dates)
 
     def _transform(self, value, doc, transform_dates):
         """
@@ -464,36 +479,17 @@ class TableConfiguration(DocumentSchema):
         :param row_number: number indicating this documents index in the sequence of all documents in the export
         :return: List of ExportRows
         """
-        document_id = document.get('_id')
-
-        sub_documents = self._get_sub_documents(document, row_number, document_id=document_id)
-
-        domain = document.get('domain')
+        return self.get_row_extractor(
+            split_columns=split_columns,
+            transform_dates=transform_dates,
+        ).get_rows(document, row_number)
 
-        assert domain is not None, 'Form or Case must be associated with domain'
-        assert document_id is not None, 'Form or Case must have an id'
-
-        rows = []
-        for doc_row in sub_documents:
-            doc, row_index = doc_row.doc, doc_row.row
-
-            row_data = []
-            for col in self.selected_columns:
-                val = col.get_value(
-                    domain,
-                    document_id,
-                    doc,
-                    self.path,
-                    row_index=row_index,
-                    split_column=split_columns,
-                    transform_dates=transform_dates,
-                )
-                if isinstance(val, list):
-                    row_data.extend(val)
-                else:
-                    row_data.append(val)
-            rows.append(ExportRow(data=row_data))
-        return rows
+    def get_row_extractor(self, split_columns=False, transform_dates=False):
+        """
+        Return a TableRowExtractor for generating the rows of many documents.
+        It should not be used after the columns of this table change.
+        """
+        return TableRowExtractor(self, split_columns=split_columns, transform_dates=transform_dates)
 
     def get_column(self, item_path, item_doc_type, column_transform):
         """
@@ -561,6 +557,121 @@ class TableConfiguration(DocumentSchema):
         return TableConfiguration._get_sub_documents_helper(document_id, path[1:], new_docs)
 
 
+class _PathTreeNode(object):
+    """
+    A node in the tree of the paths of a table's columns. Each node holds
+    the indexes of the columns whose path ends there.
+    """
+    __slots__ = ('column_indexes', 'children')
+
+    def __init__(self):
+        self.column_indexes = []
+        self.children = {}
+
+
+class TableRowExtractor(object):
+    """
+    Generates the rows of a TableConfiguration for a stream of documents.
+
+    Where a column's value is the value at its item's path (see
+    ExportColumn.format_value) that path is worked out once, not once per
+    row, and the paths of all such columns are looked up in a single walk
+    of each sub document so that columns in the same group share the lookup
+    of that group. All other columns use ExportColumn.get_value.
+    """
+
+    def __init__(self, table, split_columns=False, transform_dates=False):
+        self.table = table
+        self.split_columns = split_columns
+        self.transform_dates = transform_dates
+        self.columns = table.selected_columns
+        self.path_tree = _PathTreeNode()
+        self.is_path_column = []
+
+        base_path = table.path
+        for index, column in enumerate(self.columns):
+            get_value = six.get_unbound_function(type(column).get_value)
+            is_path_column = (
+                get_value is six.get_unbound_function(ExportColumn.get_value)
+                and column.item.path[:len(base_path)] == base_path
+            )
+            self.is_path_column.append(is_path_column)
+            if is_path_column:
+                path = [node.name for node in column.item.path[len(base_path):]]
+                # An empty path has no value, like NestedDictGetter([])
+                if path:
+                    self._add_path(path, index)
+
+    def _add_path(self, path, column_index):
+        node = self.path_tree
+        for name in path:
+            if name not in node.children:
+                node.children[name] = _PathTreeNode()
+            node = node.children[name]
+        node.column_indexes.append(column_index)
+
+    def get_rows(self, document, row_number):
+        """
+        Return a list of ExportRows generated for the given document.
+        :param document: dictionary representation of a form submission or case
+        :param row_number: number indicating this documents index in the sequence of all documents in the export
+        :return: List of ExportRows
+        """
+        document_id = document.get('_id')
+
+        sub_documents = self.table._get_sub_documents(document, row_number, document_id=document_id)
+
+        domain = document.get('domain')
+
+        assert domain is not None, 'Form or Case must be associated with domain'
+        assert document_id is not None, 'Form or Case must have an id'
+
+        rows = []
+        for doc_row in sub_documents:
+            doc, row_index = doc_row.doc, doc_row.row
+
+            path_values = [None] * len(self.columns)
+            if isinstance(doc, dict):
+                self._lookup_paths(self.path_tree, doc, path_values)
+
+            row_data = []
+            for index, col in enumerate(self.columns):
+                if self.is_path_column[index]:
+                    val = col.format_value(
+                        path_values[index],
+                        domain,
+                        document_id,
+                        doc,
+                        transform_dates=self.transform_dates,
+                        split_column=self.split_columns,
+                    )
+                else:
+                    val = col.get_value(
+                        domain,
+                        document_id,
+                        doc,
+                        self.table.path,
+                        row_index=row_index,
+                        split_column=self.split_columns,
+                        transform_dates=self.transform_dates,
+                    )
+                if isinstance(val, list):
+                    row_data.extend(val)
+                else:
+                    row_data.append(val)
+            rows.append(ExportRow(data=row_data))
+        return rows
+
+    @classmethod
+    def _lookup_paths(cls, node, doc, path_values):
+        for name, child in six.iteritems(node.children):
+            value = doc.get(name)
+            for column_index in child.column_indexes:
+                path_values[column_index] = value
+            if child.children and isinstance(value, dict):
+                cls._lookup_paths(child, value, path_values)
+
+
 class DatePeriod(DocumentSchema):
     period_type = StringProperty(required=True)
     days = IntegerProperty()
@@ -2229,18 +2340,12 @@ class SplitUserDefinedExportColumn(ExportColumn):
     )
     user_defined_options = ListProperty()
 
-    def get_value(self, domain, doc_id, doc, base_path, transform_dates=False, **kwargs):
-        """
-        Get the value of self.item of the given doc.
-        When base_path is [], doc is a form submission or case,
-        when base_path is non empty, doc is a repeat group from a form submission.
-        doc is a form submission or instance of a repeat group in a submission or case
-        """
-        value = super(SplitUserDefinedExportColumn, self).get_value(
+    def format_value(self, value, domain, doc_id, doc, transform_dates=False, **kwargs):
+        value = super(SplitUserDefinedExportColumn, self).format_value(
+            value,
             domain,
             doc_id,
             doc,
-            base_path,
             transform_dates=transform_dates
         )
         if self.split_type == PLAIN_USER_DEFINED_SPLIT_TYPE:
@@ -2285,8 +2390,8 @@ class MultiMediaExportColumn(ExportColumn):
     in order to make the link clickable.
     """
 
-    def get_value(self, domain, doc_id, doc, base_path, transform_dates=False, **kwargs):
-        value = super(MultiMediaExportColumn, self).get_value(domain, doc_id, doc, base_path, **kwargs)
+    def format_value(self, value, domain, doc_id, doc, transform_dates=False, **kwargs):
+        value = super(MultiMediaExportColumn, self).format_value(value, domain, doc_id, doc, **kwargs)
 
         if not value or value == MISSING_VALUE:
             return value
@@ -2313,12 +2418,12 @@ class SplitGPSExportColumn(ExportColumn):
         ]
         return [header_template.format(header) for header_template in header_templates]
 
-    def get_value(self, domain, doc_id, doc, base_path, split_column=False, **kwargs):
-        value = super(SplitGPSExportColumn, self).get_value(
+    def format_value(self, value, domain, doc_id, doc, split_column=False, **kwargs):
+        value = super(SplitGPSExportColumn, self).format_value(
+            value,
             domain,
             doc_id,
             doc,
-            base_path,
             **kwargs
         )
         if not split_column:
@@ -2362,14 +2467,8 @@ class SplitExportColumn(ExportColumn):
     item = SchemaProperty(MultipleChoiceItem)
     ignore_unspecified_options = BooleanProperty(default=False)
 
-    def get_value(self, domain, doc_id, doc, base_path, split_column=False, **kwargs):
-        """
-        Get the value of self.item of the given doc.
-        When base_path is [], doc is a form submission or case,
-        when base_path is non empty, doc is a repeat group from a form submission.
-        doc is a form submission or instance of a repeat group in a submission or case
-        """
-        value = super(SplitExportColumn, self).get_value(domain, doc_id, doc, base_path, **kwargs)
+    def format_value(self, value, domain, doc_id, doc, split_column=False, **kwargs):
+        value = super(SplitExportColumn, self).format_value(value, domain, doc_id, doc, **kwargs)
         if not split_column:
             return value
 
@@ -15,7 +15,7 @@ The export works as follows:
   * Pool of X processes listen to queue and process the dump file
   * Results returned back to the main process
     * Unsuccessful results can be retried
-  * Add successful pages to final ZIP archive
+  * Add successful pages to final ZIP archive (copying the compressed data as is)
   * Add raw data dumps for unsuccessful pages to final ZIP archive
 """
 from __future__ import absolute_import
@@ -39,6 +39,7 @@ from corehq.apps.export.export import (
 from corehq.apps.export.export import write_export_instance
 from corehq.elastic import ScanResult
 from corehq.util.files import safe_filename
+from couchexport.archives import StreamingZipFile, copy_archive_members
 from couchexport.export import get_writer
 from couchexport.writers import ZippedExportWriter
 from io import open
@@ -327,14 +328,14 @@ class MultiprocessExporter(object):
 
     def _get_zipfile_for_final_archive(self):
         if self.existing_archive_path:
-            return zipfile.ZipFile(
+            return StreamingZipFile(
                 self.existing_archive_path, mode='a',
                 compression=zipfile.ZIP_DEFLATED, allowZip64=True
             )
         else:
             prefix = '{}{}_final_'.format(TEMP_FILE_PREFIX, self.export_instance.get_id)
             final_file_obj = tempfile.NamedTemporaryFile(prefix=prefix, mode='wb', delete=False)
-            return zipfile.ZipFile(
+            return StreamingZipFile(
                 final_file_obj, mode='w',
                 compression=zipfile.ZIP_DEFLATED, allowZip64=True
             )
@@ -360,6 +361,9 @@ class MultiprocessExporter(object):
                     _add_compressed_page_to_zip(final_zip, result.page, result.path)
                 else:
                     final_zip.write(result.path, '{}_{}'.format(base_name, result.page))
+                if not self.keep_file:
+                    # the page is in the final archive now so don't hold on to two copies
+                    os.remove(result.path)
 
         return final_zip.filename
 
@@ -372,12 +376,15 @@ class MultiprocessExporter(object):
 
 
 def _add_compressed_page_to_zip(zip_file, page_number, zip_path_to_add):
-    with zipfile.ZipFile(zip_path_to_add, 'r') as page_file:
-        for path in page_file.namelist():
-            prefix, suffix = path.rsplit('/', 1)
-            zip_file.writestr('{}/{}_{}'.format(
-                prefix, page_number, suffix), page_file.open(path).read()
-            )
+    """
+    :param zip_file: A ``StreamingZipFile``. The page's members are copied
+    into it without being decompressed.
+    """
+    def _page_path(path):
+        prefix, suffix = path.rsplit('/', 1)
+        return '{}/{}_{}'.format(prefix, page_number, suffix)
+
+    copy_archive_members(zip_file, zip_path_to_add, _page_path)
 
 
 def _output_progress(queue, total_docs):
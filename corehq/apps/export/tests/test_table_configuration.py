@@ -10,6 +10,9 @@ from corehq.apps.export.models import (
     ExportRow,
     ScalarItem,
     ExportColumn,
+    MultipleChoiceItem,
+    Option,
+    SplitExportColumn,
     TableConfiguration,
 )
 
@@ -338,3 +341,78 @@ class TableConfigurationGetRowsTest(SimpleTestCase):
         self.assertEqual(
             [row.data for row in table_configuration.get_rows(submission, 0)], []
         )
+
+    def test_row_extractor(self):
+        table_configuration = TableConfiguration(
+            path=[PathNode(name='form', is_repeat=False), PathNode(name='repeat1', is_repeat=True)],
+            columns=[
+                RowNumberColumn(
+                    selected=True
+                ),
+                ExportColumn(
+                    item=ScalarItem(
+                        path=[
+                            PathNode(name='form'),
+                            PathNode(name='repeat1', is_repeat=True),
+                            PathNode(name='group1'),
+                            PathNode(name='q1'),
+                        ],
+                    ),
+                    selected=True,
+                ),
+                SplitExportColumn(
+                    item=MultipleChoiceItem(
+                        path=[
+                            PathNode(name='form'),
+                            PathNode(name='repeat1', is_repeat=True),
+                            PathNode(name='group1'),
+                            PathNode(name='mc'),
+                        ],
+                        options=[Option(value='a'), Option(value='b')],
+                    ),
+                    selected=True,
+                ),
+                ExportColumn(
+                    item=ScalarItem(
+                        path=[
+                            PathNode(name='form'),
+                            PathNode(name='repeat1', is_repeat=True),
+                        ],
+                    ),
+                    selected=True,
+                ),
+            ]
+        )
+        submissions = [{
+            'domain': 'my-domain',
+            '_id': '1234',
+            'form': {
+                'repeat1': [
+                    {'group1': {'q1': 'foo', 'mc': 'a c'}},
+                    {'group1': 'not a group'},
+                ]
+            }
+        }, {
+            'domain': 'my-domain',
+            '_id': '5678',
+            'form': {
+                'repeat1': {'group1': {'q1': {'#text': 'bar', '@id': 'q1'}, 'mc': 'b'}},
+            }
+        }]
+        expected_rows = [
+            [
+                ['0.0', 0, 0, 'foo', 1, '', 'c', '---'],
+                ['0.1', 0, 1, '---', '---', '---', '---', '---'],
+            ],
+            [
+                ['1.0', 1, 0, 'bar', '', 1, '', '---'],
+            ],
+        ]
+
+        row_extractor = table_configuration.get_row_extractor(split_columns=True)
+        for row_number, (submission, expected) in enumerate(zip(submissions, expected_rows)):
+            self.assertEqual([row.data for row in row_extractor.get_rows(submission, row_number)], expected)
+            self.assertEqual(
+                [row.data for row in table_configuration.get_rows(submission, row_number, split_columns=True)],
+                expected
+            )
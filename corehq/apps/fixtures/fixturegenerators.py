@@ -1,12 +1,14 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 from collections import defaultdict
+from hashlib import sha1
 from xml.etree import cElementTree as ElementTree
 from io import BytesIO
 
 from casexml.apps.phone.fixtures import FixtureProvider
 from casexml.apps.phone.utils import ITEMS_COMMENT_PREFIX
-from corehq.apps.fixtures.models import FixtureDataItem, FixtureDataType, FIXTURE_BUCKET
+from corehq.apps.fixtures.models import FixtureDataItem, FixtureDataType, FIXTURE_BUCKET, USER_FIXTURE_BUCKET
+from corehq.apps.fixtures.utils import get_user_fixture_cache_version
 from corehq.apps.products.fixtures import product_fixture_generator_json
 from corehq.apps.programs.fixtures import program_fixture_generator_json
 from corehq.blobs import get_blob_db
@@ -22,6 +24,10 @@ from .utils import get_index_schema_node
 # This is an optimization to avoid an extra XML parse/serialize cycle.
 GLOBAL_USER_ID = 'global-user-id-7566F038-5000-4419-B3EF-5349FB2FF2E9'
 
+# minutes before a user's rendered item lists are removed from the blob db;
+# they are not served once invalidated, this only cleans them up
+USER_FIXTURE_CACHE_TIMEOUT = 24 * 60
+
 
 def item_lists_by_domain(domain):
     ret = list()
@@ -70,7 +76,7 @@ class ItemListsProvider(FixtureProvider):
         if global_types:
             items.extend(self.get_global_items(global_types, restore_state))
         if user_types:
-            items.extend(self.get_user_items(user_types, restore_user))
+            items.extend(self.get_user_items(user_types, restore_state))
         return items
 
     def get_global_items(self, global_types, restore_state):
@@ -87,16 +93,10 @@ class ItemListsProvider(FixtureProvider):
             except NotFound:
                 pass
         global_items = self._get_global_items(global_types, domain)
-        io = BytesIO()
-        io.write(ITEMS_COMMENT_PREFIX)
-        io.write(bytes(len(global_items)))
-        io.write(b'-->')
+        db.put(_get_cache_content(global_items), domain, FIXTURE_BUCKET)
         for element in global_items:
-            io.write(ElementTree.tostring(element, encoding='utf-8'))
             # change user_id AFTER writing to string for the cache
             element.attrib["user_id"] = user_id
-        io.seek(0)
-        db.put(io, domain, FIXTURE_BUCKET)
         return global_items
 
     def _get_global_items(self, global_types, domain):
@@ -107,7 +107,36 @@ class ItemListsProvider(FixtureProvider):
             items_by_type[data_type].append(item)
         return self._get_fixtures(global_types, items_by_type, GLOBAL_USER_ID)
 
-    def get_user_items(self, user_types, restore_user):
+    def get_user_items(self, user_types, restore_state):
+        """
+        The rendered items are cached per user. The cache key changes when the
+        user's groups or location, or any of the data types change, and all
+        users' items are invalidated by `clear_user_fixture_cache` when fixture
+        data or ownership changes.
+        """
+        restore_user = restore_state.restore_user
+        db = get_blob_db()
+        bucket = '/'.join((USER_FIXTURE_BUCKET, restore_user.domain))
+        identifier = self._get_user_items_cache_key(user_types, restore_user)
+        if not restore_state.overwrite_cache:
+            try:
+                data = db.get(identifier, bucket).read()
+                return [data] if data else []
+            except NotFound:
+                pass
+        user_items = self._get_user_items(user_types, restore_user)
+        db.put(_get_cache_content(user_items), identifier, bucket, timeout=USER_FIXTURE_CACHE_TIMEOUT)
+        return user_items
+
+    def _get_user_items_cache_key(self, user_types, restore_user):
+        key_parts = [get_user_fixture_cache_version(restore_user.domain), restore_user.user_id]
+        for owner_type, owner_ids in sorted(restore_user.get_fixture_owner_ids().items()):
+            key_parts.extend('{}:{}'.format(owner_type, owner_id) for owner_id in sorted(owner_ids))
+        for data_type_id, data_type in sorted(user_types.items()):
+            key_parts.append('{}:{}'.format(data_type_id, data_type._rev))
+        return sha1(' '.join(key_parts).encode('utf-8')).hexdigest()
+
+    def _get_user_items(self, user_types, restore_user):
         items_by_type = defaultdict(list)
         for item in restore_user.get_fixture_data_items():
             try:
@@ -163,4 +192,15 @@ class ItemListsProvider(FixtureProvider):
         return get_index_schema_node(fixture_id, attrs_to_index)
 
 
+def _get_cache_content(elements):
+    io = BytesIO()
+    io.write(ITEMS_COMMENT_PREFIX)
+    io.write(bytes(len(elements)))
+    io.write(b'-->')
+    for element in elements:
+        io.write(ElementTree.tostring(element, encoding='utf-8'))
+    io.seek(0)
+    return io
+
+
 item_lists = ItemListsProvider()
@@ -12,7 +12,7 @@ from corehq.apps.fixtures.dbaccessors import (
 )
 from corehq.apps.fixtures.exceptions import FixtureException, FixtureTypeCheckError
 from corehq.apps.fixtures.utils import clean_fixture_field_name, \
-    get_fields_without_attributes
+    get_fields_without_attributes, clear_user_fixture_cache
 from corehq.apps.users.models import CommCareUser
 from corehq.apps.fixtures.exceptions import FixtureVersionError
 from dimagi.ext.couchdbkit import Document, DocumentSchema, DictProperty, StringProperty, StringListProperty, SchemaListProperty, IntegerProperty, BooleanProperty
@@ -24,6 +24,7 @@ from corehq.apps.locations.models import SQLLocation
 import six
 
 FIXTURE_BUCKET = 'domain-fixtures'
+USER_FIXTURE_BUCKET = 'user-domain-fixtures'
 
 
 class FixtureTypeField(DocumentSchema):
@@ -227,13 +228,23 @@ class FixtureDataItem(Document):
         return self._data_type
 
     def add_owner(self, owner, owner_type, transaction=None):
+        """
+        Callers that pass in a transaction must call `clear_user_fixture_cache`
+        once it has been committed. Otherwise it is called here.
+        """
         assert(owner.domain == self.domain)
-        with transaction or CouchTransaction() as transaction:
+        with transaction or CouchTransaction() as _transaction:
             o = FixtureOwnership(domain=self.domain, owner_type=owner_type, owner_id=owner.get_id, data_item_id=self.get_id)
-            transaction.save(o)
+            _transaction.save(o)
+        if transaction is None:
+            clear_user_fixture_cache(self.domain)
         return o
 
-    def remove_owner(self, owner, owner_type):
+    def remove_owner(self, owner, owner_type, transaction=None):
+        """
+        The ownership is deleted right away, but like `add_owner` the cache is
+        left to be cleared by callers that pass in a transaction.
+        """
         for ownership in FixtureOwnership.view('fixtures/ownership',
             key=[self.domain, 'by data_item and ' + owner_type, self.get_id, owner.get_id],
             reduce=False,
@@ -254,24 +265,26 @@ class FixtureDataItem(Document):
                     data_type_id=self.data_type_id,
                     domain=self.domain
                 ))
+        if transaction is None:
+            clear_user_fixture_cache(self.domain)
 
     def add_user(self, user, transaction=None):
         return self.add_owner(user, 'user', transaction=transaction)
 
-    def remove_user(self, user):
-        return self.remove_owner(user, 'user')
+    def remove_user(self, user, transaction=None):
+        return self.remove_owner(user, 'user', transaction=transaction)
 
     def add_group(self, group, transaction=None):
         return self.add_owner(group, 'group', transaction=transaction)
 
-    def remove_group(self, group):
-        return self.remove_owner(group, 'group')
+    def remove_group(self, group, transaction=None):
+        return self.remove_owner(group, 'group', transaction=transaction)
 
     def add_location(self, location, transaction=None):
         return self.add_owner(location, 'location', transaction=transaction)
 
-    def remove_location(self, location):
-        return self.remove_owner(location, 'location')
+    def remove_location(self, location, transaction=None):
+        return self.remove_owner(location, 'location', transaction=transaction)
 
     def type_check(self):
         fields = set(self.fields.keys())
@@ -356,19 +369,26 @@ class FixtureDataItem(Document):
         return SQLLocation.objects.filter(location_id__in=loc_ids)
 
     @classmethod
-    def by_user(cls, user, wrap=True):
-        group_ids = Group.by_user(user, wrap=False)
-        loc_ids = user.sql_location.path if user.sql_location else []
-
-        def make_keys(owner_type, ids):
-            return [[user.domain, 'data_item by {}'.format(owner_type), id_]
-                    for id_ in ids]
+    def get_owner_ids_for_user(cls, user):
+        """
+        :return: dict of owner type -> ids of the owners whose items the user gets
+        """
+        return {
+            'user': [user.user_id],
+            'group': Group.by_user(user, wrap=False),
+            'location': user.sql_location.path if user.sql_location else [],
+        }
 
+    @classmethod
+    def by_user(cls, user, wrap=True):
+        keys = [
+            [user.domain, 'data_item by {}'.format(owner_type), id_]
+            for owner_type, ids in six.iteritems(cls.get_owner_ids_for_user(user))
+            for id_ in ids
+        ]
         fixture_ids = set(
             FixtureOwnership.get_db().view('fixtures/ownership',
-                keys=(make_keys('user', [user.user_id]) +
-                      make_keys('group', group_ids) +
-                      make_keys('location', loc_ids)),
+                keys=keys,
                 reduce=False,
                 wrapper=lambda r: r['value'],
             )
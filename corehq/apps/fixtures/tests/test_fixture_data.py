@@ -4,6 +4,7 @@ from xml.etree import cElementTree as ElementTree
 
 import six
 from django.test import TestCase
+from mock import patch
 
 from casexml.apps.case.tests.util import check_xml_line_by_line
 from casexml.apps.phone.tests.utils import call_fixture_generator
@@ -12,10 +13,11 @@ from corehq.apps.fixtures.dbaccessors import delete_all_fixture_data_types, \
     get_fixture_data_types_in_domain
 from corehq.apps.fixtures.exceptions import FixtureVersionError
 from corehq.apps.fixtures.models import FixtureDataType, FixtureTypeField, \
-    FixtureDataItem, FieldList, FixtureItemField, FixtureOwnership, FIXTURE_BUCKET
+    FixtureDataItem, FieldList, FixtureItemField, FixtureOwnership, FIXTURE_BUCKET, USER_FIXTURE_BUCKET
 from corehq.apps.users.dbaccessors.all_commcare_users import delete_all_users
 from corehq.apps.users.models import CommCareUser
 from corehq.blobs import get_blob_db
+from dimagi.utils.couch.bulk import CouchTransaction
 
 
 class FixtureDataTest(TestCase):
@@ -106,6 +108,7 @@ class FixtureDataTest(TestCase):
         delete_all_fixture_data_types()
         get_fixture_data_types_in_domain.clear(self.domain)
         get_blob_db().delete(self.domain, FIXTURE_BUCKET)
+        get_blob_db().delete(bucket='/'.join((USER_FIXTURE_BUCKET, self.domain)))
         super(FixtureDataTest, self).tearDown()
 
     def test_xml(self):
@@ -299,6 +302,28 @@ class FixtureDataTest(TestCase):
             for f in call_fixture_generator(fixturegenerators.item_lists, sammy)]
         self.assertEqual({item.attrib['user_id'] for item in fixtures}, {sammy.user_id})
 
+    def test_cached_user_fixture(self):
+        restore_user = self.user.to_ota_restore_user()
+        fixture, = call_fixture_generator(fixturegenerators.item_lists, restore_user)
+        self.assertIn(b'Delhi_id', ElementTree.tostring(fixture))
+
+        cached, = call_fixture_generator(fixturegenerators.item_lists, restore_user)
+        self.assertIsInstance(cached, six.binary_type)
+        self.assertIn(b'Delhi_id', cached)
+
+        # ownership changes invalidate the cache
+        self.data_item.remove_user(self.user)
+        fixture, = call_fixture_generator(fixturegenerators.item_lists, restore_user)
+        self.assertNotIn(b'Delhi_id', ElementTree.tostring(fixture))
+        self.fixture_ownership = self.data_item.add_user(self.user)
+
+    def test_ownership_changes_in_transaction_leave_cache_to_caller(self):
+        with patch('corehq.apps.fixtures.models.clear_user_fixture_cache') as clear_cache:
+            with CouchTransaction() as transaction:
+                self.data_item.remove_user(self.user, transaction=transaction)
+                self.fixture_ownership = self.data_item.add_user(self.user, transaction=transaction)
+        clear_cache.assert_not_called()
+
     def make_data_type(self, name, is_global):
         data_type = FixtureDataType(
             domain=self.domain,
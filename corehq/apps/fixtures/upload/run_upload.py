@@ -152,13 +152,13 @@ def _run_fixture_upload(domain, workbook, replace=False, task=None):
 
                 old_groups = old_data_item.groups
                 for group in old_groups:
-                    old_data_item.remove_group(group)
+                    old_data_item.remove_group(group, transaction=transaction)
                 old_users = old_data_item.users
                 for user in old_users:
-                    old_data_item.remove_user(user)
+                    old_data_item.remove_user(user, transaction=transaction)
                 old_locations = old_data_item.locations
                 for location in old_locations:
-                    old_data_item.remove_location(location)
+                    old_data_item.remove_location(location, transaction=transaction)
 
                 for group_name in di.get('group', []):
                     group = group_memoizer.by_name(group_name)
@@ -181,7 +181,7 @@ def _run_fixture_upload(domain, workbook, replace=False, task=None):
                         continue
                     user = CommCareUser.get_by_username(username)
                     if user:
-                        old_data_item.add_user(user)
+                        old_data_item.add_user(user, transaction=transaction)
                     else:
                         return_val.errors.append(
                             _("Unknown user: '%(name)s'. But the row is successfully added")
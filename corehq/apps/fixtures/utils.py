@@ -1,8 +1,11 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 import re
+import uuid
 from xml.etree import cElementTree as ElementTree
 
+from django.core.cache import cache
+
 from corehq.blobs import get_blob_db
 
 BAD_SLUG_PATTERN = r"([/\\<>\s])"
@@ -62,3 +65,31 @@ def get_index_schema_node(fixture_id, attrs_to_index):
 def clear_fixture_cache(domain):
     from corehq.apps.fixtures.models import FIXTURE_BUCKET
     get_blob_db().delete(domain, FIXTURE_BUCKET)
+    clear_user_fixture_cache(domain)
+
+
+def _user_fixture_cache_version_key(domain):
+    return 'user-fixture-cache-version-{}'.format(domain)
+
+
+def get_user_fixture_cache_version(domain):
+    """
+    The version of the rendered user-scoped item lists cached for a domain.
+    It is part of the key of every cached item list so that all of them can
+    be invalidated at once by changing it.
+    """
+    key = _user_fixture_cache_version_key(domain)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def clear_user_fixture_cache(domain):
+    """
+    Invalidate the rendered user-scoped item lists of all users in a domain.
+    The cached blobs themselves are left to expire.
+    """
+    cache.set(_user_fixture_cache_version_key(domain), uuid.uuid4().hex, timeout=None)
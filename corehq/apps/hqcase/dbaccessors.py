@@ -148,6 +148,15 @@ def get_cases_in_domain_by_external_id(domain, external_id):
     ).all()
 
 
+def get_cases_in_domain_by_external_ids(domain, external_ids):
+    return CommCareCase.view(
+        'cases_by_domain_external_id/view',
+        keys=[[domain, external_id] for external_id in external_ids],
+        reduce=False,
+        include_docs=True,
+    ).all()
+
+
 def get_supply_point_case_in_domain_by_id(
         domain, supply_point_integer_id):
     from corehq.apps.commtrack.models import SupplyPointCase
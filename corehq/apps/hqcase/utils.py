@@ -244,7 +244,7 @@ def update_case(domain, case_id, case_properties=None, close=False,
     )
 
 
-def bulk_update_cases(domain, case_changes, device_id):
+def bulk_update_cases(domain, case_changes, device_id, user_id=None, xmlns=None):
     """
     Updates or closes a list of cases (or both) by submitting a form.
     domain - the cases' domain
@@ -254,6 +254,8 @@ def bulk_update_cases(domain, case_changes, device_id):
                           to ignore case updates, leave this argument out
         close - True to close the case, False otherwise
     device_id - see submit_case_blocks device_id docs
+    user_id - the user id to submit the form as
+    xmlns - pass in an xmlns to use it instead of the default
     """
     case_blocks = []
     for case_id, case_properties, close in case_changes:
@@ -262,7 +264,7 @@ def bulk_update_cases(domain, case_changes, device_id):
         # An exception is raised if not
         case_block = ElementTree.tostring(case_block.as_xml())
         case_blocks.append(case_block)
-    return submit_case_blocks(case_blocks, domain, device_id=device_id)
+    return submit_case_blocks(case_blocks, domain, user_id=user_id, xmlns=xmlns, device_id=device_id)
 
 
 def resave_case(domain, case, send_post_save_signal=True):
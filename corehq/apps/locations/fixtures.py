@@ -2,6 +2,9 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 from itertools import groupby
 from collections import defaultdict
+from hashlib import sha1
+from io import BytesIO
+from xml.etree import cElementTree as ElementTree
 from xml.etree.cElementTree import Element
 
 import six
@@ -12,11 +15,20 @@ from django_cte import With
 from django_cte.raw import raw_cte_sql
 
 from casexml.apps.phone.fixtures import FixtureProvider
+from casexml.apps.phone.utils import ITEMS_COMMENT_PREFIX
 from corehq.apps.custom_data_fields.dbaccessors import get_by_domain_and_type
 from corehq.apps.fixtures.utils import get_index_schema_node
 from corehq.apps.locations.models import SQLLocation, LocationType, LocationFixtureConfiguration
+from corehq.blobs import get_blob_db
+from corehq.blobs.exceptions import NotFound
 from corehq import toggles
 
+LOCATION_FIXTURE_BUCKET = 'location-fixtures'
+# stands in for the user id in cached fixtures, so must never be part of any other value in them
+CACHED_FIXTURE_USER_ID = 'location-fixture-user-id-0D0E5DBA-6B4C-4F6B-9F2B-A2A5E0C1C7F3'
+# minutes before a rendered location fixture is removed from the blob db
+LOCATION_FIXTURE_CACHE_TIMEOUT = 24 * 60
+
 
 class LocationSet(object):
     """
@@ -95,8 +107,62 @@ class LocationFixtureProvider(FixtureProvider):
             return []
 
         data_fields = _get_location_data_fields(restore_user.domain)
-        return self.serializer.get_xml_nodes(self.id, restore_user, locations_queryset, data_fields)
+        return self._get_xml_nodes(restore_state, locations_queryset, data_fields)
+
+    def _get_xml_nodes(self, restore_state, locations_queryset, data_fields):
+        """
+        The rendered fixture only depends on the locations synced, the location
+        types and the location fields, so it is cached in the blob db keyed on
+        their state and shared by all users syncing the same locations. Any
+        change to a location or location type updates its last_modified date,
+        which changes the key.
 
+        Cached fixtures are returned as bytes, with the user id substituted.
+        """
+        restore_user = restore_state.restore_user
+        db = get_blob_db()
+        bucket = '/'.join((LOCATION_FIXTURE_BUCKET, restore_user.domain))
+        identifier = self._get_cache_key(restore_user.domain, locations_queryset, data_fields)
+        if not restore_state.overwrite_cache:
+            try:
+                data = db.get(identifier, bucket).read()
+            except NotFound:
+                pass
+            else:
+                return [data.replace(CACHED_FIXTURE_USER_ID.encode('utf-8'), restore_user.user_id.encode('utf-8'))]
+
+        nodes = self.serializer.get_xml_nodes(self.id, restore_user, locations_queryset, data_fields)
+        db.put(_get_cache_content(nodes), identifier, bucket, timeout=LOCATION_FIXTURE_CACHE_TIMEOUT)
+        return nodes
+
+    def _get_cache_key(self, domain, locations_queryset, data_fields):
+        location_state = sorted(
+            locations_queryset.prefetch_related(None).values_list('location_id', 'last_modified')
+        )
+        location_type_state = sorted(
+            LocationType.objects.filter(domain=domain).values_list('id', 'last_modified')
+        )
+        field_state = [(field.slug, field.index_in_fixture) for field in data_fields]
+        state = repr((self.id, location_state, location_type_state, field_state))
+        return sha1(state.encode('utf-8')).hexdigest()
+
+
+def _get_cache_content(nodes):
+    """Serialize the nodes for the cache, with the user id replaced and the item count prefixed"""
+    user_nodes = [node for node in nodes if 'user_id' in node.attrib]
+    user_ids = [node.attrib['user_id'] for node in user_nodes]
+    for node in user_nodes:
+        node.attrib['user_id'] = CACHED_FIXTURE_USER_ID
+    try:
+        content = BytesIO()
+        content.write(ITEMS_COMMENT_PREFIX + ('%d-->' % len(nodes)).encode('utf-8'))
+        for node in nodes:
+            content.write(ElementTree.tostring(node, encoding='utf-8'))
+    finally:
+        for node, user_id in zip(user_nodes, user_ids):
+            node.attrib['user_id'] = user_id
+    content.seek(0)
+    return content
 
 class HierarchicalLocationSerializer(object):
 
@@ -27,7 +27,8 @@ from .util import (
     setup_locations_with_structure,
     LocationStructure,
     LocationTypeStructure,
-    LocationHierarchyTestCase
+    LocationHierarchyTestCase,
+    get_location_fixture_nodes,
 )
 from ..fixtures import _location_to_fixture, LocationSet, should_sync_locations, location_fixture_generator, \
     flat_location_fixture_generator, should_sync_flat_fixture, should_sync_hierarchical_fixture, \
@@ -84,7 +85,7 @@ class FixtureHasLocationsMixin(TestXmlMixin):
     @flag_enabled('HIERARCHICAL_LOCATION_FIXTURE')
     def _assert_fixture_matches_file(self, xml_name, desired_locations, flat=False):
         generator = flat_location_fixture_generator if flat else location_fixture_generator
-        fixture = ElementTree.tostring(call_fixture_generator(generator, self.user)[-1])
+        fixture = ElementTree.tostring(get_location_fixture_nodes(generator, self.user)[-1])
         desired_fixture = self._assemble_expected_fixture(xml_name, desired_locations)
         self.assertXmlEqual(desired_fixture, fixture)
 
@@ -118,7 +119,7 @@ class LocationFixturesTest(LocationHierarchyTestCase, FixtureHasLocationsMixin):
     @flag_enabled('HIERARCHICAL_LOCATION_FIXTURE')
     def test_no_user_locations_returns_empty(self):
         empty_fixture = EMPTY_LOCATION_FIXTURE_TEMPLATE.format(self.user.user_id)
-        fixture = ElementTree.tostring(call_fixture_generator(location_fixture_generator, self.user)[0])
+        fixture = ElementTree.tostring(get_location_fixture_nodes(location_fixture_generator, self.user)[0])
         self.assertXmlEqual(empty_fixture, fixture)
 
     def test_metadata(self):
@@ -154,6 +155,25 @@ class LocationFixturesTest(LocationHierarchyTestCase, FixtureHasLocationsMixin):
             ['Massachusetts', 'Suffolk', 'Boston', 'Revere']
         )
 
+    @flag_enabled('HIERARCHICAL_LOCATION_FIXTURE')
+    def test_cached_location_fixture(self):
+        self.user._couch_user.set_location(self.locations['Suffolk'])
+        serializer = location_fixture_generator.serializer
+        locations = ['Massachusetts', 'Suffolk', 'Boston', 'Revere']
+
+        self._assert_fixture_matches_file('simple_fixture', locations)
+        cached, = call_fixture_generator(location_fixture_generator, self.user)
+        self.assertIsInstance(cached, six.binary_type)
+        self.assertIn('user_id="{}"'.format(self.user.user_id).encode('utf-8'), cached)
+        with mock.patch.object(serializer, 'get_xml_nodes', wraps=serializer.get_xml_nodes) as get_xml_nodes:
+            self._assert_fixture_matches_file('simple_fixture', locations)
+            get_xml_nodes.assert_not_called()
+
+            # changing a synced location invalidates the cached fixture
+            self.locations['Boston'].save()
+            self._assert_fixture_matches_file('simple_fixture', locations)
+            get_xml_nodes.assert_called_once()
+
     def test_multiple_locations(self):
         self.user._couch_user.add_to_assigned_locations(self.locations['Suffolk'])
         self.user._couch_user.add_to_assigned_locations(self.locations['New York City'])
@@ -343,7 +363,7 @@ class TestIndexedLocationsFixture(LocationHierarchyTestCase, FixtureHasLocations
             'index_location_fixtures',
             ['Massachusetts', 'Suffolk', 'Boston', 'Revere', 'Middlesex', 'Cambridge', 'Somerville'],
         )
-        fixture_nodes = call_fixture_generator(flat_location_fixture_generator, self.user)
+        fixture_nodes = get_location_fixture_nodes(flat_location_fixture_generator, self.user)
         self.assertEqual(len(fixture_nodes), 2)  # fixture schema, then fixture
 
         # check the fixture like usual
@@ -427,7 +447,7 @@ class ForkedHierarchiesTest(TestCase, FixtureHasLocationsMixin):
         location_type.include_without_expanding = self.locations['DTO'].location_type
         location_type.save()
 
-        fixture = ElementTree.tostring(call_fixture_generator(flat_location_fixture_generator, self.user)[-1])
+        fixture = ElementTree.tostring(get_location_fixture_nodes(flat_location_fixture_generator, self.user)[-1])
 
         for location_name in ('CDST1', 'CDST', 'DRTB1', 'DRTB', 'DTO1', 'DTO', 'CTO', 'CTO1', 'CTD'):
             self.assertTrue(location_name in fixture)
@@ -483,7 +503,7 @@ class LocationFixturesDataTest(LocationHierarchyTestCase, FixtureHasLocationsMix
     def test_metadata_added_to_all_nodes(self):
         mass = self.locations['Massachusetts']
         self.user._couch_user.set_location(mass)
-        fixture = call_fixture_generator(flat_location_fixture_generator, self.user)[1]  # first node is index
+        fixture = get_location_fixture_nodes(flat_location_fixture_generator, self.user)[1]  # first node is index
         location_nodes = fixture.findall('locations/location')
         self.assertEqual(7, len(location_nodes))
         for location_node in location_nodes:
@@ -503,7 +523,7 @@ class LocationFixturesDataTest(LocationHierarchyTestCase, FixtureHasLocationsMix
 
         self.addCleanup(_clear_metadata)
         self.user._couch_user.set_location(mass)
-        fixture = call_fixture_generator(flat_location_fixture_generator, self.user)[1]  # first node is index
+        fixture = get_location_fixture_nodes(flat_location_fixture_generator, self.user)[1]  # first node is index
         mass_data = [
             field for field in fixture.find('locations/location[@id="{}"]/location_data'.format(mass.location_id))
         ]
@@ -521,7 +541,7 @@ class LocationFixturesDataTest(LocationHierarchyTestCase, FixtureHasLocationsMix
 
         self.addCleanup(_clear_metadata)
         self.user._couch_user.set_location(mass)
-        fixture = call_fixture_generator(flat_location_fixture_generator, self.user)[1]  # first node is index
+        fixture = get_location_fixture_nodes(flat_location_fixture_generator, self.user)[1]  # first node is index
         self.assertEqual(
             'Red Sox',
             fixture.find(
@@ -544,7 +564,7 @@ class WebUserLocationFixturesTest(LocationHierarchyTestCase, FixtureHasLocations
     @flag_enabled('HIERARCHICAL_LOCATION_FIXTURE')
     def test_no_user_locations_returns_empty(self):
         empty_fixture = EMPTY_LOCATION_FIXTURE_TEMPLATE.format(self.user.user_id)
-        fixture = ElementTree.tostring(call_fixture_generator(location_fixture_generator, self.user)[0])
+        fixture = ElementTree.tostring(get_location_fixture_nodes(location_fixture_generator, self.user)[0])
         self.assertXmlEqual(empty_fixture, fixture)
 
     def test_simple_location_fixture(self):
@@ -4,7 +4,6 @@ from mock import patch
 
 from django.test import TestCase
 
-from casexml.apps.phone.tests.utils import call_fixture_generator
 from corehq.apps.commtrack.tests.util import bootstrap_location_types
 from corehq.apps.domain.shortcuts import create_domain
 from corehq.apps.groups.exceptions import CantSaveException
@@ -12,7 +11,7 @@ from corehq.apps.users.models import CommCareUser
 from corehq.util.test_utils import flag_enabled
 
 from ..fixtures import location_fixture_generator
-from .util import make_loc
+from .util import get_location_fixture_nodes, make_loc
 
 
 @flag_enabled('HIERARCHICAL_LOCATION_FIXTURE')
@@ -165,7 +164,7 @@ class LocationGroupTest(TestCase):
         self.user.unset_location()
         self.addCleanup(self.user.set_location, self.loc)
 
-        fixture = call_fixture_generator(location_fixture_generator, self.user.to_ota_restore_user())
+        fixture = get_location_fixture_nodes(location_fixture_generator, self.user.to_ota_restore_user())
         self.assertEqual(len(fixture), 1)
         self.assertEquals(len(fixture[0].findall('.//state')), 0)
 
@@ -176,5 +175,5 @@ class LocationGroupTest(TestCase):
         """
         self.user.unset_location()
         self.addCleanup(self.user.set_location, self.loc)
-        fixture = call_fixture_generator(location_fixture_generator, self.user.to_ota_restore_user())
+        fixture = get_location_fixture_nodes(location_fixture_generator, self.user.to_ota_restore_user())
         self.assertEqual(len(fixture), 0)
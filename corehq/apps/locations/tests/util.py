@@ -1,7 +1,11 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 from collections import namedtuple
+from xml.etree import cElementTree as ElementTree
+
+import six
 from django.test import TestCase
+from casexml.apps.phone.tests.utils import call_fixture_generator
 from dimagi.utils.couch.database import iter_bulk_delete
 from corehq.util.test_utils import unit_testing_only
 from corehq.apps.commtrack.models import SupplyPointCase
@@ -25,6 +29,17 @@ def make_loc(code, name=None, domain=TEST_DOMAIN, type=TEST_LOCATION_TYPE,
     return loc
 
 
+
+def get_location_fixture_nodes(generator, restore_user, **kwargs):
+    """Call a location fixture generator, parsing the fixtures it got from the cache"""
+    nodes = []
+    for node in call_fixture_generator(generator, restore_user, **kwargs):
+        if isinstance(node, six.binary_type):
+            nodes.extend(ElementTree.fromstring(b"<cached-fixture>%s</cached-fixture>" % node))
+        else:
+            nodes.append(node)
+    return nodes
+
 @unit_testing_only
 def delete_all_locations():
     ids = [
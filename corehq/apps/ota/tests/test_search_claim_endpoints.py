@@ -22,7 +22,12 @@ from corehq.apps.domain.shortcuts import create_domain
 from corehq.apps.users.models import CommCareUser
 from corehq.elastic import get_es_new, ES_DEFAULT_INSTANCE
 from corehq.apps.es.tests.utils import ElasticTestMixin
-from corehq.apps.case_search.utils import CaseSearchCriteria
+from corehq.apps.case_search.utils import (
+    CASE_SEARCH_CLEAR_INTERVAL,
+    CASE_SEARCH_INDEX_REFRESH_SECONDS,
+    CaseSearchCriteria,
+    clear_case_search_results_cache,
+)
 from corehq.form_processor.interfaces.dbaccessors import CaseAccessors
 from corehq.form_processor.tests.utils import run_with_all_backends
 from corehq.pillows.case_search import CaseSearchReindexerFactory
@@ -451,6 +456,37 @@ class CaseClaimEndpointTests(TestCase):
                                    re.sub(PATTERN, TIMESTAMP, response.content))),
             known_result)
 
+    @patch('corehq.apps.case_search.utils.CASE_SEARCH_INDEX_REFRESH_SECONDS', -1)
+    @patch('corehq.apps.es.es_query.run_query')
+    def test_search_results_cached(self, run_query_mock):
+        client = Client()
+        client.login(username=USERNAME, password=PASSWORD)
+        url = reverse('remote_search', kwargs={'domain': DOMAIN})
+        client.get(url, {'name': CASE_NAME, 'case_type': CASE_TYPE})
+        client.get(url, {'case_type': CASE_TYPE, 'name': CASE_NAME})
+        self.assertEqual(run_query_mock.call_count, 1)
+
+        client.get(url, {'name': 'Boaty McBoatface', 'case_type': CASE_TYPE})
+        self.assertEqual(run_query_mock.call_count, 2)
+
+        clear_case_search_results_cache(DOMAIN, CASE_TYPE)
+        client.get(url, {'name': CASE_NAME, 'case_type': CASE_TYPE})
+        self.assertEqual(run_query_mock.call_count, 3)
+
+    @patch('corehq.apps.es.es_query.run_query')
+    def test_search_results_cached_briefly_after_clear(self, run_query_mock):
+        client = Client()
+        client.login(username=USERNAME, password=PASSWORD)
+        url = reverse('remote_search', kwargs={'domain': DOMAIN})
+        clear_case_search_results_cache(DOMAIN, CASE_TYPE)
+        # the search may be missing changes made since then
+        cache = get_redis_default_cache()
+        with patch('corehq.apps.case_search.utils.get_redis_default_cache', return_value=cache), \
+                patch.object(cache, 'set', wraps=cache.set) as set_mock:
+            client.get(url, {'name': CASE_NAME, 'case_type': CASE_TYPE})
+        timeout = set_mock.call_args[0][2]
+        self.assertLessEqual(timeout, CASE_SEARCH_CLEAR_INTERVAL + CASE_SEARCH_INDEX_REFRESH_SECONDS)
+
     @patch('corehq.apps.es.es_query.run_query')
     def test_search_query_addition(self, run_query_mock):
         self.maxDiff = None
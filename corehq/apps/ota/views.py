@@ -2,6 +2,7 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 import os
+import time
 
 from couchdbkit import ResourceConflict
 from distutils.version import LooseVersion
@@ -28,7 +29,12 @@ from corehq.const import OPENROSA_VERSION_MAP
 from corehq.middleware import OPENROSA_VERSION_HEADER
 from corehq.apps.app_manager.util import LatestAppInfo
 from corehq.apps.case_search.models import QueryMergeException
-from corehq.apps.case_search.utils import CaseSearchCriteria
+from corehq.apps.case_search.utils import (
+    CaseSearchCriteria,
+    cache_case_search_results,
+    get_cached_case_search_results,
+    get_case_search_results_cache_key,
+)
 from corehq.apps.domain.decorators import (
     mobile_auth,
     check_domain_migration,
@@ -36,7 +42,8 @@ from corehq.apps.domain.decorators import (
 )
 from corehq.apps.domain.models import Domain
 from corehq.apps.es.case_search import flatten_result
-from corehq.apps.users.models import CouchUser, DeviceAppMeta
+from corehq.apps.users.models import CouchUser
+from corehq.apps.users.reporting_metadata import buffer_heartbeat_metadata
 from corehq.apps.locations.permissions import location_safe
 from corehq.form_processor.exceptions import CaseNotFound
 from corehq.util.quickcache import quickcache
@@ -47,7 +54,7 @@ from .models import SerialIdBucket, MobileRecoveryMeasure
 from .utils import (
     demo_user_restore_response, get_restore_user, is_permitted_to_restore,
     handle_401_response)
-from corehq.apps.users.util import update_device_meta, update_latest_builds, update_last_sync
+from corehq.apps.users.util import update_heartbeat_metadata
 
 
 PROFILE_PROBABILITY = float(os.getenv(b'COMMCARE_PROFILE_RESTORE_PROBABILITY', 0))
@@ -82,19 +89,25 @@ def search(request, domain):
         case_type = criteria.pop('case_type')
     except KeyError:
         return HttpResponse('Search request must specify case type', status=400)
-    try:
-        case_search_criteria = CaseSearchCriteria(domain, case_type, criteria)
-        search_es = case_search_criteria.search_es
-    except QueryMergeException as e:
-        return _handle_query_merge_exception(request, e)
-    try:
-        hits = search_es.run().raw_hits
-    except Exception as e:
-        return _handle_es_exception(request, e, case_search_criteria.query_addition_debug_details)
-
-    # Even if it's a SQL domain, we just need to render the hits as cases, so CommCareCase.wrap will be fine
-    cases = [CommCareCase.wrap(flatten_result(result, include_score=True)) for result in hits]
-    fixtures = CaseDBFixture(cases).fixture
+    searched_at = time.time()
+    cache_key = get_case_search_results_cache_key(domain, case_type, criteria)
+    fixtures = get_cached_case_search_results(cache_key) if cache_key else None
+    if fixtures is None:
+        try:
+            case_search_criteria = CaseSearchCriteria(domain, case_type, criteria)
+            search_es = case_search_criteria.search_es
+        except QueryMergeException as e:
+            return _handle_query_merge_exception(request, e)
+        try:
+            hits = search_es.run().raw_hits
+        except Exception as e:
+            return _handle_es_exception(request, e, case_search_criteria.query_addition_debug_details)
+
+        # Even if it's a SQL domain, we just need to render the hits as cases, so CommCareCase.wrap will be fine
+        cases = [CommCareCase.wrap(flatten_result(result, include_score=True)) for result in hits]
+        fixtures = CaseDBFixture(cases).fixture
+        if cache_key:
+            cache_case_search_results(domain, case_type, cache_key, fixtures, searched_at)
     return HttpResponse(fixtures, content_type="text/xml; charset=utf-8")
 
 
@@ -296,34 +309,27 @@ def update_user_reporting_data(app_build_id, app_id, couch_user, request):
     num_unsent_forms = _safe_int(request.GET.get('num_unsent_forms', ''))
     num_quarantined_forms = _safe_int(request.GET.get('num_quarantined_forms', ''))
     commcare_version = request.GET.get('cc_version', '')
-    save_user = False
-    # if mobile cannot determine app version it sends -1
-    if app_version and app_version > 0:
-        save_user = update_latest_builds(couch_user, app_id, datetime.utcnow(), app_version)
+    # the user's last sync is only updated if the time is in the expected format
+    record_last_sync = True
     try:
         last_sync = adjust_text_to_datetime(last_sync_time)
     except iso8601.ParseError:
+        record_last_sync = False
         try:
             last_sync = string_to_utc_datetime(last_sync_time)
         except (ValueError, OverflowError):
             last_sync = None
-    else:
-        save_user |= update_last_sync(couch_user, app_id, last_sync, app_version)
-    app_meta = DeviceAppMeta(
-        app_id=app_id,
-        build_id=app_build_id,
-        build_version=app_version,
-        last_heartbeat=datetime.utcnow(),
-        last_sync=last_sync,
-        num_unsent_forms=num_unsent_forms,
-        num_quarantined_forms=num_quarantined_forms
-    )
-    save_user |= update_device_meta(
-        couch_user,
-        device_id,
-        commcare_version=commcare_version,
-        device_app_meta=app_meta,
-        save=False
+
+    if settings.USER_REPORTING_METADATA_BATCH_ENABLED:
+        buffer_heartbeat_metadata(
+            couch_user.user_id, app_id, app_build_id, app_version, device_id, last_sync,
+            num_unsent_forms, num_quarantined_forms, commcare_version, datetime.utcnow(), record_last_sync
+        )
+        return
+
+    save_user = update_heartbeat_metadata(
+        couch_user, app_id, app_build_id, app_version, device_id, last_sync,
+        num_unsent_forms, num_quarantined_forms, commcare_version, datetime.utcnow(), record_last_sync
     )
     if save_user:
         couch_user.save(fire_signals=False)
@@ -0,0 +1,29 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from django.core.management.base import BaseCommand
+
+from corehq.apps.receiverwrapper.timing import (
+    get_stage_percentiles,
+    get_stored_timings,
+    get_timing_domains,
+)
+
+
+class Command(BaseCommand):
+    help = "Report the p50 and p99 time taken by each stage of recent sampled form submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('domains', nargs="*", help='Domains to report on. Defaults to all sampled domains.')
+
+    def handle(self, domains, **options):
+        for domain in domains or get_timing_domains():
+            timings = get_stored_timings(domain)
+            if not timings:
+                continue
+            self.stdout.write("{} ({} submissions)".format(domain, len(timings)))
+            self.stdout.write("    {:<24} {:>8} {:>10} {:>10}".format('stage', 'count', 'p50 (s)', 'p99 (s)'))
+            percentiles = get_stage_percentiles(timings)
+            stages = sorted(percentiles, key=lambda stage: -percentiles[stage][1][1])
+            for stage in stages:
+                count, (p50, p99) = percentiles[stage]
+                self.stdout.write("    {:<24} {:>8} {:>10.3f} {:>10.3f}".format(stage, count, p50, p99))
@@ -0,0 +1,33 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from django.test import SimpleTestCase
+
+from corehq.apps.receiverwrapper.timing import get_stage_durations, get_stage_percentiles
+from corehq.util.timer import TimingContext
+
+
+class SubmissionTimingTest(SimpleTestCase):
+
+    def test_get_stage_durations(self):
+        with TimingContext() as timer:
+            with timer('process_xml'):
+                pass
+            with timer('save_models'):
+                with timer('publish_changes'):
+                    pass
+            with timer('save_models'):
+                pass
+        durations = get_stage_durations(timer)
+        self.assertEqual(set(durations), {'process_xml', 'save_models', 'publish_changes', 'total'})
+        self.assertEqual(durations['total'], timer.duration)
+        self.assertEqual(durations['save_models'], sum(
+            t.duration for t in timer.to_list(exclude_root=True) if t.name == 'save_models'
+        ))
+
+    def test_get_stage_percentiles(self):
+        timings = [{'total': float(i), 'process_cases': 1.0} for i in range(1, 101)]
+        timings.append({'total': 200.0})
+        self.assertEqual(get_stage_percentiles(timings), {
+            'total': (101, [51.0, 100.0]),
+            'process_cases': (100, [1.0, 1.0]),
+        })
@@ -0,0 +1,106 @@
+"""
+Per stage timings of form submissions
+
+A sample of submissions (``settings.SUBMISSION_TIMING_SAMPLE_RATE``) have the
+time taken by each stage of processing sent to datadog and kept in redis. The
+most recent ``MAX_STORED_TIMINGS`` per domain are kept there for the
+``submission_timing_report`` management command.
+
+Stages are named by the timers in ``SubmissionPost`` (e.g. ``process_cases``,
+``save_models``); ``total`` is the whole request. Stages may be nested: on SQL
+domains ``publish_changes`` is part of ``save_models``.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+import json
+import math
+import random
+from collections import defaultdict
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from corehq.util.datadog.gauges import datadog_histogram
+from dimagi.utils.couch import get_redis_client
+
+MAX_STORED_TIMINGS = 1000
+STORED_TIMINGS_TIMEOUT = 7 * 24 * 60 * 60
+TIMINGS_KEY = 'submission-timings:{}'
+DOMAINS_KEY = 'submission-timings-domains'
+
+
+def record_submission_timing(domain, submission_type, timing_context):
+    if random.random() >= settings.SUBMISSION_TIMING_SAMPLE_RATE:
+        return
+
+    durations = get_stage_durations(timing_context)
+    tags = ['domain:{}'.format(domain), 'submission_type:{}'.format(submission_type)]
+    for stage, duration in durations.items():
+        datadog_histogram('commcare.xform_submissions.stage_duration', duration, tags=tags + [
+            'stage:{}'.format(stage),
+        ])
+    _store_timing(domain, durations)
+
+
+def get_stage_durations(timing_context):
+    """
+    :returns: dict of stage name -> seconds spent in it. Stages that ran more
+    than once (e.g. for form edits) are added together.
+    """
+    durations = defaultdict(float)
+    for timer in timing_context.to_list(exclude_root=True):
+        if timer.duration is not None:
+            durations[timer.name] += timer.duration
+    durations['total'] = timing_context.duration
+    return dict(durations)
+
+
+def _store_timing(domain, durations):
+    key = TIMINGS_KEY.format(domain)
+    try:
+        pipeline = _get_client().pipeline()
+        pipeline.lpush(key, json.dumps(durations))
+        pipeline.ltrim(key, 0, MAX_STORED_TIMINGS - 1)
+        pipeline.expire(key, STORED_TIMINGS_TIMEOUT)
+        pipeline.sadd(DOMAINS_KEY, domain)
+        pipeline.execute()
+    except RedisError:
+        # timings are best effort, never fail a submission for them
+        pass
+
+
+def get_timing_domains():
+    return sorted(domain.decode('utf-8') for domain in _get_client().smembers(DOMAINS_KEY))
+
+
+def get_stored_timings(domain):
+    """
+    :returns: list of stage durations dicts, most recent first
+    """
+    return [json.loads(timing.decode('utf-8'))
+            for timing in _get_client().lrange(TIMINGS_KEY.format(domain), 0, -1)]
+
+
+def get_stage_percentiles(timings, percentiles=(50, 99)):
+    """
+    :returns: dict of stage name -> (number of timings, [duration at each percentile])
+    """
+    durations_by_stage = defaultdict(list)
+    for timing in timings:
+        for stage, duration in timing.items():
+            durations_by_stage[stage].append(duration)
+    return {
+        stage: (len(durations), [_percentile(sorted(durations), p) for p in percentiles])
+        for stage, durations in durations_by_stage.items()
+    }
+
+
+def _percentile(sorted_values, percentile):
+    # nearest-rank method
+    rank = int(math.ceil(percentile / 100 * len(sorted_values)))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def _get_client():
+    return get_redis_client().client.get_client()
@@ -21,6 +21,7 @@ from corehq.apps.receiverwrapper.auth import (
     WaivedAuthContext,
     domain_requires_auth,
 )
+from corehq.apps.receiverwrapper.timing import record_submission_timing
 from corehq.apps.receiverwrapper.util import (
     get_app_and_build_ids,
     from_demo_user,
@@ -112,6 +113,7 @@ def _process_form(request, domain, app_id, user_id, authenticated,
             submit_ip=couchforms.get_submit_ip(request),
             last_sync_token=couchforms.get_last_sync_token(request),
             openrosa_headers=couchforms.get_openrosa_headers(request),
+            timing_context=timer,
         )
 
         result = submission_post.run()
@@ -125,6 +127,7 @@ def _process_form(request, domain, app_id, user_id, authenticated,
         )
 
     _record_metrics(metric_tags, result.submission_type, response, result, timer)
+    record_submission_timing(domain, result.submission_type, timer)
 
     return response
 
@@ -0,0 +1,383 @@
+"""
+Compiles the filter / expression / indicator object trees of a data source into
+flat python closures.
+
+The objects built by the expression, filter and indicator factories are
+evaluated by walking the tree and calling ``__call__`` on every node, which for
+jsonobject backed specs means property descriptor lookups (and in some cases
+rebuilding transform functions) for every node of every document.
+Compiling happens once per data source and:
+
+- folds constants (constant expressions, transforms of constants, filters
+  that compare two constants, count indicators)
+- shares property lookups: every distinct property path in a data source is
+  looked up by a single getter which remembers its last result, so indicators
+  reading the same path only walk the document once
+- flattens nested ``and`` / ``or`` filters and short circuits them when one of
+  the sub filters is constant
+
+Anything the compiler doesn't know about is left as is, so compiled data
+sources always return the same values as the interpreted ones.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from corehq.apps.userreports.expressions.getters import (
+    DictGetter,
+    NestedDictGetter,
+    TransformedGetter,
+    transform_from_datatype,
+)
+from corehq.apps.userreports.expressions.specs import (
+    CoalesceExpressionSpec,
+    ConditionalExpressionSpec,
+    ConstantGetterSpec,
+    IdentityExpressionSpec,
+    IterationNumberExpressionSpec,
+    NestedExpressionSpec,
+    PropertyNameGetterSpec,
+    PropertyPathGetterSpec,
+    RootDocExpressionSpec,
+)
+from corehq.apps.userreports.filters import (
+    ANDFilter,
+    NamedFilter,
+    NOTFilter,
+    ORFilter,
+    SinglePropertyValueFilter,
+)
+from corehq.apps.userreports.indicators import (
+    BooleanIndicator,
+    ColumnValue,
+    CompoundIndicator,
+    RawIndicator,
+)
+from corehq.apps.userreports.operators import equal
+from corehq.apps.userreports.specs import EvaluationContext
+
+
+class Constant(object):
+    """
+    A compiled expression or filter that always returns the same value.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self, item, context=None):
+        return self.value
+
+
+def is_constant(fn):
+    return isinstance(fn, Constant)
+
+
+class PathGetter(object):
+    """
+    Equivalent of ``safe_recursive_lookup`` for a fixed path. Instances are
+    shared by everything in a data source that reads the same path and remember
+    the result for the last (item, evaluation context) they were called with.
+    """
+
+    def __init__(self, path):
+        self.path = tuple(path)
+        self._last_item = None
+        self._last_context = None
+        self._last_value = None
+
+    def __call__(self, item, context=None):
+        if context is not None and item is self._last_item and context is self._last_context:
+            return self._last_value
+
+        value = self._lookup(item)
+        if context is not None:
+            self._last_item = item
+            self._last_context = context
+            self._last_value = value
+        return value
+
+    def _lookup(self, item):
+        if not isinstance(item, dict):
+            return None
+        try:
+            for key in self.path:
+                item = item[key]
+        except (KeyError, TypeError):
+            return None
+        return item
+
+
+class CompiledDataSource(object):
+
+    def __init__(self, filter, deleted_filter, base_item_expression, indicators):
+        self.filter = filter
+        self.deleted_filter = deleted_filter
+        self.base_item_expression = base_item_expression
+        # list of (column, fn) tuples. If ``column`` is None ``fn`` returns a list
+        # of ColumnValues, otherwise it returns the value for that column
+        self.indicators = indicators
+
+    def get_items(self, document, eval_context=None):
+        if not self.filter(document, EvaluationContext(document, 0)):
+            return []
+        if self.base_item_expression is None:
+            return [document]
+
+        result = self.base_item_expression(document, eval_context)
+        if result is None:
+            return []
+        elif isinstance(result, list):
+            return result
+        else:
+            return [result]
+
+    def get_values(self, item, eval_context):
+        values = []
+        for column, fn in self.indicators:
+            if column is None:
+                values.extend(fn(item, eval_context))
+            else:
+                values.append(ColumnValue(column, fn(item, eval_context)))
+        return values
+
+    def get_all_values(self, doc, eval_context=None):
+        if not eval_context:
+            eval_context = EvaluationContext(doc)
+
+        rows = []
+        for item in self.get_items(doc, eval_context):
+            rows.append(self.get_values(item, eval_context))
+            eval_context.increment_iteration()
+        return rows
+
+
+class DataSourceCompiler(object):
+
+    def __init__(self):
+        self._path_getters = {}
+        self._compiled_named_filters = {}
+
+    def compile_data_source(self, config):
+        deleted_filter = config._get_deleted_filter()
+        return CompiledDataSource(
+            filter=self.compile_filter(config._get_main_filter()),
+            deleted_filter=self.compile_filter(deleted_filter) if deleted_filter else None,
+            base_item_expression=(
+                self.compile_expression(config.parsed_expression) if config.base_item_expression else None
+            ),
+            indicators=self.compile_indicator(config.indicators),
+        )
+
+    def path_getter(self, path):
+        path = tuple(path)
+        if path not in self._path_getters:
+            self._path_getters[path] = PathGetter(path)
+        return self._path_getters[path]
+
+    def compile_expression(self, expression):
+        if isinstance(expression, ConstantGetterSpec):
+            return Constant(expression.constant)
+
+        if isinstance(expression, IdentityExpressionSpec):
+            return lambda item, context=None: item
+
+        if isinstance(expression, IterationNumberExpressionSpec):
+            return lambda item, context=None: context.iteration
+
+        if isinstance(expression, PropertyNameGetterSpec):
+            return self._compile_property_name(expression)
+
+        if isinstance(expression, PropertyPathGetterSpec):
+            return _with_transform(
+                self.path_getter(expression.property_path),
+                transform_from_datatype(expression.datatype) if expression.datatype else None,
+            )
+
+        if isinstance(expression, DictGetter):
+            return self.path_getter([expression.property_name])
+
+        if isinstance(expression, NestedDictGetter):
+            return self.path_getter(expression.property_path)
+
+        if isinstance(expression, TransformedGetter):
+            return _with_transform(self.compile_expression(expression.getter), expression.transform)
+
+        if isinstance(expression, RootDocExpressionSpec):
+            return self._compile_root_doc(expression)
+
+        if isinstance(expression, NestedExpressionSpec):
+            return self._compile_nested(expression)
+
+        if isinstance(expression, ConditionalExpressionSpec):
+            return self._compile_conditional(expression)
+
+        if isinstance(expression, CoalesceExpressionSpec):
+            return self._compile_coalesce(expression)
+
+        return expression
+
+    def _compile_property_name(self, expression):
+        name_expression = self.compile_expression(expression._property_name_expression)
+        transform = transform_from_datatype(expression.datatype) if expression.datatype else None
+        if is_constant(name_expression):
+            try:
+                getter = self.path_getter([name_expression.value])
+            except TypeError:
+                # unhashable property names can't be shared
+                getter = expression
+            return _with_transform(getter, transform)
+
+        return expression
+
+    def _compile_root_doc(self, expression):
+        inner = self.compile_expression(expression._expression_fn)
+
+        def _root_doc(item, context=None):
+            if context is None:
+                return None
+            return inner(context.root_doc, context)
+        return _root_doc
+
+    def _compile_nested(self, expression):
+        argument = self.compile_expression(expression._argument_expression)
+        value = self.compile_expression(expression._value_expression)
+
+        def _nested(item, context=None):
+            return value(argument(item, context), context)
+        return _nested
+
+    def _compile_conditional(self, expression):
+        test = self.compile_filter(expression._test_function)
+        if_true = self.compile_expression(expression._true_expression)
+        if_false = self.compile_expression(expression._false_expression)
+        if is_constant(test):
+            return if_true if test.value else if_false
+
+        def _conditional(item, context=None):
+            if test(item, context):
+                return if_true(item, context)
+            return if_false(item, context)
+        return _conditional
+
+    def _compile_coalesce(self, expression):
+        first = self.compile_expression(expression._expression)
+        default = self.compile_expression(expression._default_expression)
+
+        def _coalesce(item, context=None):
+            value = first(item, context)
+            default_value = default(item, context)
+            if value is None or value == '':
+                return default_value
+            return value
+        return _coalesce
+
+    def compile_filter(self, filter_):
+        if isinstance(filter_, ANDFilter):
+            return self._compile_boolean_filter(filter_, ANDFilter, short_circuit_on=False)
+
+        if isinstance(filter_, ORFilter):
+            return self._compile_boolean_filter(filter_, ORFilter, short_circuit_on=True)
+
+        if isinstance(filter_, NOTFilter):
+            inner = self.compile_filter(filter_._filter)
+            if is_constant(inner):
+                return Constant(not inner.value)
+            return lambda item, context=None: not inner(item, context)
+
+        if isinstance(filter_, NamedFilter):
+            if filter_.filter_name not in self._compiled_named_filters:
+                self._compiled_named_filters[filter_.filter_name] = self.compile_filter(filter_.filter)
+            return self._compiled_named_filters[filter_.filter_name]
+
+        if isinstance(filter_, SinglePropertyValueFilter):
+            return self._compile_property_value_filter(filter_)
+
+        return filter_
+
+    def _compile_boolean_filter(self, filter_, filter_class, short_circuit_on):
+        filters = []
+        for sub_filter in self._flatten(filter_, filter_class):
+            compiled = self.compile_filter(sub_filter)
+            if is_constant(compiled):
+                if bool(compiled.value) == short_circuit_on:
+                    return Constant(short_circuit_on)
+                # constants that can't decide the result can be dropped
+                continue
+            filters.append(compiled)
+
+        if not filters:
+            return Constant(not short_circuit_on)
+        if len(filters) == 1:
+            only_filter = filters[0]
+            return lambda item, context=None: bool(only_filter(item, context))
+
+        filters = tuple(filters)
+        if short_circuit_on:
+            def _or(item, context=None):
+                for _filter in filters:
+                    if _filter(item, context):
+                        return True
+                return False
+            return _or
+
+        def _and(item, context=None):
+            for _filter in filters:
+                if not _filter(item, context):
+                    return False
+            return True
+        return _and
+
+    def _flatten(self, filter_, filter_class):
+        for sub_filter in filter_.filters:
+            if isinstance(sub_filter, filter_class):
+                for nested in self._flatten(sub_filter, filter_class):
+                    yield nested
+            else:
+                yield sub_filter
+
+    def _compile_property_value_filter(self, filter_):
+        expression = self.compile_expression(filter_.expression)
+        reference = self.compile_expression(filter_.reference_expression)
+        operator = filter_.operator
+        if is_constant(reference):
+            reference_value = reference.value
+            if is_constant(expression):
+                return Constant(operator(expression.value, reference_value))
+            if operator is equal:
+                return lambda item, context=None: expression(item, context) == reference_value
+            return lambda item, context=None: operator(expression(item, context), reference_value)
+
+        return lambda item, context=None: operator(expression(item, context), reference(item, context))
+
+    def compile_indicator(self, indicator):
+        if isinstance(indicator, CompoundIndicator):
+            return [
+                compiled
+                for sub_indicator in indicator.indicators
+                for compiled in self.compile_indicator(sub_indicator)
+            ]
+
+        if isinstance(indicator, BooleanIndicator):
+            if indicator.wrapped_spec is not None and indicator.wrapped_spec.type == 'count':
+                return [(indicator.column, Constant(1))]
+            compiled_filter = self.compile_filter(indicator.filter)
+            if is_constant(compiled_filter):
+                return [(indicator.column, Constant(1 if compiled_filter.value else 0))]
+            return [(indicator.column, lambda item, context=None: 1 if compiled_filter(item, context) else 0)]
+
+        if isinstance(indicator, RawIndicator):
+            return [(indicator.column, self.compile_expression(indicator.getter))]
+
+        return [(None, indicator.get_values)]
+
+
+def _with_transform(getter, transform):
+    if transform is None:
+        return getter
+    if is_constant(getter):
+        return Constant(transform(getter.value))
+    return lambda item, context=None: transform(getter(item, context))
+
+
+def compile_data_source(config):
+    return DataSourceCompiler().compile_data_source(config)
@@ -62,5 +62,9 @@ class IndicatorLaboratoryAdapter(IndicatorAdapter):
         self.es_adapter.delete(doc)
         self.sql_adapter.delete(doc)
 
+    def bulk_delete(self, doc_ids):
+        self.es_adapter.bulk_delete(doc_ids)
+        self.sql_adapter.bulk_delete(doc_ids)
+
     def doc_exists(self, doc):
         return self.es_adapter.doc_exists(doc) or self.sql_adapter.doc_exists(doc)
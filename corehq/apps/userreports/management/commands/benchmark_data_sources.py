@@ -0,0 +1,193 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+import glob
+import json
+import os
+import timeit
+import uuid
+from io import open
+
+import six
+from django.core.management.base import BaseCommand, CommandError
+
+from corehq.apps.userreports.models import DataSourceConfiguration
+from six.moves import range
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'examples')
+
+SAMPLE_VALUES = {
+    'date': '2018-06-21',
+    'datetime': '2018-06-21T10:30:00.000000Z',
+    'decimal': '2.5',
+    'integer': '4',
+    'small_integer': '1',
+    'string': 'sample',
+    'array': ['sample'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark evaluating data source configs against sample documents, "
+        "comparing the interpreted spec objects with the compiled closures."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'config_files', nargs='*',
+            help="Data source config JSON files. Defaults to all data sources in userreports/examples."
+        )
+        parser.add_argument(
+            '--doc-file', dest='doc_file',
+            help="JSON file containing a list of documents to use instead of generated sample documents."
+        )
+        parser.add_argument('--iterations', dest='iterations', type=int, default=1000)
+
+    def handle(self, config_files, **options):
+        config_files = config_files or _get_example_data_source_files()
+        if not config_files:
+            raise CommandError("No data source configs found")
+
+        docs = None
+        if options['doc_file']:
+            with open(options['doc_file'], encoding='utf-8') as f:
+                docs = json.load(f)
+
+        iterations = options['iterations']
+        print("{:<40} {:>10} {:>14} {:>14} {:>8}".format(
+            'data source', 'rows/doc', 'interpreted', 'compiled', 'speedup'
+        ))
+        for config_file in config_files:
+            with open(config_file, encoding='utf-8') as f:
+                config_json = json.load(f)
+            config_docs = docs or [make_sample_document(config_json)]
+
+            interpreted = DataSourceConfiguration.wrap(config_json)
+            compiled = DataSourceConfiguration.wrap(config_json)
+            compiled.compile()
+
+            for doc in config_docs:
+                if _comparable_rows(interpreted, doc) != _comparable_rows(compiled, doc):
+                    raise CommandError("Compiled output differs for {} on doc {}".format(
+                        config_file, doc.get('_id')
+                    ))
+
+            interpreted_time = _time_config(interpreted, config_docs, iterations)
+            compiled_time = _time_config(compiled, config_docs, iterations)
+            rows_per_doc = sum(len(compiled.get_all_values(doc)) for doc in config_docs) / len(config_docs)
+            print("{:<40} {:>10.1f} {:>12.1f}us {:>12.1f}us {:>7.1f}x".format(
+                interpreted.table_id,
+                rows_per_doc,
+                interpreted_time * 10 ** 6,
+                compiled_time * 10 ** 6,
+                interpreted_time / compiled_time if compiled_time else 0,
+            ))
+
+
+def _get_example_data_source_files():
+    return sorted(
+        path for path in glob.glob(os.path.join(EXAMPLES_DIR, '*', '*.json'))
+        if _is_data_source(path)
+    )
+
+
+def _is_data_source(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('doc_type') == 'DataSourceConfiguration'
+
+
+def _time_config(config, docs, iterations):
+    """
+    :return: average seconds taken to filter and evaluate one document
+    """
+    def _run():
+        for doc in docs:
+            config.filter(doc)
+            config.get_all_values(doc)
+
+    return timeit.timeit(_run, number=iterations) / (iterations * len(docs))
+
+
+def _comparable_rows(config, doc):
+    return [
+        [(value.column.id, value.value) for value in row if value.column.id != 'inserted_at']
+        for row in config.get_all_values(doc)
+    ]
+
+
+def make_sample_document(config_json):
+    """
+    Build a document that passes the data source's filter (for the simple
+    equality filters that most data sources use) and has a value for every
+    property the indicators read.
+    """
+    doc = {
+        '_id': uuid.uuid4().hex,
+        'domain': config_json['domain'],
+        'doc_type': config_json['referenced_doc_type'],
+    }
+    if config_json.get('configured_filter'):
+        _apply_filter(doc, config_json['configured_filter'])
+
+    items = [doc]
+    base_item_path = _get_path(config_json.get('base_item_expression') or {})
+    if base_item_path:
+        items = [{} for i in range(3)]
+        _set_path(doc, base_item_path, items)
+
+    for item in items:
+        for indicator in config_json.get('configured_indicators', []):
+            _apply_indicator(item, indicator)
+    return doc
+
+
+def _apply_filter(doc, filter_spec):
+    filter_type = filter_spec.get('type')
+    if filter_type == 'and':
+        for sub_filter in filter_spec['filters']:
+            _apply_filter(doc, sub_filter)
+    elif filter_type == 'or' and filter_spec['filters']:
+        _apply_filter(doc, filter_spec['filters'][0])
+    elif filter_type in ('boolean_expression', 'property_match'):
+        path = _get_path(filter_spec.get('expression') or filter_spec)
+        value = filter_spec.get('property_value')
+        if filter_spec.get('operator', 'eq') == 'in' and isinstance(value, list) and value:
+            value = value[0]
+        elif filter_spec.get('operator', 'eq') != 'eq':
+            return
+        if path and not isinstance(value, dict):
+            _set_path(doc, path, value)
+
+
+def _apply_indicator(item, indicator):
+    sample_value = SAMPLE_VALUES.get(indicator.get('datatype'), 'sample')
+    if indicator.get('type') == 'choice_list' and indicator.get('choices'):
+        sample_value = indicator['choices'][0]
+    elif indicator.get('type') in ('boolean', 'small_boolean'):
+        _apply_filter(item, indicator.get('filter', {}))
+        return
+
+    path = _get_path(indicator.get('expression') or indicator)
+    if path:
+        _set_path(item, path, sample_value, overwrite=False)
+
+
+def _get_path(spec):
+    if not isinstance(spec, dict):
+        return None
+    if spec.get('property_path'):
+        return spec['property_path']
+    if isinstance(spec.get('property_name'), six.string_types):
+        return [spec['property_name']]
+    return None
+
+
+def _set_path(doc, path, value, overwrite=True):
+    for key in path[:-1]:
+        if not isinstance(doc.get(key), dict):
+            doc[key] = {}
+        doc = doc[key]
+    if overwrite or path[-1] not in doc:
+        doc[path[-1]] = value
@@ -152,12 +152,29 @@ class DataSourceConfiguration(UnicodeMixIn, CachedCouchDocumentMixin, Document):
         self.last_modified = datetime.utcnow()
         super(DataSourceConfiguration, self).save(**params)
 
+    # set by ``compile``
+    _compiled = None
+
+    def compile(self):
+        """
+        Switch this data source over to evaluating documents with compiled closures
+        instead of walking the spec objects. See ``corehq.apps.userreports.compiler``.
+        """
+        self._compiled = self._get_compiled()
+
+    @memoized
+    def _get_compiled(self):
+        from corehq.apps.userreports.compiler import compile_data_source
+        return compile_data_source(self)
+
     def filter(self, document):
+        if self._compiled:
+            return self._compiled.filter(document, EvaluationContext(document, 0))
         filter_fn = self._get_main_filter()
         return filter_fn(document, EvaluationContext(document, 0))
 
     def deleted_filter(self, document):
-        filter_fn = self._get_deleted_filter()
+        filter_fn = self._compiled.deleted_filter if self._compiled else self._get_deleted_filter()
         return filter_fn and filter_fn(document, EvaluationContext(document, 0))
 
     @memoized
@@ -317,6 +334,9 @@ class DataSourceConfiguration(UnicodeMixIn, CachedCouchDocumentMixin, Document):
             return []
 
     def get_all_values(self, doc, eval_context=None):
+        if self._compiled:
+            return self._compiled.get_all_values(doc, eval_context)
+
         if not eval_context:
             eval_context = EvaluationContext(doc)
 
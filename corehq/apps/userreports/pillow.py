@@ -20,7 +20,7 @@ from corehq.apps.userreports.exceptions import (
 )
 from corehq.apps.userreports.models import AsyncIndicator
 from corehq.apps.userreports.specs import EvaluationContext
-from corehq.apps.userreports.sql import metadata
+from corehq.apps.userreports.sql import metadata, IndicatorSqlAdapter
 from corehq.apps.userreports.tasks import rebuild_indicators
 from corehq.apps.userreports.util import get_indicator_adapter, get_backend_id
 from corehq.sql_db.connections import connection_manager
@@ -37,7 +37,7 @@ from fluff.signals import (
 from pillowtop.checkpoints.manager import KafkaPillowCheckpoint
 from pillowtop.logger import pillow_logging
 from pillowtop.pillow.interface import ConstructedPillow
-from pillowtop.processors import PillowProcessor
+from pillowtop.processors import BulkPillowProcessor
 from pillowtop.utils import ensure_matched_revisions, ensure_document_exists
 
 REBUILD_CHECK_INTERVAL = 60 * 60  # in seconds
@@ -135,6 +135,7 @@ class ConfigurableReportTableManagerMixin(object):
         self.table_adapters_by_domain = defaultdict(list)
 
         for config in configs:
+            config.compile()
             self.table_adapters_by_domain[config.domain].append(
                 get_indicator_adapter(config, can_handle_laboratory=True, raise_errors=True)
             )
@@ -209,7 +210,7 @@ class ConfigurableReportTableManagerMixin(object):
             rebuild_indicators.delay(adapter.config.get_id)
 
 
-class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, PillowProcessor):
+class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, BulkPillowProcessor):
 
     domain_timing_context = Counter()
 
@@ -222,6 +223,28 @@ class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, Pil
             # remove it until the next bootstrap call
             self.table_adapters_by_domain[domain].remove(table)
 
+    @time_ucr_process_change
+    def _get_doc_rows_for_table(self, domain, table, doc, eval_context):
+        """Like ``_save_doc_to_table`` but returns the rows to save with the rest of the chunk
+
+        :return: the rows, or None if the table was removed
+        """
+        try:
+            return table.get_all_values(doc, eval_context)
+        except Exception as e:
+            return [] if self._handle_table_exception(domain, table, doc, e) else None
+
+    def _handle_table_exception(self, domain, table, doc, exception):
+        """
+        :return: False if the table was removed until the next bootstrap call
+        """
+        try:
+            table.handle_exception(doc, exception)
+        except UserReportsWarning:
+            self.table_adapters_by_domain[domain].remove(table)
+            return False
+        return True
+
     def process_change(self, pillow_instance, change):
         self.bootstrap_if_needed()
 
@@ -254,7 +277,9 @@ class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, Pil
                     else:
                         self._save_doc_to_table(domain, table, doc, eval_context)
                         eval_context.reset_iteration()
-                elif table.config.deleted_filter(doc) or table.doc_exists(doc):
+                else:
+                    # deleting is a no-op if the doc was never saved and is
+                    # cheaper than checking whether it exists first
                     table.delete(doc)
 
             if async_tables:
@@ -264,6 +289,123 @@ class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, Pil
             domain: timer.duration
         })
 
+    def process_changes_chunk(self, pillow_instance, changes_chunk):
+        """
+        Evaluate all changes in the chunk against all data sources for their domain
+        and then write the results with one transaction per database engine:
+        rows are upserted and documents that no longer match a data source's filter
+        are removed with a single set based delete per table.
+
+        :return: changes to be retried serially
+        """
+        self.bootstrap_if_needed()
+
+        # later changes to the same document supersede earlier ones
+        changes_by_doc_id = {}
+        for change in changes_chunk:
+            domain = change.metadata.domain if change.metadata else None
+            if domain and domain in self.table_adapters_by_domain:
+                changes_by_doc_id[change.id] = change
+
+        rows_by_adapter = defaultdict(list)
+        deleted_ids_by_adapter = defaultdict(set)
+        changes_by_adapter = defaultdict(list)
+        async_configs_by_change = {}
+        retry_changes = []
+        for change in changes_by_doc_id.values():
+            domain = change.metadata.domain
+            adapters = list(self.table_adapters_by_domain[domain])
+            if change.deleted:
+                for adapter in adapters:
+                    deleted_ids_by_adapter[adapter].add(change.id)
+                    changes_by_adapter[adapter].append(change)
+
+            try:
+                doc = change.get_document()
+                ensure_document_exists(change)
+                ensure_matched_revisions(change)
+            except Exception:
+                retry_changes.append(change)
+                continue
+
+            if doc is None:
+                continue
+
+            with TimingContext() as timer:
+                eval_context = EvaluationContext(doc)
+                for adapter in adapters:
+                    if adapter.config.filter(doc):
+                        if adapter.run_asynchronous:
+                            async_configs_by_change.setdefault(change, []).append(adapter.config._id)
+                            continue
+                        rows = self._get_doc_rows_for_table(domain, adapter, doc, eval_context)
+                        eval_context.reset_iteration()
+                        if rows is None:
+                            # removed, so don't save what earlier changes in the chunk got for it
+                            for by_adapter in (rows_by_adapter, deleted_ids_by_adapter, changes_by_adapter):
+                                by_adapter.pop(adapter, None)
+                            continue
+                        rows_by_adapter[adapter].extend(rows)
+                    else:
+                        deleted_ids_by_adapter[adapter].add(change.id)
+                    changes_by_adapter[adapter].append(change)
+            self.domain_timing_context.update(**{
+                domain: timer.duration
+            })
+
+        for change, config_ids in async_configs_by_change.items():
+            try:
+                AsyncIndicator.update_from_kafka_change(change, config_ids)
+            except Exception:
+                retry_changes.append(change)
+
+        retry_changes.extend(self._save_chunk(rows_by_adapter, deleted_ids_by_adapter, changes_by_adapter))
+        return retry_changes
+
+    def _save_chunk(self, rows_by_adapter, deleted_ids_by_adapter, changes_by_adapter):
+        retry_changes = []
+        sql_adapters_by_engine = defaultdict(list)
+        for adapter in changes_by_adapter:
+            if isinstance(adapter, IndicatorSqlAdapter):
+                sql_adapters_by_engine[adapter.engine_id].append(adapter)
+            else:
+                retry_changes.extend(self._save_chunk_to_table(
+                    adapter, rows_by_adapter[adapter], deleted_ids_by_adapter[adapter], changes_by_adapter[adapter]
+                ))
+
+        for engine_id, adapters in sql_adapters_by_engine.items():
+            session_helper = connection_manager.get_session_helper(engine_id)
+            try:
+                with session_helper.session_context() as session:
+                    for adapter in adapters:
+                        if deleted_ids_by_adapter[adapter]:
+                            adapter.bulk_delete_in_session(session, deleted_ids_by_adapter[adapter])
+                        adapter.save_rows_in_session(session, rows_by_adapter[adapter])
+            except Exception:
+                # the whole transaction was rolled back so save each table on
+                # its own, to keep one bad table from failing the others
+                for adapter in adapters:
+                    retry_changes.extend(self._save_chunk_to_table(
+                        adapter, rows_by_adapter[adapter], deleted_ids_by_adapter[adapter],
+                        changes_by_adapter[adapter]
+                    ))
+
+        return list(set(retry_changes))
+
+    def _save_chunk_to_table(self, table, rows, deleted_ids, changes):
+        """
+        :return: changes to be retried serially
+        """
+        try:
+            table.bulk_delete(deleted_ids)
+            table.save_rows(rows)
+        except Exception as e:
+            domain = table.config.domain
+            if not self._handle_table_exception(domain, table, {'_id': changes[0].id}, e):
+                return []
+            return changes
+        return []
+
     def checkpoint_updated(self):
         total_duration = sum(self.domain_timing_context.values())
         duration_seen = 0
@@ -287,7 +429,8 @@ class ConfigurableReportKafkaPillow(ConstructedPillow):
     # we could easily remove the class and push all the stuff in __init__ to
     # get_kafka_ucr_pillow below if we wanted.
 
-    def __init__(self, processor, pillow_name, topics, num_processes, process_num, retry_errors=False):
+    def __init__(self, processor, pillow_name, topics, num_processes, process_num, retry_errors=False,
+                 processor_chunk_size=0):
         change_feed = KafkaChangeFeed(
             topics, group_id=pillow_name, num_processes=num_processes, process_num=process_num
         )
@@ -301,7 +444,8 @@ class ConfigurableReportKafkaPillow(ConstructedPillow):
             change_feed=change_feed,
             processor=processor,
             checkpoint=checkpoint,
-            change_processed_event_handler=event_handler
+            change_processed_event_handler=event_handler,
+            processor_chunk_size=processor_chunk_size,
         )
         # set by the superclass constructor
         assert self.processors is not None
@@ -322,7 +466,7 @@ class ConfigurableReportKafkaPillow(ConstructedPillow):
 
 def get_kafka_ucr_pillow(pillow_id='kafka-ucr-main', ucr_division=None,
                          include_ucrs=None, exclude_ucrs=None, topics=None,
-                         num_processes=1, process_num=0, **kwargs):
+                         num_processes=1, process_num=0, processor_chunk_size=0, **kwargs):
     topics = topics or KAFKA_TOPICS
     topics = [kafka_bytestring(t) for t in topics]
     return ConfigurableReportKafkaPillow(
@@ -337,12 +481,13 @@ def get_kafka_ucr_pillow(pillow_id='kafka-ucr-main', ucr_division=None,
         topics=topics,
         num_processes=num_processes,
         process_num=process_num,
+        processor_chunk_size=processor_chunk_size,
     )
 
 
 def get_kafka_ucr_static_pillow(pillow_id='kafka-ucr-static', ucr_division=None,
                                 include_ucrs=None, exclude_ucrs=None, topics=None,
-                                num_processes=1, process_num=0, **kwargs):
+                                num_processes=1, process_num=0, processor_chunk_size=0, **kwargs):
     topics = topics or KAFKA_TOPICS
     topics = [kafka_bytestring(t) for t in topics]
     return ConfigurableReportKafkaPillow(
@@ -358,5 +503,6 @@ def get_kafka_ucr_static_pillow(pillow_id='kafka-ucr-static', ucr_division=None,
         topics=topics,
         num_processes=num_processes,
         process_num=process_num,
-        retry_errors=True
+        retry_errors=True,
+        processor_chunk_size=processor_chunk_size,
     )
@@ -5,6 +5,7 @@ import hashlib
 from architect import install
 from django.utils.translation import ugettext as _
 import sqlalchemy
+from sqlalchemy.dialects.postgresql import insert as postgres_insert
 from sqlalchemy.exc import IntegrityError, ProgrammingError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.schema import Index
@@ -146,12 +147,34 @@ class IndicatorSqlAdapter(IndicatorAdapter):
         self.save_rows(rows)
 
     def save_rows(self, rows):
+        if not rows:
+            return
+        with self.session_helper.session_context() as session:
+            self.save_rows_in_session(session, rows)
+
+    def save_rows_in_session(self, session, rows):
+        """
+        Saves rows as part of an existing session, replacing any rows previously
+        saved for the same documents. This allows callers to write rows for many
+        documents and many data sources (on the same engine) in one transaction.
+        """
         # transform format from ColumnValue to dict
         formatted_rows = [
             {i.column.database_column_name: i.value for i in row}
             for row in rows
         ]
+        if not formatted_rows:
+            return
+
         doc_ids = set(row['doc_id'] for row in formatted_rows)
+        if self.config.sql_settings.partition_config:
+            # inserts into partitioned tables are routed by triggers which
+            # don't support ON CONFLICT so fall back to delete then insert
+            self._delete_and_insert_rows(session, formatted_rows, doc_ids)
+        else:
+            self._upsert_rows(session, formatted_rows, doc_ids)
+
+    def _delete_and_insert_rows(self, session, formatted_rows, doc_ids):
         table = self.get_table()
         delete = table.delete(table.c.doc_id.in_(doc_ids))
         # Using session.bulk_insert_mappings below might seem more inline
@@ -163,9 +186,44 @@ class IndicatorSqlAdapter(IndicatorAdapter):
         #   because bulk_insert_mappings is meant for multi-table insertion
         #   so it has overhead of format conversions and multiple statements
         insert = table.insert().values(formatted_rows)
-        with self.session_helper.session_context() as session:
-            session.execute(delete)
-            session.execute(insert)
+        session.execute(delete)
+        session.execute(insert)
+
+    def _upsert_rows(self, session, formatted_rows, doc_ids):
+        """
+        INSERT ... ON CONFLICT DO UPDATE keyed on the table's primary key. Rows whose
+        values have not changed (ignoring ``inserted_at``) are left untouched so they
+        don't produce dead tuples, and rows left over from a previous version of a
+        document (e.g. a repeat that now has fewer items) are deleted.
+        """
+        table = self.get_table()
+        primary_key = list(table.primary_key.columns)
+        key_names = [column.name for column in primary_key]
+
+        # postgres refuses to update the same row twice in one statement
+        rows_by_key = {tuple(row[name] for name in key_names): row for row in formatted_rows}
+
+        if key_names != ['doc_id']:
+            stale_rows = table.delete().where(table.c.doc_id.in_(doc_ids)).where(
+                ~sqlalchemy.tuple_(*primary_key).in_(list(rows_by_key))
+            )
+            session.execute(stale_rows)
+
+        insert = postgres_insert(table).values(list(rows_by_key.values()))
+        update_columns = [column.name for column in table.columns if not column.primary_key]
+        compare_columns = [name for name in update_columns if name != 'inserted_at']
+        if update_columns:
+            upsert = insert.on_conflict_do_update(
+                index_elements=primary_key,
+                set_={name: insert.excluded[name] for name in update_columns},
+                where=sqlalchemy.or_(*[
+                    table.c[name].is_distinct_from(insert.excluded[name])
+                    for name in compare_columns
+                ]) if compare_columns else None,
+            )
+        else:
+            upsert = insert.on_conflict_do_nothing(index_elements=primary_key)
+        session.execute(upsert)
 
     def delete(self, doc):
         table = self.get_table()
@@ -173,6 +231,16 @@ class IndicatorSqlAdapter(IndicatorAdapter):
         with self.session_helper.session_context() as session:
             session.execute(delete)
 
+    def bulk_delete(self, doc_ids):
+        if not doc_ids:
+            return
+        with self.session_helper.session_context() as session:
+            self.bulk_delete_in_session(session, doc_ids)
+
+    def bulk_delete_in_session(self, session, doc_ids):
+        table = self.get_table()
+        session.execute(table.delete(table.c.doc_id.in_(doc_ids)))
+
     def doc_exists(self, doc):
         with self.session_helper.session_context() as session:
             query = session.query(self.get_table()).filter_by(doc_id=doc['_id'])
@@ -0,0 +1,136 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import datetime
+import json
+import os
+from io import open
+
+from django.test import SimpleTestCase
+
+from corehq.apps.userreports.compiler import DataSourceCompiler, is_constant
+from corehq.apps.userreports.expressions.factory import ExpressionFactory
+from corehq.apps.userreports.filters.factory import FilterFactory
+from corehq.apps.userreports.management.commands.benchmark_data_sources import (
+    _get_example_data_source_files,
+    make_sample_document,
+)
+from corehq.apps.userreports.models import DataSourceConfiguration
+from corehq.apps.userreports.specs import EvaluationContext
+from corehq.apps.userreports.tests.utils import get_sample_data_source, get_sample_doc_and_indicators
+
+
+def _rows(config, doc):
+    return [
+        [(value.column.id, value.value) for value in row if value.column.id != 'inserted_at']
+        for row in config.get_all_values(doc)
+    ]
+
+
+class CompiledDataSourceTest(SimpleTestCase):
+
+    def _assert_same_output(self, config_json, docs):
+        interpreted = DataSourceConfiguration.wrap(config_json)
+        compiled = DataSourceConfiguration.wrap(config_json)
+        compiled.compile()
+        for doc in docs:
+            self.assertEqual(interpreted.filter(doc), compiled.filter(doc))
+            self.assertEqual(interpreted.deleted_filter(doc), compiled.deleted_filter(doc))
+            self.assertEqual(_rows(interpreted, doc), _rows(compiled, doc))
+
+    def test_sample_data_source(self):
+        sample_doc, _ = get_sample_doc_and_indicators()
+        other_doc = dict(sample_doc, type='wrong_type')
+        deleted_doc = dict(sample_doc, doc_type='CommCareCase-Deleted')
+        bad_values = dict(sample_doc, priority='not a number', opened_on=None)
+        self._assert_same_output(
+            get_sample_data_source().to_json(),
+            [sample_doc, other_doc, deleted_doc, bad_values, {}],
+        )
+
+    def test_repeat_data_source(self):
+        folder = os.path.join(os.path.dirname(__file__), 'data', 'configs')
+        with open(os.path.join(folder, 'data_source_with_repeat.json'), encoding='utf-8') as f:
+            config_json = json.load(f)
+        now = datetime.datetime.utcnow()
+        logs = [{"start_time": now, "end_time": now, "person": "al"}] * 3
+        doc = {
+            "_id": "repeat-id",
+            "domain": "user-reports",
+            "doc_type": "XFormInstance",
+            "created": "monday",
+            "form": {"time_logs": logs},
+        }
+        self._assert_same_output(config_json, [doc, dict(doc, form={}), dict(doc, form={"time_logs": {}})])
+
+    def test_example_data_sources(self):
+        for path in _get_example_data_source_files():
+            with open(path, encoding='utf-8') as f:
+                config_json = json.load(f)
+            self._assert_same_output(config_json, [make_sample_document(config_json)])
+
+
+class CompilerTest(SimpleTestCase):
+
+    def setUp(self):
+        self.compiler = DataSourceCompiler()
+
+    def _filter(self, spec):
+        return self.compiler.compile_filter(FilterFactory.from_spec(spec))
+
+    def _constant_filter(self, value):
+        return {
+            'type': 'boolean_expression',
+            'expression': {'type': 'constant', 'constant': value},
+            'operator': 'eq',
+            'property_value': True,
+        }
+
+    def test_constant_filter_folded(self):
+        self.assertTrue(is_constant(self._filter(self._constant_filter(True))))
+
+    def test_and_short_circuits_on_constant(self):
+        compiled = self._filter({
+            'type': 'and',
+            'filters': [
+                {
+                    'type': 'boolean_expression',
+                    'expression': {'type': 'property_name', 'property_name': 'foo'},
+                    'operator': 'eq',
+                    'property_value': 'bar',
+                },
+                self._constant_filter(False),
+            ]
+        })
+        self.assertTrue(is_constant(compiled))
+        self.assertFalse(compiled({'foo': 'bar'}))
+
+    def test_nested_or_flattened(self):
+        def _eq(value):
+            return {
+                'type': 'boolean_expression',
+                'expression': {'type': 'property_name', 'property_name': 'foo'},
+                'operator': 'eq',
+                'property_value': value,
+            }
+        compiled = self._filter({
+            'type': 'or',
+            'filters': [_eq('a'), {'type': 'or', 'filters': [_eq('b'), self._constant_filter(False)]}],
+        })
+        self.assertTrue(compiled({'foo': 'a'}))
+        self.assertTrue(compiled({'foo': 'b'}))
+        self.assertFalse(compiled({'foo': 'c'}))
+
+    def test_property_lookups_shared(self):
+        first = self.compiler.compile_expression(ExpressionFactory.from_spec({
+            'type': 'property_path', 'property_path': ['form', 'meta', 'userID']
+        }))
+        second = self.compiler.compile_expression(ExpressionFactory.from_spec({
+            'type': 'property_path', 'property_path': ['form', 'meta', 'userID']
+        }))
+        self.assertIs(first, second)
+
+        doc = {'form': {'meta': {'userID': 'abc'}}}
+        context = EvaluationContext(doc)
+        self.assertEqual('abc', first(doc, context))
+        self.assertEqual(None, first({'form': []}, context))
+        self.assertEqual(None, first('not a dict', context))
@@ -113,6 +113,28 @@ class RepeatDataSourceBuildTest(RepeatDataSourceTestMixin, TestCase):
             "The repeat data saved in the data source table did not match the expected data!"
         )
 
+    @run_with_all_ucr_backends
+    def test_fewer_repeats_replaces_rows(self):
+        adapter = get_indicator_adapter(self.config)
+        adapter.rebuild_table()
+        self.addCleanup(adapter.drop_table)
+
+        now = datetime.datetime.now()
+        one_hour = datetime.timedelta(hours=1)
+        logs = [
+            {"start_time": now, "end_time": now + one_hour, "person": "al"},
+            {"start_time": now + one_hour, "end_time": now + (one_hour * 2), "person": "chris"},
+        ]
+        adapter.save(_test_doc(form={'time_logs': logs}))
+
+        logs = [{"start_time": now, "end_time": now + one_hour, "person": "katie"}]
+        adapter.save(_test_doc(form={'time_logs': logs}))
+        adapter.refresh_table()
+
+        rows = list(adapter.get_query_object())
+        self.assertEqual(1, len(rows))
+        self.assertEqual('katie', rows[0].person)
+
 
 def _test_doc(**extras):
     test_doc = {
@@ -19,7 +19,7 @@ from corehq.apps.change_feed import topics
 from corehq.apps.change_feed.producer import producer
 from corehq.apps.userreports.const import UCR_SQL_BACKEND, UCR_ES_BACKEND
 from corehq.apps.userreports.data_source_providers import MockDataSourceProvider
-from corehq.apps.userreports.exceptions import StaleRebuildError
+from corehq.apps.userreports.exceptions import StaleRebuildError, TableNotFoundWarning
 from corehq.apps.userreports.models import DataSourceConfiguration, AsyncIndicator
 from corehq.apps.userreports.pillow import REBUILD_CHECK_INTERVAL, \
     ConfigurableReportTableManagerMixin, get_kafka_ucr_pillow, get_kafka_ucr_static_pillow
@@ -241,6 +241,50 @@ class IndicatorPillowTest(TestCase):
 
         self.assertIs(self.adapter.doc_exists(sample_doc), True)
 
+    @patch('corehq.apps.userreports.specs.datetime')
+    def test_process_changes_chunk(self, datetime_mock):
+        datetime_mock.utcnow.return_value = self.fake_time_now
+        sample_doc, expected_indicators = get_sample_doc_and_indicators(self.fake_time_now)
+        other_doc = dict(sample_doc, _id=uuid.uuid4().hex, type='wrong_type')
+        processor = self.pillow._processor
+
+        retry = processor.process_changes_chunk(self.pillow, [
+            doc_to_change(sample_doc), doc_to_change(other_doc)
+        ])
+        self.assertEqual([], retry)
+        self._check_sample_doc_state(expected_indicators)
+
+        # saving the same doc again replaces its row
+        retry = processor.process_changes_chunk(self.pillow, [doc_to_change(sample_doc)])
+        self.assertEqual([], retry)
+        self._check_sample_doc_state(expected_indicators)
+
+        # doc no longer passing the filter is removed
+        sample_doc['type'] = 'wrong_type'
+        retry = processor.process_changes_chunk(self.pillow, [doc_to_change(sample_doc)])
+        self.assertEqual([], retry)
+        self.adapter.refresh_table()
+        self.assertEqual(0, self.adapter.get_query_object().count())
+
+
+    @patch('corehq.apps.userreports.specs.datetime')
+    def test_process_changes_chunk_removes_bad_table(self, datetime_mock):
+        datetime_mock.utcnow.return_value = self.fake_time_now
+        sample_doc, _ = get_sample_doc_and_indicators(self.fake_time_now)
+        processor = self.pillow._processor
+        processor.bootstrap()
+        self.addCleanup(processor.bootstrap)
+        adapters = processor.table_adapters_by_domain[sample_doc['domain']]
+        adapter = [a for a in adapters if a.config._id == self.config._id][0]
+
+        with patch.object(adapter, 'save_rows', side_effect=Exception), \
+                patch.object(adapter, 'save_rows_in_session', side_effect=Exception), \
+                patch.object(adapter, 'handle_exception', side_effect=TableNotFoundWarning):
+            retry = processor.process_changes_chunk(self.pillow, [doc_to_change(sample_doc)])
+        # dropped until the next bootstrap rather than retried
+        self.assertEqual([], retry)
+        self.assertNotIn(adapter, processor.table_adapters_by_domain[sample_doc['domain']])
+
 
 @override_settings(OVERRIDE_UCR_BACKEND=UCR_ES_BACKEND)
 class IndicatorPillowTestES(IndicatorPillowTest):
@@ -4,6 +4,7 @@ from couchdbkit import ResourceNotFound
 from corehq.apps.groups.models import Group
 from corehq.apps.locations.models import SQLLocation
 from corehq.apps.users.models import CouchUser, CommCareUser, WebUser
+from dimagi.utils.couch.database import iter_docs
 
 
 def user_db():
@@ -22,13 +23,6 @@ def get_wrapped_owner(owner_id, support_deleted=False):
     if not owner_id:
         return None
 
-    def _get_class(doc_type):
-        return {
-            'CommCareUser': CommCareUser,
-            'WebUser': WebUser,
-            'Group': Group,
-        }.get(doc_type)
-
     def _get_deleted_class(doc_type):
         return {
             'Group-Deleted': Group,
@@ -44,7 +38,7 @@ def get_wrapped_owner(owner_id, support_deleted=False):
     except ResourceNotFound:
         pass
     else:
-        cls = _get_class(owner_doc['doc_type'])
+        cls = _get_owner_class(owner_doc['doc_type'])
         if support_deleted and cls is None:
             cls = _get_deleted_class(owner_doc['doc_type'])
         return cls.wrap(owner_doc) if cls else None
@@ -52,6 +46,33 @@ def get_wrapped_owner(owner_id, support_deleted=False):
     return None
 
 
+def get_wrapped_owners(owner_ids):
+    """
+    Bulk version of ``get_wrapped_owner``
+
+    :returns: dict of owner_id -> wrapped user, group or location, for the
+    ids that belong to a known owner type
+    """
+    owner_ids = {owner_id for owner_id in owner_ids if owner_id}
+    owners = {
+        location.location_id: location
+        for location in SQLLocation.objects.filter(location_id__in=owner_ids)
+    }
+    for owner_doc in iter_docs(user_db(), list(owner_ids - set(owners))):
+        cls = _get_owner_class(owner_doc['doc_type'])
+        if cls:
+            owners[owner_doc['_id']] = cls.wrap(owner_doc)
+    return owners
+
+
+def _get_owner_class(doc_type):
+    return {
+        'CommCareUser': CommCareUser,
+        'WebUser': WebUser,
+        'Group': Group,
+    }.get(doc_type)
+
+
 def get_owning_users(owner_id):
     """
     Given an owner ID, get a list of the owning users, regardless of whether
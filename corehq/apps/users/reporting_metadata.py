@@ -0,0 +1,226 @@
+"""
+Write-behind buffer for user reporting metadata
+
+When ``settings.USER_REPORTING_METADATA_BATCH_ENABLED`` is set, heartbeats and
+form submissions don't save the user doc to record the latest build, device
+and sync details. Instead the update is kept in redis, in a hash per user with
+a field per kind of update, app and device, so only the most recent update of
+each is kept. ``flush_reporting_metadata`` (run by a periodic task) applies
+the buffered updates to the user docs and saves them in bulk.
+
+Users are saved with ``bulk_save`` rather than ``CouchUser.save``. The updates
+only touch ``reporting_metadata`` and ``devices``, so there is nothing to sync
+to the django user and the username can't conflict. The post save signals are
+still sent for users with a new submission, as ``mark_latest_submission``
+sends them when it saves the user itself; heartbeats never sent them.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import json
+from datetime import datetime
+
+from couchdbkit import BulkSaveError
+from redis.exceptions import ResponseError
+from django.core.serializers.json import DjangoJSONEncoder
+from six.moves import range
+
+from dimagi.utils.couch import get_redis_client
+from dimagi.utils.couch.bulk import get_docs
+from dimagi.utils.logging import log_signal_errors, notify_exception
+from dimagi.utils.parsing import json_format_datetime, string_to_utc_datetime
+
+HEARTBEAT = 'heartbeat'
+SUBMISSION = 'submission'
+
+USERS_KEY = 'user-reporting-metadata-users'
+# users being flushed, so updates buffered during a flush wait for the next one
+FLUSHING_USERS_KEY = 'user-reporting-metadata-flushing-users'
+UPDATES_KEY = 'user-reporting-metadata:{}'
+FLUSH_BATCH_SIZE = 100
+
+
+def buffer_heartbeat_metadata(user_id, app_id, build_id, app_version, device_id, last_sync, num_unsent_forms,
+                              num_quarantined_forms, commcare_version, heartbeat_time, record_last_sync=True):
+    _buffer_update(user_id, HEARTBEAT, app_id, device_id, {
+        'app_id': app_id,
+        'build_id': build_id,
+        'app_version': app_version,
+        'device_id': device_id,
+        'last_sync': json_format_datetime(last_sync) if last_sync else None,
+        'num_unsent_forms': num_unsent_forms,
+        'num_quarantined_forms': num_quarantined_forms,
+        'commcare_version': commcare_version,
+        'heartbeat_time': json_format_datetime(heartbeat_time),
+        'record_last_sync': record_last_sync,
+    })
+
+
+def buffer_submission_metadata(domain, user_id, app_id, build_id, version, metadata, received_on):
+    device_id = metadata.get('deviceID') if metadata else None
+    _buffer_update(user_id, SUBMISSION, app_id, device_id, {
+        'domain': domain,
+        'app_id': app_id,
+        'build_id': build_id,
+        'version': version,
+        'metadata': metadata,
+        'received_on': received_on,
+    })
+
+
+def _buffer_update(user_id, kind, app_id, device_id, update):
+    pipeline = _get_client().pipeline()
+    pipeline.hset(
+        UPDATES_KEY.format(user_id),
+        json.dumps([kind, app_id, device_id]),
+        json.dumps(update, cls=DjangoJSONEncoder),
+    )
+    pipeline.sadd(USERS_KEY, user_id)
+    pipeline.execute()
+
+
+def flush_reporting_metadata():
+    """
+    Apply the updates buffered so far to the user docs.
+    Users that could not be saved because of a conflict are buffered again
+    for the next flush.
+    """
+    client = _get_client()
+    if not client.exists(FLUSHING_USERS_KEY):
+        # otherwise the last flush didn't finish, and this one continues it
+        try:
+            client.rename(USERS_KEY, FLUSHING_USERS_KEY)
+        except ResponseError:
+            # nothing buffered
+            return
+
+    while True:
+        pipeline = client.pipeline()
+        for i in range(FLUSH_BATCH_SIZE):
+            pipeline.spop(FLUSHING_USERS_KEY)
+        user_ids = [user_id.decode('utf-8') for user_id in pipeline.execute() if user_id]
+        if not user_ids:
+            return
+
+        pipeline = client.pipeline()
+        for user_id in user_ids:
+            pipeline.hgetall(UPDATES_KEY.format(user_id))
+            pipeline.delete(UPDATES_KEY.format(user_id))
+        results = pipeline.execute()
+        updates_by_user_id = {
+            user_id: updates for user_id, updates in zip(user_ids, results[::2]) if updates
+        }
+        conflicted_user_ids = _apply_updates(updates_by_user_id)
+        _rebuffer_updates({user_id: updates_by_user_id[user_id] for user_id in conflicted_user_ids})
+
+
+def _apply_updates(updates_by_user_id):
+    """
+    :returns: ids of the users that could not be saved because of a conflict
+    """
+    from corehq.apps.users.models import CouchUser, DELETED_SUFFIX
+
+    users = []
+    submission_user_ids = set()
+    for doc in get_docs(CouchUser.get_db(), list(updates_by_user_id)):
+        if doc['doc_type'].endswith(DELETED_SUFFIX):
+            continue
+        user = CouchUser.wrap_correctly(doc)
+        updated = False
+        for field, update in updates_by_user_id[user.user_id].items():
+            kind = json.loads(field.decode('utf-8'))[0]
+            try:
+                if _apply_update(user, kind, json.loads(update.decode('utf-8'))):
+                    updated = True
+                    if kind == SUBMISSION:
+                        submission_user_ids.add(user.user_id)
+            except Exception:
+                notify_exception(None, "Error applying user reporting metadata update", details={
+                    'user_id': user.user_id,
+                    'update': update,
+                })
+        if updated:
+            users.append(user)
+
+    if not users:
+        return set()
+    for user in users:
+        user.last_modified = datetime.utcnow()
+    failed_user_ids = set()
+    conflicted_user_ids = set()
+    try:
+        # users of different doc types can't be saved together with CouchUser.bulk_save
+        CouchUser.get_db().bulk_save(users)
+    except BulkSaveError as e:
+        for error in e.errors:
+            failed_user_ids.add(error['id'])
+            if error.get('error') == 'conflict':
+                conflicted_user_ids.add(error['id'])
+            else:
+                notify_exception(None, "Error saving user reporting metadata", details=error)
+    for user in users:
+        if user.user_id not in failed_user_ids:
+            user.clear_quickcache_for_user()
+            if user.user_id in submission_user_ids:
+                _send_post_save_signals(user)
+    return conflicted_user_ids
+
+
+def _send_post_save_signals(user):
+    from corehq.apps.users.models import CommCareUser
+    from corehq.apps.users.signals import commcare_user_post_save, couch_user_post_save
+
+    results = couch_user_post_save.send_robust(sender='couch_user', couch_user=user)
+    log_signal_errors(results, "Error occurred while syncing user (%s)", {'username': user.username})
+    if isinstance(user, CommCareUser):
+        results = commcare_user_post_save.send_robust(sender='couch_user', couch_user=user, is_new_user=False)
+        log_signal_errors(results, "Error occurred while syncing user (%s)", {'username': user.username})
+
+
+def _apply_update(user, kind, update):
+    from corehq.apps.users.util import update_heartbeat_metadata
+    from pillowtop.processors.form import update_latest_submission
+
+    if kind == HEARTBEAT:
+        last_sync = update['last_sync']
+        return update_heartbeat_metadata(
+            user,
+            update['app_id'],
+            update['build_id'],
+            update['app_version'],
+            update['device_id'],
+            string_to_utc_datetime(last_sync) if last_sync else None,
+            update['num_unsent_forms'],
+            update['num_quarantined_forms'],
+            update['commcare_version'],
+            string_to_utc_datetime(update['heartbeat_time']),
+            update.get('record_last_sync', True),
+        )
+    elif kind == SUBMISSION:
+        if not user.is_member_of(update['domain']):
+            return False
+        return update_latest_submission(
+            user,
+            update['domain'],
+            update['app_id'],
+            update['build_id'],
+            update['version'],
+            update['metadata'],
+            update['received_on'],
+        )
+    return False
+
+
+def _rebuffer_updates(updates_by_user_id):
+    if not updates_by_user_id:
+        return
+    pipeline = _get_client().pipeline()
+    for user_id, updates in updates_by_user_id.items():
+        for field, update in updates.items():
+            # don't replace updates buffered since these were taken
+            pipeline.hsetnx(UPDATES_KEY.format(user_id), field, update)
+        pipeline.sadd(USERS_KEY, user_id)
+    pipeline.execute()
+
+
+def _get_client():
+    return get_redis_client().client.get_client()
@@ -249,6 +249,15 @@ def resend_pending_invitations():
                 invitation.send_activation_email(days_to_expire - days)
 
 
+@periodic_task(
+    run_every=crontab(minute='*'),
+    queue='background_queue',
+)
+def flush_user_reporting_metadata():
+    from corehq.apps.users.reporting_metadata import flush_reporting_metadata
+    flush_reporting_metadata()
+
+
 @task
 def turn_on_demo_mode_task(commcare_user_id, domain):
     from corehq.apps.ota.utils import turn_on_demo_mode
@@ -0,0 +1,80 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from datetime import datetime
+
+from django.test import TestCase, override_settings
+from mock import patch
+
+from corehq.apps.users.models import CommCareUser, CouchUser
+from corehq.apps.users import reporting_metadata
+from corehq.apps.users.reporting_metadata import buffer_heartbeat_metadata, flush_reporting_metadata
+from dimagi.utils.parsing import string_to_utc_datetime
+from pillowtop.processors.form import mark_latest_submission
+
+
+@override_settings(USER_REPORTING_METADATA_BATCH_ENABLED=True)
+class ReportingMetadataBufferTest(TestCase):
+    domain = 'reporting-metadata-buffer'
+    app_id = 'app-id'
+    build_id = 'build-id'
+    metadata = {
+        'deviceID': 'device-id'
+    }
+
+    def setUp(self):
+        super(ReportingMetadataBufferTest, self).setUp()
+        self.user = CommCareUser.create(self.domain, 'buffered-user', '***')
+
+    def tearDown(self):
+        self.user.delete()
+        super(ReportingMetadataBufferTest, self).tearDown()
+
+    def _get_user(self):
+        return CouchUser.get_by_user_id(self.user._id, self.domain)
+
+    def test_flush(self):
+        for received_on in ["2017-02-05T00:00:00.000000Z", "2017-02-06T00:00:00.000000Z"]:
+            mark_latest_submission(
+                self.domain, self.user._id, self.app_id, self.build_id, '2', self.metadata, received_on
+            )
+        heartbeat_time = datetime(2017, 2, 7)
+        buffer_heartbeat_metadata(
+            self.user._id, self.app_id, self.build_id, 3, 'device-id', datetime(2017, 2, 6, 12),
+            0, 0, '2.40', heartbeat_time
+        )
+        self.assertEqual(self._get_user().reporting_metadata.last_submissions, [])
+
+        with patch('corehq.apps.users.reporting_metadata._send_post_save_signals') as send_signals:
+            flush_reporting_metadata()
+        self.assertEqual(send_signals.call_count, 1)
+        metadata = self._get_user().reporting_metadata
+        self.assertEqual(len(metadata.last_submissions), 1)
+        self.assertEqual(
+            metadata.last_submissions[0].submission_date,
+            string_to_utc_datetime("2017-02-06T00:00:00.000000Z"),
+        )
+        self.assertEqual(metadata.last_sync_for_user.sync_date, datetime(2017, 2, 6, 12))
+        self.assertEqual(metadata.last_build_for_user.build_version, 3)
+        self.assertEqual(metadata.last_build_for_user.build_version_date, heartbeat_time)
+
+        saved_rev = self._get_user()._rev
+        flush_reporting_metadata()
+        self.assertEqual(self._get_user()._rev, saved_rev)
+
+    def test_conflict_saved_on_next_flush(self):
+        buffer_heartbeat_metadata(
+            self.user._id, self.app_id, self.build_id, 4, 'device-id', None, 0, 0, '2.40', datetime(2017, 2, 8)
+        )
+        get_docs = reporting_metadata.get_docs
+
+        def get_docs_then_save(db, ids):
+            docs = get_docs(db, ids)
+            self._get_user().save()
+            return docs
+
+        with patch('corehq.apps.users.reporting_metadata.get_docs', get_docs_then_save):
+            flush_reporting_metadata()
+        self.assertIsNone(self._get_user().reporting_metadata.last_build_for_user.build_version)
+
+        flush_reporting_metadata()
+        self.assertEqual(self._get_user().reporting_metadata.last_build_for_user.build_version, 4)
@@ -202,7 +202,7 @@ def user_location_data(location_ids):
     return ' '.join(location_ids)
 
 
-def update_device_meta(user, device_id, commcare_version=None, device_app_meta=None, save=True):
+def update_device_meta(user, device_id, commcare_version=None, device_app_meta=None, save=True, when=None):
     from corehq.apps.users.models import CommCareUser
     from custom.enikshay.user_setup import set_enikshay_device_id
 
@@ -212,6 +212,7 @@ def update_device_meta(user, device_id, commcare_version=None, device_app_meta=N
             # this only updates once per day for each device
             updated = user.update_device_id_last_used(
                 device_id,
+                when=when,
                 commcare_version=commcare_version,
                 device_app_meta=device_app_meta,
             )
@@ -222,6 +223,42 @@ def update_device_meta(user, device_id, commcare_version=None, device_app_meta=N
     return updated
 
 
+def update_heartbeat_metadata(user, app_id, build_id, app_version, device_id, last_sync, num_unsent_forms,
+                              num_quarantined_forms, commcare_version, heartbeat_time, record_last_sync=True):
+    """
+    Update a user's reporting metadata from a heartbeat request.
+    This function does not save the user.
+    :param record_last_sync: False to only record ``last_sync`` in the device's app meta
+    :return: True if user updated
+    """
+    from corehq.apps.users.models import DeviceAppMeta
+
+    save_user = False
+    # if mobile cannot determine app version it sends -1
+    if app_version and app_version > 0:
+        save_user = update_latest_builds(user, app_id, heartbeat_time, app_version)
+    if last_sync and record_last_sync:
+        save_user |= update_last_sync(user, app_id, last_sync, app_version)
+    app_meta = DeviceAppMeta(
+        app_id=app_id,
+        build_id=build_id,
+        build_version=app_version,
+        last_heartbeat=heartbeat_time,
+        last_sync=last_sync,
+        num_unsent_forms=num_unsent_forms,
+        num_quarantined_forms=num_quarantined_forms
+    )
+    save_user |= update_device_meta(
+        user,
+        device_id,
+        commcare_version=commcare_version,
+        device_app_meta=app_meta,
+        save=False,
+        when=heartbeat_time,
+    )
+    return save_user
+
+
 def _last_build_needs_update(last_build, build_date):
     if not (last_build and last_build.build_version_date):
         return True
@@ -13,11 +13,14 @@ def get_blob_db():
         from django.conf import settings
         db = _get_s3_db(settings)
         if db is None:
-            db = _get_fs_db(settings)
-        elif getattr(settings, "BLOB_DB_MIGRATING_FROM_FS_TO_S3", False):
-            db = _get_migrating_db(db, _get_fs_db(settings))
-        elif getattr(settings, "BLOB_DB_MIGRATING_FROM_S3_TO_S3", False):
-            db = _get_migrating_db(db, _get_s3_db(settings, "OLD_S3_BLOB_DB_SETTINGS"))
+            db = _get_caching_db(_get_fs_db(settings), settings)
+        else:
+            # cache the new db only, so that migrations still find the MigratingBlobDB
+            db = _get_caching_db(db, settings)
+            if getattr(settings, "BLOB_DB_MIGRATING_FROM_FS_TO_S3", False):
+                db = _get_migrating_db(db, _get_fs_db(settings))
+            elif getattr(settings, "BLOB_DB_MIGRATING_FROM_S3_TO_S3", False):
+                db = _get_migrating_db(db, _get_s3_db(settings, "OLD_S3_BLOB_DB_SETTINGS"))
         _db.append(db)
     return _db[-1]
 
@@ -42,6 +45,14 @@ def _get_migrating_db(new_db, old_db):
     return MigratingBlobDB(new_db, old_db)
 
 
+def _get_caching_db(db, settings):
+    config = getattr(settings, "BLOB_DB_LOCAL_CACHE", None)
+    if not config:
+        return db
+    from .cachingdb import CachingBlobDB
+    return CachingBlobDB(db, **config)
+
+
 class BlobInfo(namedtuple("BlobInfo", ["identifier", "length", "digest"])):
 
     @property
@@ -0,0 +1,257 @@
+"""Read-through cache of blob content on local disk
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from hashlib import sha1
+from uuid import uuid4
+
+from corehq.blobs import DEFAULT_BUCKET
+from corehq.blobs.exceptions import NotFound
+from corehq.blobs.interface import AbstractBlobDB
+from corehq.blobs.util import ClosingContextProxy
+from corehq.util.datadog.gauges import datadog_counter
+from dimagi.utils.couch.cache.cache_core import get_redis_default_cache
+from io import open
+
+CHUNK_SIZE = 64 * 1024
+VERSION_KEY = "blobcache-version-{}"
+
+CacheEntry = namedtuple("CacheEntry", ["filename", "size", "cached_on", "version"])
+
+
+class CachingBlobDB(object):
+    """Adaptor that keeps recently read blobs on local disk
+
+    Blob content is cached when it is read with ``get`` and evicted least
+    recently used first once the cache grows past ``max_size`` bytes.
+    ``size`` and ``exists`` are answered from the cached metadata when
+    possible.
+
+    Every process has its own cache. Writes and deletes record a new version
+    of the blob (or bucket) in redis, and a cached blob is only served while
+    the versions it was read at are current, so changes made by any process
+    are picked up on the next read. Cached blobs are also dropped once they
+    are older than ``timeout`` seconds.
+
+    :param db: The blob db to read from and write to.
+    :param path: Directory under which the cache directory is created.
+    :param max_size: Maximum number of bytes to keep cached.
+    :param max_item_size: Blobs larger than this are not cached.
+    :param timeout: Number of seconds a cached blob is served for.
+    """
+
+    def __init__(self, db, path, max_size, max_item_size=None, timeout=60 * 60):
+        self.db = db
+        self.max_size = max_size
+        self.max_item_size = max_item_size or max_size // 10
+        self.timeout = timeout
+        self.cache_dir = tempfile.mkdtemp(prefix="blobcache-", dir=path)
+        self.cached_size = 0
+        self._entries = OrderedDict()  # blob path -> CacheEntry, least recent first
+        self._lock = threading.Lock()
+        atexit.register(shutil.rmtree, self.cache_dir, True)
+
+    def put(self, content, identifier, bucket=DEFAULT_BUCKET, **kw):
+        path = self.db.get_path(identifier, bucket)
+        self._invalidate(path)
+        try:
+            if isinstance(content, CachedBlobStream) and content.blob_db is self:
+                try:
+                    # pass the backend's own stream on so that it can copy the blob without downloading it
+                    with self.db.get(content.identifier, content.bucket) as source:
+                        return self.db.put(source, identifier, bucket, **kw)
+                except NotFound:
+                    pass
+            return self.db.put(content, identifier, bucket, **kw)
+        finally:
+            self._publish_change(path)
+
+    def get(self, identifier, bucket=DEFAULT_BUCKET):
+        path = self.db.get_path(identifier, bucket)
+        entry = self._get_entry(path, bucket, "get")
+        if entry is not None:
+            try:
+                return CachedBlobStream(open(entry.filename, "rb"), self, identifier, bucket)
+            except IOError:
+                # evicted by another thread since it was looked up
+                self._invalidate(path)
+        # read the version first so that a change made during the download is noticed later
+        version = self._get_version(path, bucket)
+        content = self._get_and_cache(path, self.db.get(identifier, bucket), version)
+        return CachedBlobStream(content, self, identifier, bucket)
+
+    def size(self, identifier, bucket=DEFAULT_BUCKET):
+        entry = self._get_entry(self.db.get_path(identifier, bucket), bucket, "size")
+        if entry is not None:
+            return entry.size
+        return self.db.size(identifier, bucket)
+
+    def exists(self, identifier, bucket=DEFAULT_BUCKET):
+        if self._get_entry(self.db.get_path(identifier, bucket), bucket, "exists") is not None:
+            return True
+        return self.db.exists(identifier, bucket)
+
+    def delete(self, *args, **kw):
+        identifier, bucket = AbstractBlobDB.get_args_for_delete(*args, **kw)
+        if identifier is None:
+            path = self.db.get_path(None, bucket)
+            self._invalidate_prefix(path + "/")
+        else:
+            path = self.db.get_path(identifier, bucket)
+            self._invalidate(path)
+        try:
+            return self.db.delete(*args, **kw)
+        finally:
+            self._publish_change(path)
+
+    def bulk_delete(self, paths):
+        for path in paths:
+            self._invalidate(path)
+        try:
+            return self.db.bulk_delete(paths)
+        finally:
+            for path in paths:
+                self._publish_change(path)
+
+    def get_path(self, *args, **kw):
+        return self.db.get_path(*args, **kw)
+
+    def copy_blob(self, content, info, bucket):
+        path = self.db.get_path(info.identifier, bucket)
+        self._invalidate(path)
+        try:
+            self.db.copy_blob(content, info, bucket)
+        finally:
+            self._publish_change(path)
+
+    def _get_entry(self, path, bucket, operation):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and time.time() - entry.cached_on > self.timeout:
+                self._remove(path)
+                entry = None
+        if entry is not None and entry.version != self._get_version(path, bucket):
+            # changed by another process
+            self._invalidate(path)
+            entry = None
+        if entry is not None:
+            with self._lock:
+                if path in self._entries:
+                    # mark as most recently used
+                    self._entries[path] = self._entries.pop(path)
+        status = "miss" if entry is None else "hit"
+        datadog_counter("commcare.blobs.cache", tags=["status:" + status, "operation:" + operation])
+        return entry
+
+    def _get_version(self, path, bucket):
+        keys = [VERSION_KEY.format(path), VERSION_KEY.format(self.db.get_path(None, bucket))]
+        versions = get_redis_default_cache().get_many(keys)
+        return tuple(versions.get(key) for key in keys)
+
+    def _publish_change(self, path):
+        # outlive the entries cached before the change
+        get_redis_default_cache().set(VERSION_KEY.format(path), uuid4().hex, 2 * max(self.timeout, 0) + 60)
+
+    def _get_and_cache(self, path, stream, version):
+        filename = os.path.join(self.cache_dir, sha1(path.encode("utf-8")).hexdigest())
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                while size <= self.max_item_size:
+                    chunk = stream.read(min(CHUNK_SIZE, self.max_item_size + 1 - size))
+                    if not chunk:
+                        break
+                    fh.write(chunk)
+                    size += len(chunk)
+            if size > self.max_item_size:
+                # too large to cache, serve what was read followed by the rest of the stream
+                content = open(temp_path, "rb")
+                os.remove(temp_path)
+                return _ChainedStream(content, stream)
+            stream.close()
+            with self._lock:
+                self._remove(path)
+                os.rename(temp_path, filename)
+                self._entries[path] = CacheEntry(filename, size, time.time(), version)
+                self.cached_size += size
+                # open before evicting so it stays readable even if it is evicted
+                content = open(filename, "rb")
+                self._evict()
+                return content
+        except:
+            stream.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _evict(self):
+        while self.cached_size > self.max_size and self._entries:
+            path = next(iter(self._entries))
+            self._remove(path)
+
+    def _invalidate(self, path):
+        with self._lock:
+            self._remove(path)
+
+    def _invalidate_prefix(self, prefix):
+        with self._lock:
+            for path in [p for p in self._entries if p.startswith(prefix)]:
+                self._remove(path)
+
+    def _remove(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.cached_size -= entry.size
+            try:
+                os.remove(entry.filename)
+            except OSError:
+                pass
+
+
+class CachedBlobStream(ClosingContextProxy):
+    """Blob content read through a ``CachingBlobDB``
+
+    Putting it back into the same caching db hands the wrapped db's own
+    stream over, so that ``S3BlobDB.put`` can still copy it on the server.
+    """
+
+    def __init__(self, stream, blob_db, identifier, bucket):
+        super(CachedBlobStream, self).__init__(stream)
+        self.blob_db = blob_db
+        self.identifier = identifier
+        self.bucket = bucket
+
+
+class _ChainedStream(object):
+    """Read-only stream of the content of ``first`` followed by ``second``
+
+    Closing it closes both streams.
+    """
+
+    def __init__(self, first, second):
+        self._streams = [first, second]
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            return b"".join(stream.read() for stream in self._streams)
+        data = b""
+        for stream in self._streams:
+            data += stream.read(size - len(data))
+            if len(data) == size:
+                break
+        return data
+
+    def __iter__(self):
+        return iter(lambda: self.read(CHUNK_SIZE), b"")
+
+    def close(self):
+        for stream in self._streams:
+            stream.close()
@@ -0,0 +1,124 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from io import BytesIO
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from mock import patch
+
+from corehq.blobs.cachingdb import CachedBlobStream, CachingBlobDB
+from corehq.blobs.exceptions import NotFound
+from corehq.blobs.fsdb import FilesystemBlobDB
+from corehq.blobs.tests.util import get_id
+from corehq.util.test_utils import patch_datadog
+
+
+class TestCachingBlobDB(TestCase):
+
+    def setUp(self):
+        self.rootdir = mkdtemp(prefix="blobdb")
+        self.cachedir = mkdtemp(prefix="blobcache")
+        self.fsdb = FilesystemBlobDB(self.rootdir)
+        self.db = CachingBlobDB(self.fsdb, self.cachedir, max_size=20, max_item_size=10)
+
+    def tearDown(self):
+        rmtree(self.rootdir)
+        rmtree(self.cachedir)
+
+    def _put(self, content, bucket="doc.1"):
+        return self.db.put(BytesIO(content), get_id(), bucket=bucket)
+
+    def _read(self, info, bucket="doc.1"):
+        with self.db.get(info.identifier, bucket) as fh:
+            return fh.read()
+
+    def test_get_served_from_cache(self):
+        info = self._put(b"content")
+        with patch_datadog() as stats:
+            self.assertEqual(self._read(info), b"content")
+            self.fsdb.delete(info.identifier, "doc.1")
+            self.assertEqual(self._read(info), b"content")
+            self.assertEqual(self.db.size(info.identifier, "doc.1"), 7)
+            self.assertTrue(self.db.exists(info.identifier, "doc.1"))
+        self.assertEqual(len(stats["commcare.blobs.cache.status:miss"]), 1)
+        self.assertEqual(len(stats["commcare.blobs.cache.status:hit"]), 3)
+
+    def test_delete_invalidates(self):
+        info = self._put(b"content")
+        self._read(info)
+        self.assertTrue(self.db.delete(info.identifier, "doc.1"))
+        with self.assertRaises(NotFound):
+            self._read(info)
+        self.assertFalse(self.db.exists(info.identifier, "doc.1"))
+
+    def test_delete_bucket_invalidates(self):
+        info = self._put(b"content")
+        self._read(info)
+        self.db.delete(bucket="doc.1")
+        with self.assertRaises(NotFound):
+            self._read(info)
+
+    def test_bulk_delete_invalidates(self):
+        info = self._put(b"content")
+        self._read(info)
+        self.db.bulk_delete([self.db.get_path(info.identifier, "doc.1")])
+        with self.assertRaises(NotFound):
+            self._read(info)
+
+    def test_put_invalidates(self):
+        info = self._put(b"content")
+        self._read(info)
+        self.db.put(BytesIO(b"changed"), info.identifier, bucket="doc.1")
+        self.assertEqual(self._read(info), b"changed")
+
+    def test_change_by_other_process_invalidates(self):
+        other_db = CachingBlobDB(self.fsdb, self.cachedir, max_size=20, max_item_size=10)
+        info = self._put(b"content")
+        self._read(info)
+        other_db.put(BytesIO(b"changed"), info.identifier, bucket="doc.1")
+        self.assertEqual(self._read(info), b"changed")
+        other_db.delete(bucket="doc.1")
+        with self.assertRaises(NotFound):
+            self._read(info)
+
+    def test_put_cached_blob_passes_backend_stream(self):
+        info = self._put(b"content")
+        self._read(info)
+        with patch.object(self.fsdb, "put", wraps=self.fsdb.put) as put, \
+                self.db.get(info.identifier, "doc.1") as content:
+            self.db.put(content, get_id(), bucket="doc.2")
+        source = put.call_args[0][0]
+        self.assertNotIsInstance(source, CachedBlobStream)
+        self.assertEqual(source.name, self.fsdb.get_path(info.identifier, "doc.1"))
+
+    def test_least_recently_used_evicted(self):
+        first, second, third = [self._put(content) for content in [b"1" * 8, b"2" * 8, b"3" * 8]]
+        self._read(first)
+        self._read(second)
+        self._read(first)
+        self._read(third)
+        self.assertEqual(self.db.cached_size, 16)
+        with patch_datadog() as stats:
+            self._read(first)
+            self._read(third)
+            self._read(second)
+        self.assertEqual(len(stats["commcare.blobs.cache.status:hit"]), 2)
+        self.assertEqual(len(stats["commcare.blobs.cache.status:miss"]), 1)
+
+    def test_large_blob_not_cached(self):
+        info = self._put(b"x" * 5 + b"y" * 6)
+        with patch.object(self.fsdb, "size") as size:
+            self.assertEqual(self._read(info), b"x" * 5 + b"y" * 6)
+            with self.db.get(info.identifier, "doc.1") as fh:
+                self.assertEqual([fh.read(4) for i in range(4)], [b"xxxx", b"xyyy", b"yyy", b""])
+        size.assert_not_called()
+        self.assertEqual(self.db.cached_size, 0)
+
+    def test_expired_entry_not_served(self):
+        self.db.timeout = -1
+        info = self._put(b"content")
+        self._read(info)
+        self.fsdb.delete(info.identifier, "doc.1")
+        with self.assertRaises(NotFound):
+            self._read(info)
@@ -24,18 +24,34 @@ Example case graphs with outcomes:
 from __future__ import absolute_import
 from __future__ import unicode_literals
 import logging
+import sys
+import threading
 from collections import defaultdict
 from itertools import chain, islice
 
+import six
+from django.db import connections
+from six.moves import queue
+
 from casexml.apps.case.const import CASE_INDEX_EXTENSION as EXTENSION
 from casexml.apps.phone.data_providers.case.load_testing import (
-    get_xml_for_response,
+    get_xml_for_updates,
 )
 from casexml.apps.phone.const import ASYNC_RETRY_AFTER
-from casexml.apps.phone.data_providers.case.stock import get_stock_payload
+from casexml.apps.phone.data_providers.case.stock import (
+    get_current_ledger_state,
+    get_stock_payload,
+    uses_ledgers,
+)
 from casexml.apps.phone.data_providers.case.utils import get_case_sync_updates
 from casexml.apps.phone.tasks import ASYNC_RESTORE_SENT
 from corehq.form_processor.interfaces.dbaccessors import CaseAccessors
+from corehq.toggles import LIVEQUERY_PIPELINED_RESTORE
+from corehq.util.timer import TimingContext
+
+CASE_BATCH_SIZE = 1000
+# number of fetched batches that may wait to be serialized in pipelined restores
+PREFETCH_QUEUE_SIZE = 2
 
 
 def do_livequery(timing_context, restore_state, response, async_task=None):
@@ -239,11 +255,15 @@ def do_livequery(timing_context, restore_state, response, async_task=None):
 
         with timing_context("compile_response(%s cases)" % len(sync_ids)):
             iaccessor = PrefetchIndexCaseAccessor(accessor, indices)
+            if LIVEQUERY_PIPELINED_RESTORE.enabled(restore_state.domain):
+                batches = prefetch_batches(timing_context, restore_state, iaccessor, sync_ids)
+            else:
+                batches = ((cases, None) for cases in batch_cases(iaccessor, sync_ids))
             compile_response(
                 timing_context,
                 restore_state,
                 response,
-                batch_cases(iaccessor, sync_ids),
+                batches,
                 init_progress(async_task, len(sync_ids)),
             )
 
@@ -277,19 +297,93 @@ class PrefetchIndexCaseAccessor(object):
         return self.accessor.get_cases(case_ids, **kw)
 
 
-def batch_cases(accessor, case_ids):
+def batch_ids(case_ids):
     def take(n, iterable):
         # https://docs.python.org/2/library/itertools.html#recipes
         return list(islice(iterable, n))
 
     ids = iter(case_ids)
     while True:
-        next_ids = take(1000, ids)
+        next_ids = take(CASE_BATCH_SIZE, ids)
         if not next_ids:
             break
+        yield next_ids
+
+
+def batch_cases(accessor, case_ids):
+    for next_ids in batch_ids(case_ids):
         yield accessor.get_cases(next_ids)
 
 
+def prefetch_batches(timing_context, restore_state, accessor, case_ids,
+                     queue_size=PREFETCH_QUEUE_SIZE):
+    """Fetch batches of cases (and their ledgers) on a worker thread
+
+    The worker fetches the next batches while the caller serializes the
+    current one. It blocks when `queue_size` batches are waiting, so no
+    more than `queue_size + 2` batches are held in memory at once.
+
+    Yields `(cases, ledgers)` pairs, where `ledgers` is `None` if the
+    project does not use ledgers. Time spent fetching on the worker is
+    added to `timing_context` as each batch is consumed.
+    """
+    fetch_ledgers = uses_ledgers(restore_state.project)
+    results = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                results.put(item, timeout=1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def fetch():
+        try:
+            for next_ids in batch_ids(case_ids):
+                timing = TimingContext("prefetch ({} cases)".format(len(next_ids)))
+                with timing:
+                    with timing("fetch_cases"):
+                        cases = accessor.get_cases(next_ids)
+                    ledgers = None
+                    if fetch_ledgers:
+                        with timing("fetch_ledgers"):
+                            ledgers = get_current_ledger_state(restore_state.domain, cases)
+                if not put((cases, ledgers, timing.root)):
+                    return
+            put(None)
+        except Exception:
+            put(_FetchError(sys.exc_info()))
+        finally:
+            # database connections are per thread
+            connections.close_all()
+
+    worker = threading.Thread(target=fetch, name="livequery-prefetch")
+    worker.daemon = True
+    worker.start()
+    try:
+        while True:
+            with timing_context("wait_for_prefetch"):
+                item = results.get()
+            if item is None:
+                break
+            if isinstance(item, _FetchError):
+                six.reraise(*item.exc_info)
+            cases, ledgers, timer = item
+            timing_context.add_timer(timer)
+            yield cases, ledgers
+    finally:
+        stopped.set()
+
+
+class _FetchError(object):
+
+    def __init__(self, exc_info):
+        self.exc_info = exc_info
+
+
 def init_progress(async_task, total):
     if not async_task:
         return lambda done: None
@@ -310,12 +404,13 @@ def init_progress(async_task, total):
 
 def compile_response(timing_context, restore_state, response, batches, update_progress):
     done = 0
-    for cases in batches:
+    for cases, ledgers in batches:
         with timing_context("get_stock_payload"):
             response.extend(get_stock_payload(
                 restore_state.project,
                 restore_state.stock_settings,
                 cases,
+                ledgers,
             ))
 
         with timing_context("get_case_sync_updates (%s cases)" % len(cases)):
@@ -323,9 +418,7 @@ def compile_response(timing_context, restore_state, response, batches, update_pr
                 restore_state.domain, cases, restore_state.last_sync_log)
 
         with timing_context("get_xml_for_response (%s updates)" % len(updates)):
-            response.extend(item
-                for update in updates
-                for item in get_xml_for_response(update, restore_state))
+            response.extend(get_xml_for_updates(updates, restore_state))
 
         done += len(cases)
         update_progress(done)
@@ -2,8 +2,11 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 from copy import deepcopy
 from casexml.apps.phone.data_providers.case.utils import CaseSyncUpdate
+from casexml.apps.phone.restore_caching import CaseXMLFragmentCache
 from casexml.apps.phone.xml import get_case_element, tostring
 from corehq.apps.app_manager.const import USERCASE_TYPE
+from corehq.toggles import RESTORE_CASE_XML_CACHE
+from corehq.util.datadog.gauges import datadog_counter
 
 
 def transform_loadtest_update(update, factor):
@@ -39,3 +42,28 @@ def get_xml_for_response(update, restore_state):
         if original_update.case.type == USERCASE_TYPE:
             break
     return elements
+
+
+def get_xml_for_updates(updates, restore_state):
+    """
+    Get the XML for a list of updates, reusing ``<case>`` blocks rendered by
+    earlier restores (of any user) for cases that have not changed since.
+    """
+    if restore_state.loadtest_factor > 1 or not RESTORE_CASE_XML_CACHE.enabled(restore_state.domain):
+        return [item for update in updates for item in get_xml_for_response(update, restore_state)]
+
+    cache = CaseXMLFragmentCache(restore_state.version)
+    cached = cache.get_many(updates)
+    elements = []
+    rendered = []
+    for update in updates:
+        xml = cached.get(update.case.case_id)
+        if xml is None:
+            xml = tostring(get_case_element(update.case, update.required_updates, restore_state.version))
+            rendered.append((update, xml))
+        elements.append(xml)
+    cache.set_many(rendered)
+
+    datadog_counter('commcare.restore.case_xml_cache', len(cached), tags=['status:hit'])
+    datadog_counter('commcare.restore.case_xml_cache', len(rendered), tags=['status:miss'])
+    return elements
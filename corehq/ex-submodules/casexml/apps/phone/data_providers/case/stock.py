@@ -14,28 +14,42 @@ from casexml.apps.stock.consumption import compute_default_monthly_consumption,
 from casexml.apps.stock.const import COMMTRACK_REPORT_XMLNS
 
 
-def get_stock_payload(project, stock_settings, case_stub_list):
-    uses_ledgers = project.commtrack_enabled or toggles.NON_COMMTRACK_LEDGERS.enabled(project.name)
-    if project and not uses_ledgers:
+def uses_ledgers(project):
+    return project.commtrack_enabled or toggles.NON_COMMTRACK_LEDGERS.enabled(project.name)
+
+
+def get_current_ledger_state(domain_name, case_stub_list):
+    case_ids = [case.case_id for case in case_stub_list]
+    return LedgerAccessors(domain_name).get_current_ledger_state(case_ids)
+
+
+def get_stock_payload(project, stock_settings, case_stub_list, current_ledgers=None):
+    """
+    :param current_ledgers: Result of ``get_current_ledger_state`` for
+    ``case_stub_list`` if it has already been fetched.
+    """
+    if project and not uses_ledgers(project):
         return
 
-    generator = StockPayloadGenerator(project.name, stock_settings, case_stub_list)
+    generator = StockPayloadGenerator(project.name, stock_settings, case_stub_list, current_ledgers)
     for section in generator.yield_sections():
         yield section
 
 
 class StockPayloadGenerator(object):
-    def __init__(self, domain_name, stock_settings, case_stub_list):
+    def __init__(self, domain_name, stock_settings, case_stub_list, current_ledgers=None):
         self.domain_name = domain_name
         self.stock_settings = stock_settings
         self.case_stub_list = case_stub_list
+        self.current_ledgers = current_ledgers
 
         from lxml.builder import ElementMaker
         self.elem_maker = ElementMaker(namespace=COMMTRACK_REPORT_XMLNS)
 
     def yield_sections(self):
-        case_ids = [case.case_id for case in self.case_stub_list]
-        all_current_ledgers = LedgerAccessors(self.domain_name).get_current_ledger_state(case_ids)
+        all_current_ledgers = self.current_ledgers
+        if all_current_ledgers is None:
+            all_current_ledgers = get_current_ledger_state(self.domain_name, self.case_stub_list)
         for case_stub in self.case_stub_list:
             case_id = case_stub.case_id
             case_ledgers = all_current_ledgers[case_id]
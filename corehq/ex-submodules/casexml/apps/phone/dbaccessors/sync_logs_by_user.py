@@ -1,6 +1,6 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
-from casexml.apps.phone.models import SyncLogSQL, properly_wrap_sync_log
+from casexml.apps.phone.models import SyncLogSQL, expand_synclog_doc, properly_wrap_sync_log
 
 
 def get_last_synclog_for_user(user_id):
@@ -16,4 +16,4 @@ def get_synclogs_for_user(user_id, limit=10, wrap=True):
     if wrap:
         return [properly_wrap_sync_log(doc) for doc in docs]
     else:
-        return [doc for doc in docs]
+        return [expand_synclog_doc(doc) for doc in docs]
@@ -1,5 +1,5 @@
 from __future__ import absolute_import
-from casexml.apps.phone.models import SyncLogSQL
+from casexml.apps.phone.models import SyncLogSQL, expand_synclog_doc
 from pillowtop.dao.exceptions import DocumentNotFoundError
 from pillowtop.dao.interface import ReadOnlyDocumentStore
 
@@ -12,4 +12,4 @@ class ReadonlySyncLogDocumentStore(ReadOnlyDocumentStore):
         except SyncLogSQL.DoesNotExist as e:
             raise DocumentNotFoundError(e)
 
-        return sycnlog.doc
+        return expand_synclog_doc(sycnlog.doc)
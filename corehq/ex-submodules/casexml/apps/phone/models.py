@@ -4,8 +4,12 @@ from collections import defaultdict, namedtuple
 from copy import copy
 from datetime import datetime
 import architect
+import base64
+import re
+import struct
 import uuid
 import json
+import zlib
 from couchdbkit.exceptions import ResourceConflict, ResourceNotFound
 from casexml.apps.phone.exceptions import IncompatibleSyncLogType, MissingSyncLog
 from corehq.toggles import LEGACY_SYNC_SUPPORT
@@ -102,6 +106,13 @@ class OTARestoreUser(object):
     def get_fixture_data_items(self):
         raise NotImplementedError()
 
+    def get_fixture_owner_ids(self):
+        """
+        :return: dict of owner type -> ids of the owners whose fixture data items
+        the user gets
+        """
+        raise NotImplementedError()
+
     def get_groups(self):
         raise NotImplementedError()
 
@@ -144,6 +155,9 @@ class OTARestoreWebUser(OTARestoreUser):
     def get_fixture_data_items(self):
         return []
 
+    def get_fixture_owner_ids(self):
+        return {}
+
     def get_groups(self):
         return []
 
@@ -182,6 +196,11 @@ class OTARestoreCommCareUser(OTARestoreUser):
 
         return FixtureDataItem.by_user(self._couch_user)
 
+    def get_fixture_owner_ids(self):
+        from corehq.apps.fixtures.models import FixtureDataItem
+
+        return FixtureDataItem.get_owner_ids_for_user(self._couch_user)
+
     def get_groups(self):
         # this call is only used by bihar custom code and can be removed when that project is inactive
         from corehq.apps.groups.models import Group
@@ -386,34 +405,150 @@ def delete_synclog(synclog_id):
 
 
 def synclog_to_sql_object(synclog_json_object):
-    # Returns a SyncLogSQL object, a saved instance from DB or
-    #   instantiated SQL object to be saved
-    # synclog_json_object should be a SyncLog instance
-    synclog = None
-    if synclog_json_object._id:
-        synclog = SyncLogSQL.objects.filter(synclog_id=synclog_json_object._id).first()
-
-    is_new_synclog_sql = not synclog_json_object._id or not synclog
-
-    if is_new_synclog_sql:
-        synclog_id = uuid.UUID(synclog_json_object._id) if synclog_json_object._id else uuid.uuid1()
-        synclog_json_object._id = synclog_id.hex.lower()
-        synclog = SyncLogSQL(
-            domain=synclog_json_object.domain,
-            user_id=synclog_json_object.user_id,
-            synclog_id=synclog_id,
-            date=synclog_json_object.date,
-            previous_synclog_id=getattr(synclog_json_object, 'previous_log_id', None),
-            log_format=synclog_json_object.log_format,
-            build_id=synclog_json_object.build_id,
-            duration=synclog_json_object.duration,
-            last_submitted=synclog_json_object.last_submitted,
-            had_state_error=synclog_json_object.had_state_error,
-            error_date=synclog_json_object.error_date,
-            error_hash=synclog_json_object.error_hash,
-        )
-    synclog.doc = synclog_json_object.to_json()
-    return synclog
+    # Returns an unsaved SyncLogSQL object for a SyncLog instance. Saving it
+    #   updates the row of an existing sync log or inserts a new one, without
+    #   reading the (potentially large) existing row first.
+    synclog_id = uuid.UUID(synclog_json_object._id) if synclog_json_object._id else uuid.uuid1()
+    synclog_json_object._id = synclog_id.hex.lower()
+    return SyncLogSQL(
+        domain=synclog_json_object.domain,
+        user_id=synclog_json_object.user_id,
+        synclog_id=synclog_id,
+        date=synclog_json_object.date,
+        previous_synclog_id=getattr(synclog_json_object, 'previous_log_id', None),
+        log_format=synclog_json_object.log_format,
+        build_id=synclog_json_object.build_id,
+        duration=synclog_json_object.duration,
+        last_submitted=synclog_json_object.last_submitted,
+        had_state_error=synclog_json_object.had_state_error,
+        error_date=synclog_json_object.error_date,
+        error_hash=synclog_json_object.error_hash,
+        doc=compact_synclog_doc(synclog_json_object.to_json()),
+    )
+
+
+# Sets of case ids and index trees make up nearly all of a large sync log. When
+# they hold at least COMPACT_MIN_SIZE items they are stored in SyncLogSQL.doc
+# under 'compact_fields' with their ids packed into binary (see _pack_ids)
+# rather than as plain JSON.
+COMPACT_ID_SET_FIELDS = ('case_ids_on_phone', 'dependent_case_ids_on_phone', 'closed_cases')
+COMPACT_INDEX_TREE_FIELDS = ('index_tree', 'extension_index_tree')
+COMPACT_MIN_SIZE = 100
+
+
+def compact_synclog_doc(doc):
+    """Returns a copy of a sync log doc with its large fields packed"""
+    compact_fields = {}
+    for field in COMPACT_ID_SET_FIELDS:
+        ids = doc.get(field)
+        if ids and len(ids) >= COMPACT_MIN_SIZE:
+            compact_fields[field] = _pack_ids(sorted(ids))
+    for field in COMPACT_INDEX_TREE_FIELDS:
+        indices = (doc.get(field) or {}).get('indices')
+        if indices and len(indices) >= COMPACT_MIN_SIZE:
+            compact_fields[field] = _pack_index_tree(indices)
+    if not compact_fields:
+        return doc
+
+    doc = dict(doc)
+    for field in compact_fields:
+        if field in COMPACT_INDEX_TREE_FIELDS:
+            doc[field] = dict(doc[field], indices={})
+        else:
+            del doc[field]
+    doc['compact_fields'] = compact_fields
+    return doc
+
+
+def expand_synclog_doc(doc):
+    """Reverses compact_synclog_doc"""
+    if 'compact_fields' not in doc:
+        return doc
+    doc = dict(doc)
+    for field, value in doc.pop('compact_fields').items():
+        if field in COMPACT_INDEX_TREE_FIELDS:
+            doc[field] = dict(doc.get(field) or {}, indices=_unpack_index_tree(value))
+        else:
+            doc[field] = _unpack_ids(value)
+    return doc
+
+
+_PACKED_HEX_ID, _PACKED_UUID, _PACKED_OTHER_ID, _PACKED_NONE = 0, 1, 2, 3
+_HEX_ID_RE = re.compile(r'^[0-9a-f]{32}\Z')
+_UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\Z')
+
+
+def _pack_ids(ids):
+    """Packs a list of ids (or Nones) into a base64 string
+
+    Case ids are nearly always UUIDs, which take 17 bytes each: a tag byte
+    saying how to format the UUID and its 16 bytes. Other ids are stored as
+    a tag byte, their length and their UTF-8 encoding.
+    """
+    packed = []
+    for id_ in ids:
+        if id_ is None:
+            packed.append(struct.pack('>B', _PACKED_NONE))
+        elif _HEX_ID_RE.match(id_):
+            packed.append(struct.pack('>B', _PACKED_HEX_ID) + uuid.UUID(id_).bytes)
+        elif _UUID_RE.match(id_):
+            packed.append(struct.pack('>B', _PACKED_UUID) + uuid.UUID(id_).bytes)
+        else:
+            encoded = id_.encode('utf-8')
+            packed.append(struct.pack('>BI', _PACKED_OTHER_ID, len(encoded)) + encoded)
+    return base64.b64encode(b''.join(packed)).decode('ascii')
+
+
+def _unpack_ids(value):
+    packed = bytearray(base64.b64decode(value))
+    ids = []
+    pos = 0
+    while pos < len(packed):
+        tag = packed[pos]
+        if tag == _PACKED_NONE:
+            ids.append(None)
+            pos += 1
+        elif tag in (_PACKED_HEX_ID, _PACKED_UUID):
+            id_ = uuid.UUID(bytes=bytes(packed[pos + 1:pos + 17]))
+            ids.append(six.text_type(id_.hex if tag == _PACKED_HEX_ID else id_))
+            pos += 17
+        else:
+            length, = struct.unpack_from('>I', packed, pos + 1)
+            ids.append(packed[pos + 5:pos + 5 + length].decode('utf-8'))
+            pos += 5 + length
+    return ids
+
+
+def _pack_index_tree(indices):
+    """Packs the indices of an IndexTree
+
+    The tree is flattened to (case id, identifier, referenced id) rows.
+    The ids are packed and the identifiers, which repeat, are compressed.
+    """
+    case_ids, identifiers, referenced_ids = [], [], []
+    for case_id, case_indices in sorted(indices.items()):
+        # a case without indices keeps its (empty) entry
+        for identifier, referenced_id in sorted(case_indices.items()) or [(None, None)]:
+            case_ids.append(case_id)
+            identifiers.append(identifier)
+            referenced_ids.append(referenced_id)
+    identifiers = json.dumps(identifiers, separators=(',', ':')).encode('utf-8')
+    return {
+        'case_ids': _pack_ids(case_ids),
+        'identifiers': base64.b64encode(zlib.compress(identifiers)).decode('ascii'),
+        'referenced_ids': _pack_ids(referenced_ids),
+    }
+
+
+def _unpack_index_tree(value):
+    identifiers = json.loads(zlib.decompress(base64.b64decode(value['identifiers'])).decode('utf-8'))
+    indices = {}
+    for case_id, identifier, referenced_id in zip(
+            _unpack_ids(value['case_ids']), identifiers, _unpack_ids(value['referenced_ids'])):
+        case_indices = indices.setdefault(case_id, {})
+        if identifier is not None:
+            case_indices[identifier] = referenced_id
+    return indices
 
 
 @architect.install('partition', type='range', subtype='date', constraint='week', column='date')
@@ -1303,6 +1438,7 @@ def get_properly_wrapped_sync_log(doc_id):
 
 
 def properly_wrap_sync_log(doc):
+    doc = expand_synclog_doc(doc)
     return get_sync_log_class_by_format(doc.get('log_format')).wrap(doc)
 
 
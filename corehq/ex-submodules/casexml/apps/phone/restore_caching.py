@@ -3,7 +3,13 @@ from __future__ import unicode_literals
 import hashlib
 import logging
 import datetime
-from casexml.apps.phone.const import RESTORE_CACHE_KEY_PREFIX, ASYNC_RESTORE_CACHE_KEY_PREFIX
+from casexml.apps.case import const
+from casexml.apps.case.xml import LEGAL_VERSIONS
+from casexml.apps.phone.const import (
+    ASYNC_RESTORE_CACHE_KEY_PREFIX,
+    CASE_XML_CACHE_KEY_PREFIX,
+    RESTORE_CACHE_KEY_PREFIX,
+)
 from corehq.toggles import ENABLE_LOADTEST_USERS
 from corehq.util.quickcache import quickcache
 from dimagi.utils.couch.cache.cache_core import get_redis_default_cache
@@ -95,3 +101,71 @@ class RestorePayloadPathCache(_RestoreCache):
 class AsyncRestoreTaskIdCache(_RestoreCache):
     timeout = 24 * 60 * 60
     prefix = ASYNC_RESTORE_CACHE_KEY_PREFIX
+
+
+class CaseXMLFragmentCache(object):
+    """Serialized ``<case>`` blocks shared by every user that syncs a case
+
+    Fragments are stored per case, restore version and set of required
+    updates along with the ``server_modified_on`` of the case they were
+    rendered from, so they go stale as soon as the case is modified.
+    """
+    timeout = 24 * 60 * 60
+    # every combination of actions ``CaseSyncUpdate`` can require
+    possible_updates = [
+        [const.CASE_ACTION_UPDATE],
+        [const.CASE_ACTION_CREATE, const.CASE_ACTION_UPDATE],
+        [const.CASE_ACTION_UPDATE, const.CASE_ACTION_CLOSE],
+        [const.CASE_ACTION_CREATE, const.CASE_ACTION_UPDATE, const.CASE_ACTION_CLOSE],
+    ]
+
+    def __init__(self, version):
+        self.version = version
+
+    @staticmethod
+    def _make_cache_key(case_id, version, required_updates):
+        return '{}:{}:{}:{}'.format(
+            CASE_XML_CACHE_KEY_PREFIX, version, '-'.join(required_updates), case_id
+        )
+
+    def _cache_key(self, update):
+        return self._make_cache_key(update.case.case_id, self.version, update.required_updates)
+
+    def get_many(self, updates):
+        """
+        :param updates: list of ``CaseSyncUpdate`` objects
+        :return: dict of case_id -> XML bytes for the updates with a fresh fragment
+        """
+        updates = [update for update in updates if update.case.server_modified_on]
+        if not updates:
+            return {}
+        cached = get_redis_default_cache().get_many([self._cache_key(update) for update in updates])
+        fragments = {}
+        for update in updates:
+            value = cached.get(self._cache_key(update))
+            if value is not None:
+                server_modified_on, xml = value
+                if server_modified_on == update.case.server_modified_on:
+                    fragments[update.case.case_id] = xml
+        return fragments
+
+    def set_many(self, updates_with_xml):
+        """
+        :param updates_with_xml: list of (``CaseSyncUpdate``, XML bytes) tuples
+        """
+        values = {
+            self._cache_key(update): (update.case.server_modified_on, xml)
+            for update, xml in updates_with_xml
+            if update.case.server_modified_on
+        }
+        if values:
+            get_redis_default_cache().set_many(values, timeout=self.timeout)
+
+    @classmethod
+    def invalidate(cls, case_ids):
+        get_redis_default_cache().delete_many([
+            cls._make_cache_key(case_id, version, required_updates)
+            for case_id in case_ids
+            for version in LEGAL_VERSIONS
+            for required_updates in cls.possible_updates
+        ])
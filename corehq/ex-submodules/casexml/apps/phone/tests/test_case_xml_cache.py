@@ -0,0 +1,71 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from datetime import datetime, timedelta
+from xml.etree import cElementTree as ElementTree
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+from mock import Mock, patch
+
+from casexml.apps.case import const
+from casexml.apps.case.xml import V2
+from casexml.apps.phone.data_providers.case.load_testing import get_xml_for_updates
+from casexml.apps.phone.restore_caching import CaseXMLFragmentCache
+from corehq.util.test_utils import flag_enabled
+
+
+def _element(case, updates, version):
+    element = ElementTree.Element('case')
+    element.attrib['case_id'] = case.case_id
+    element.attrib['modified'] = case.server_modified_on.isoformat()
+    return element
+
+
+@flag_enabled('RESTORE_CASE_XML_CACHE')
+@patch('casexml.apps.phone.data_providers.case.load_testing.get_case_element', side_effect=_element)
+class CaseXMLFragmentCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        cache = LocMemCache('case-xml-test', {})
+        patcher = patch('casexml.apps.phone.restore_caching.get_redis_default_cache', return_value=cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.restore_state = Mock(domain='test-domain', version=V2, loadtest_factor=1)
+        self.modified_on = datetime(2018, 6, 1)
+
+    def _update(self, case_id, modified_on=None, required_updates=None):
+        case = Mock(case_id=case_id, server_modified_on=modified_on or self.modified_on, type='person')
+        return Mock(case=case, required_updates=required_updates or [const.CASE_ACTION_UPDATE])
+
+    def test_fragments_reused(self, get_case_element):
+        first = get_xml_for_updates([self._update('a'), self._update('b')], self.restore_state)
+        second = get_xml_for_updates([self._update('b'), self._update('a')], self.restore_state)
+        self.assertEqual(2, get_case_element.call_count)
+        self.assertEqual(list(reversed(first)), second)
+
+    def test_modified_case_rendered(self, get_case_element):
+        get_xml_for_updates([self._update('a')], self.restore_state)
+        later = self.modified_on + timedelta(minutes=1)
+        xml, = get_xml_for_updates([self._update('a', modified_on=later)], self.restore_state)
+        self.assertEqual(2, get_case_element.call_count)
+        self.assertIn(later.isoformat().encode('utf-8'), xml)
+
+    def test_required_updates_in_key(self, get_case_element):
+        get_xml_for_updates([self._update('a')], self.restore_state)
+        create = [const.CASE_ACTION_CREATE, const.CASE_ACTION_UPDATE]
+        get_xml_for_updates([self._update('a', required_updates=create)], self.restore_state)
+        self.assertEqual(2, get_case_element.call_count)
+
+    def test_invalidate(self, get_case_element):
+        get_xml_for_updates([self._update('a')], self.restore_state)
+        CaseXMLFragmentCache.invalidate(['a'])
+        get_xml_for_updates([self._update('a')], self.restore_state)
+        self.assertEqual(2, get_case_element.call_count)
+
+    def test_loadtest_not_cached(self, get_case_element):
+        self.restore_state.loadtest_factor = 2
+        update = self._update('a')
+        update.case.type = 'commcare-user'
+        get_xml_for_updates([update], self.restore_state)
+        get_xml_for_updates([update], self.restore_state)
+        self.assertEqual(2, get_case_element.call_count)
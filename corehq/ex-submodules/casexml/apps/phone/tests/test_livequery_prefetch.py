@@ -0,0 +1,76 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from django.test import SimpleTestCase
+from mock import Mock, patch
+
+from casexml.apps.phone.data_providers.case import livequery
+from corehq.util.timer import TimingContext
+from six.moves import range
+
+
+class FakeCase(object):
+
+    def __init__(self, case_id):
+        self.case_id = case_id
+
+
+class FakeAccessor(object):
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def get_cases(self, case_ids):
+        self.calls += 1
+        if self.fail_after is not None and self.calls > self.fail_after:
+            raise ValueError("fetch failed")
+        return [FakeCase(case_id) for case_id in case_ids]
+
+
+@patch.object(livequery, 'CASE_BATCH_SIZE', 3)
+@patch.object(livequery.connections, 'close_all', Mock())
+class PrefetchBatchesTest(SimpleTestCase):
+
+    case_ids = ['case{}'.format(i) for i in range(8)]
+
+    def _prefetch(self, accessor, uses_ledgers=False):
+        restore_state = Mock(domain='test-domain')
+        timing_context = TimingContext('restore')
+        with patch.object(livequery, 'uses_ledgers', return_value=uses_ledgers), \
+                patch.object(livequery, 'get_current_ledger_state',
+                             side_effect=lambda domain, cases: {case.case_id: {} for case in cases}):
+            with timing_context:
+                batches = list(livequery.prefetch_batches(
+                    timing_context, restore_state, accessor, self.case_ids, queue_size=1
+                ))
+        return batches, timing_context
+
+    def test_batches_in_order(self):
+        batches, _ = self._prefetch(FakeAccessor())
+        self.assertEqual(
+            [[case.case_id for case in cases] for cases, _ in batches],
+            [self.case_ids[0:3], self.case_ids[3:6], self.case_ids[6:8]],
+        )
+        self.assertEqual([None, None, None], [ledgers for _, ledgers in batches])
+
+    def test_ledgers_prefetched(self):
+        batches, _ = self._prefetch(FakeAccessor(), uses_ledgers=True)
+        self.assertEqual(
+            [sorted(ledgers) for _, ledgers in batches],
+            [self.case_ids[0:3], self.case_ids[3:6], self.case_ids[6:8]],
+        )
+
+    def test_fetch_timings_reported(self):
+        _, timing_context = self._prefetch(FakeAccessor(), uses_ledgers=True)
+        names = [timer.name for timer in timing_context.to_list(exclude_root=True)]
+        self.assertEqual(3, names.count('wait_for_prefetch'))
+        self.assertEqual(3, names.count('fetch_cases'))
+        self.assertEqual(3, names.count('fetch_ledgers'))
+        self.assertIn('restore.prefetch (3 cases).fetch_cases', [
+            timer.full_name for timer in timing_context.to_list()
+        ])
+
+    def test_fetch_error_raised(self):
+        with self.assertRaises(ValueError):
+            self._prefetch(FakeAccessor(fail_after=1))
@@ -1,9 +1,18 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+import json
 import uuid
 from django.test import TestCase, SimpleTestCase
 from casexml.apps.case.xml import V1
-from casexml.apps.phone.models import SyncLog, CaseState
+from casexml.apps.phone.models import (
+    COMPACT_MIN_SIZE,
+    CaseState,
+    IndexTree,
+    SimplifiedSyncLog,
+    SyncLog,
+    compact_synclog_doc,
+    properly_wrap_sync_log,
+)
 from casexml.apps.case.sharedmodels import CommCareCaseIndex
 from casexml.apps.phone.restore import RestoreParams, RestoreConfig
 from casexml.apps.phone.tests.utils import create_restore_user
@@ -79,6 +88,55 @@ class PhoneFootprintTest(SimpleTestCase):
         self.assertEqual(0, len(log.get_footprint_of_cases_on_phone()))
 
 
+class CompactSyncLogTest(SimpleTestCase):
+
+    def _get_sync_log(self, num_cases):
+        case_ids = [uuid.uuid4().hex for _ in range(num_cases)]
+        return SimplifiedSyncLog(
+            domain='compact-sync-log',
+            user_id='user',
+            case_ids_on_phone=set(case_ids),
+            dependent_case_ids_on_phone=set(case_ids[:num_cases // 2]),
+            index_tree=IndexTree(indices={
+                case_id: {'parent': parent_id} for case_id, parent_id in zip(case_ids[1:], case_ids)
+            }),
+        )
+
+    def test_small_sync_log_unchanged(self):
+        doc = self._get_sync_log(10).to_json()
+        self.assertIs(compact_synclog_doc(doc), doc)
+
+    def test_round_trip(self):
+        sync_log = self._get_sync_log(300)
+        doc = sync_log.to_json()
+        compact_doc = compact_synclog_doc(doc)
+        self.assertEqual(
+            set(compact_doc['compact_fields']),
+            {'case_ids_on_phone', 'dependent_case_ids_on_phone', 'index_tree'}
+        )
+        self.assertNotIn('case_ids_on_phone', compact_doc)
+        self.assertEqual(compact_doc['index_tree']['indices'], {})
+        self.assertLess(len(json.dumps(compact_doc)), len(json.dumps(doc)))
+
+        wrapped = properly_wrap_sync_log(compact_doc)
+        self.assertEqual(wrapped.case_ids_on_phone, sync_log.case_ids_on_phone)
+        self.assertEqual(wrapped.dependent_case_ids_on_phone, sync_log.dependent_case_ids_on_phone)
+        self.assertEqual(wrapped.index_tree.indices, sync_log.index_tree.indices)
+        self.assertEqual(wrapped.closed_cases, set())
+
+
+    def test_round_trip_ids_that_are_not_uuid_hex(self):
+        sync_log = self._get_sync_log(COMPACT_MIN_SIZE)
+        odd_ids = {str(uuid.uuid4()), 'not-a-uuid', '\u00fcn\u00efc\u00f8de', 'A' * 32}
+        sync_log.case_ids_on_phone |= odd_ids
+        sync_log.index_tree.indices['not-a-uuid'] = {'host': str(uuid.uuid4())}
+        sync_log.index_tree.indices['no-indices'] = {}
+
+        wrapped = properly_wrap_sync_log(compact_synclog_doc(sync_log.to_json()))
+        self.assertEqual(wrapped.case_ids_on_phone, sync_log.case_ids_on_phone)
+        self.assertEqual(wrapped.index_tree.indices, sync_log.index_tree.indices)
+
+
 class SyncLogModelTest(TestCase):
     domain = 'sync-log-model-test'
 
@@ -0,0 +1,118 @@
+"""
+Helpers for building zip archives out of data that is already deflate
+compressed, so large exports are compressed once, while rows are written,
+instead of being written out uncompressed and then compressed again when the
+archive is built.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import struct
+import time
+import zipfile
+import zlib
+from io import open
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class DeflatedFile(object):
+    """
+    Write only file-like object that deflate compresses everything written to
+    it into ``fileobj``, keeping track of what ``StreamingZipFile`` needs to add
+    the compressed data to an archive as is.
+    """
+
+    def __init__(self, fileobj, level=zlib.Z_DEFAULT_COMPRESSION):
+        self.fileobj = fileobj
+        self.crc = 0
+        self.file_size = 0
+        self.compress_size = 0
+        # negative wbits gives raw deflate data, which is what zip members contain
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+
+    def write(self, data):
+        self.crc = zlib.crc32(data, self.crc) & 0xffffffff
+        self.file_size += len(data)
+        self._write_compressed(self._compressor.compress(data))
+
+    def flush(self):
+        """
+        Finish the compressed stream. Nothing can be written after this.
+        """
+        self._write_compressed(self._compressor.flush())
+
+    def _write_compressed(self, data):
+        self.compress_size += len(data)
+        self.fileobj.write(data)
+
+
+class StreamingZipFile(zipfile.ZipFile):
+    """
+    ``ZipFile`` that can add members from already compressed data without
+    decompressing it first.
+    """
+
+    def write_deflated(self, arcname, fileobj, deflated):
+        """
+        Add the compressed data in ``fileobj`` to the archive
+
+        :param fileobj: file positioned at the start of the compressed data
+        :param deflated: the ``DeflatedFile`` that the data was written with
+        """
+        zinfo = zipfile.ZipInfo(arcname, time.localtime()[:6])
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        zinfo.external_attr = 0o600 << 16
+        zinfo.CRC = deflated.crc
+        zinfo.file_size = deflated.file_size
+        zinfo.compress_size = deflated.compress_size
+        self._write_member(zinfo, fileobj)
+
+    def copy_member(self, source_path, source_info, arcname):
+        """
+        Copy a member of the archive at ``source_path`` into this archive
+        under a new name, without decompressing it.
+        """
+        zinfo = zipfile.ZipInfo(arcname, source_info.date_time)
+        zinfo.compress_type = source_info.compress_type
+        zinfo.external_attr = source_info.external_attr
+        zinfo.CRC = source_info.CRC
+        zinfo.file_size = source_info.file_size
+        zinfo.compress_size = source_info.compress_size
+        with open(source_path, 'rb') as source:
+            source.seek(source_info.header_offset)
+            header = source.read(zipfile.sizeFileHeader)
+            name_length, extra_length = struct.unpack(b'<HH', header[26:30])
+            source.seek(name_length + extra_length, 1)
+            self._write_member(zinfo, source)
+
+    def _write_member(self, zinfo, fileobj):
+        self._writecheck(zinfo)
+        self._didModify = True
+        zinfo.header_offset = self.fp.tell()
+        self.fp.write(zinfo.FileHeader())
+        _copy_bytes(fileobj, self.fp, zinfo.compress_size)
+        self.filelist.append(zinfo)
+        self.NameToInfo[zinfo.filename] = zinfo
+        # where python 3 writes the next member and the central directory
+        self.start_dir = self.fp.tell()
+
+
+def _copy_bytes(source, destination, length):
+    while length > 0:
+        data = source.read(min(length, COPY_BUFFER_SIZE))
+        if not data:
+            raise IOError("Unexpected end of file while copying zip member data")
+        destination.write(data)
+        length -= len(data)
+
+
+def copy_archive_members(destination, source_path, rename):
+    """
+    Copy every member of the zip archive at ``source_path`` into the
+    ``StreamingZipFile`` ``destination``, naming them ``rename(name)``.
+    """
+    with zipfile.ZipFile(source_path, 'r') as source:
+        members = source.infolist()
+    for zinfo in members:
+        destination.copy_member(source_path, zinfo, rename(zinfo.filename))
+
@@ -0,0 +1,62 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import os
+import tempfile
+import zipfile
+
+from django.test import SimpleTestCase
+
+from couchexport.archives import DeflatedFile, StreamingZipFile, copy_archive_members
+from six.moves import range
+
+
+class StreamingZipFileTests(SimpleTestCase):
+
+    def setUp(self):
+        self.paths = []
+
+    def tearDown(self):
+        for path in self.paths:
+            os.remove(path)
+
+    def _temp_path(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.paths.append(path)
+        return path
+
+    def _write_deflated(self, archive, name, content):
+        with tempfile.TemporaryFile() as raw:
+            deflated = DeflatedFile(raw)
+            for i in range(0, len(content), 7):
+                deflated.write(content[i:i + 7])
+            deflated.flush()
+            raw.seek(0)
+            archive.write_deflated(name, raw, deflated)
+
+    def test_write_deflated(self):
+        path = self._temp_path()
+        content = b'a,b,c\r\n' * 1000
+        with StreamingZipFile(path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+            self._write_deflated(archive, 'export/table.csv', content)
+            archive.writestr('export/other.csv', b'x,y\r\n')
+
+        with zipfile.ZipFile(path) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.read('export/table.csv'), content)
+            self.assertEqual(archive.read('export/other.csv'), b'x,y\r\n')
+
+    def test_copy_archive_members(self):
+        page_path = self._temp_path()
+        with StreamingZipFile(page_path, 'w', zipfile.ZIP_DEFLATED) as page:
+            self._write_deflated(page, 'export/table.csv', b'1,2,3\r\n')
+
+        final_path = self._temp_path()
+        with StreamingZipFile(final_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+            copy_archive_members(archive, page_path, lambda name: '0_' + name)
+            copy_archive_members(archive, page_path, lambda name: '1_' + name)
+
+        with zipfile.ZipFile(final_path) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.namelist(), ['0_export/table.csv', '1_export/table.csv'])
+            self.assertEqual(archive.read('1_export/table.csv'), b'1,2,3\r\n')
@@ -5,10 +5,10 @@ from codecs import BOM_UTF8
 from contextlib import closing
 import io
 import os
+import zipfile
 
 from django.test import SimpleTestCase
 from lxml import html, etree
-from mock import patch, Mock
 
 from couchexport.export import export_from_tables
 from couchexport.models import Format
@@ -18,39 +18,46 @@ from couchexport.writers import ZippedExportWriter, CsvFileWriter, PythonDictWri
 class ZippedExportWriterTests(SimpleTestCase):
 
     def setUp(self):
-        self.zip_file_patch = patch('zipfile.ZipFile')
-        self.MockZipFile = self.zip_file_patch.start()
-
-        self.path_mock = Mock()
-        self.path_mock.get_path.return_value = 'tmp'
+        self.table = CsvFileWriter(compress=True)
+        self.table.open('table')
+        self.table.write_row(['ham', 'spam'])
+        self.table.finish()
 
         self.writer = ZippedExportWriter()
         self.writer.archive_basepath = '✓path'.encode('utf-8')
-        self.writer.tables = [self.path_mock]
-        self.writer.file = Mock()
+        self.writer.tables = {0: self.table}
+        self.writer.file = io.BytesIO()
 
     def tearDown(self):
-        self.zip_file_patch.stop()
+        self.table.close()
         del self.writer
 
+    def _get_archive(self):
+        self.writer._write_final_result()
+        return zipfile.ZipFile(self.writer.file)
+
     def test_zipped_export_writer_unicode(self):
-        mock_zip_file = self.MockZipFile.return_value
         self.writer.table_names = {0: 'ひらがな'}
-        self.writer._write_final_result()
-        mock_zip_file.write.assert_called_with(
-            'tmp',
-            os.path.join(self.writer.archive_basepath, 'ひらがな.csv'.encode('utf-8'))
+        archive = self._get_archive()
+        self.assertEqual(
+            archive.namelist(),
+            [os.path.join(self.writer.archive_basepath, 'ひらがな.csv'.encode('utf-8'))]
         )
 
     def test_zipped_export_writer_utf8(self):
-        mock_zip_file = self.MockZipFile.return_value
         self.writer.table_names = {0: b'\xe3\x81\xb2\xe3\x82\x89\xe3\x81\x8c\xe3\x81\xaa'}
-        self.writer._write_final_result()
-        mock_zip_file.write.assert_called_with(
-            'tmp',
-            os.path.join(self.writer.archive_basepath, 'ひらがな.csv'.encode('utf-8'))
+        archive = self._get_archive()
+        self.assertEqual(
+            archive.namelist(),
+            [os.path.join(self.writer.archive_basepath, 'ひらがな.csv'.encode('utf-8'))]
         )
 
+    def test_compressed_table_added_as_is(self):
+        self.writer.table_names = {0: 'table'}
+        archive = self._get_archive()
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.read(archive.namelist()[0]), BOM_UTF8 + b'ham,spam\r\n')
+
 
 class CsvFileWriterTests(SimpleTestCase):
 
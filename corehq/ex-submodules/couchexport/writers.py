@@ -17,6 +17,7 @@ from django.template.loader import render_to_string, get_template
 from django.utils.functional import Promise
 import xlwt
 
+from couchexport.archives import DeflatedFile, StreamingZipFile
 from couchexport.models import Format
 import six
 from six.moves import zip
@@ -58,8 +59,15 @@ class UniqueHeaderGenerator(object):
 
 class ExportFileWriter(object):
 
-    def __init__(self):
+    def __init__(self, compress=False):
+        """
+        :param compress: Deflate the file as it is written. The file then holds
+        raw deflate data that can be added to a zip archive with
+        ``StreamingZipFile.write_deflated`` along with ``self.deflated``.
+        """
         self.name = None
+        self.compress = compress
+        self.deflated = None
         self._isopen = False
         self._file = None
         self._path = None
@@ -79,6 +87,8 @@ class ExportFileWriter(object):
         fd, path = tempfile.mkstemp()
         self._file = os.fdopen(fd, 'wb+')
         self._path = path
+        if self.compress:
+            self.deflated = DeflatedFile(self._file)
         self._open()
         self._begin_file()
 
@@ -91,11 +101,19 @@ class ExportFileWriter(object):
     def write_row(self, row):
         raise NotImplementedError
 
+    def _write(self, data):
+        if self.deflated:
+            self.deflated.write(data)
+        else:
+            self._file.write(data)
+
     def _end_file(self):
         pass
 
     def finish(self):
         self._end_file()
+        if self.deflated:
+            self.deflated.flush()
         self._file.seek(0)
 
     def close(self):
@@ -109,7 +127,7 @@ class CsvFileWriter(ExportFileWriter):
 
     def _open(self):
         # Excel needs UTF8-encoded CSVs to start with the UTF-8 byte-order mark (FB 163268)
-        self._file.write(BOM_UTF8)
+        self._write(BOM_UTF8)
 
     def write_row(self, row):
         buffer = io.StringIO()
@@ -118,13 +136,13 @@ class CsvFileWriter(ExportFileWriter):
             col.decode('utf-8') if isinstance(col, six.binary_type) else col
             for col in row
         ])
-        self._file.write(buffer.getvalue().encode('utf-8'))
+        self._write(buffer.getvalue().encode('utf-8'))
 
 
 class PartialHtmlFileWriter(ExportFileWriter):
 
     def _write_from_template(self, context):
-        self._file.write(self.template.render(context).encode('utf-8'))
+        self._write(self.template.render(context).encode('utf-8'))
 
     def _open(self):
         self.template = get_template("couchexport/html_export.html")
@@ -269,13 +287,15 @@ class OnDiskExportWriter(ExportWriter):
     Keeps tables in temporary csv files. Subclassed by other export writers.
     """
     writer_class = CsvFileWriter
+    # whether the table files are deflated as they are written
+    compress_tables = False
 
     def _init(self):
         self.tables = OrderedDict()
         self.table_names = OrderedDict()
 
     def _init_table(self, table_index, table_title):
-        writer = self.writer_class()
+        writer = self.writer_class(compress=self.compress_tables)
         self.tables[table_index] = writer
         writer.open(table_title)
         self.table_names[table_index] = table_title
@@ -315,16 +335,21 @@ class OnDiskExportWriter(ExportWriter):
 class ZippedExportWriter(OnDiskExportWriter):
     """
     Writer that creates a zip file containing a csv for each table.
+
+    Tables are compressed as rows are written and the compressed data is
+    copied into the archive as is, so building the archive doesn't need
+    another pass over the uncompressed data.
     """
     table_file_extension = b".csv"
+    compress_tables = True
 
     def _write_final_result(self):
-        archive = zipfile.ZipFile(self.file, 'w', zipfile.ZIP_DEFLATED)
+        archive = StreamingZipFile(self.file, 'w', zipfile.ZIP_DEFLATED, allowZip64=True)
         for index, name in self.table_names.items():
             if isinstance(name, six.text_type):
                 name = name.encode('utf-8')
-            path = self.tables[index].get_path()
-            archive.write(path, self._get_archive_filename(name))
+            table = self.tables[index]
+            archive.write_deflated(self._get_archive_filename(name), table.get_file(), table.deflated)
         archive.close()
         self.file.seek(0)
 
@@ -2,7 +2,8 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 import os
 from django.conf import settings
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from mock import patch
 
 from corehq.apps.receiverwrapper.util import submit_form_locally
 from corehq.form_processor.interfaces.dbaccessors import FormAccessors
@@ -32,6 +33,19 @@ class DuplicateFormTest(TestCase, TestFileMixin):
         if getattr(settings, 'TESTS_SHOULD_USE_SQL_BACKEND', False):
             self.assertEqual(self.ID, xform.orig_id)
 
+    @override_settings(SKIP_FORM_LOCK_FOR_RECENT_DUPLICATES=True)
+    def test_recent_duplicate_skips_lock(self):
+        xml_data = self.get_xml('duplicate')
+        submit_form_locally(xml_data, 'test-domain')
+        # the first duplicate takes the lock and is recorded
+        submit_form_locally(xml_data, 'test-domain')
+
+        with patch('corehq.form_processor.parsers.form.LockedFormProcessingResult') as locked_result:
+            xform = submit_form_locally(xml_data, 'test-domain').xform
+        locked_result.assert_not_called()
+        self.assertNotEqual(self.ID, xform.form_id)
+        self.assertTrue(xform.is_duplicate)
+
     def test_wrong_doc_type(self):
         domain = 'test-domain'
         instance = self.get_xml('duplicate')
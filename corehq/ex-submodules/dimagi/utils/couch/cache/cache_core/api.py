@@ -6,7 +6,7 @@ import simplejson
 from . import COUCH_CACHE_TIMEOUT, CACHE_DOCS, rcache, key_doc_id
 from .const import INTERRUPTED
 from .gen import GenerationCache
-from .lib import invalidate_doc_generation, _get_cached_doc_only
+from .lib import invalidate_doc_generation, _get_cached_doc_only, _get_cached_docs_only
 
 
 class FakeViewResults(list):
@@ -63,6 +63,15 @@ def do_cache_doc(doc, cache_expire=COUCH_CACHE_TIMEOUT):
         rcache().set(key_doc_id(doc['_id']), simplejson.dumps(doc), timeout=cache_expire)
 
 
+def do_cache_docs(docs, cache_expire=COUCH_CACHE_TIMEOUT):
+    """Cache already opened doc instances with a single cache request"""
+    if CACHE_DOCS and docs:
+        rcache().set_many(
+            {key_doc_id(doc['_id']): simplejson.dumps(doc) for doc in docs},
+            timeout=cache_expire
+        )
+
+
 def cached_open_doc(db, doc_id, cache_expire=COUCH_CACHE_TIMEOUT, **params):
     """
     Main wrapping function to open up a doc. Replace db.open_doc(doc_id)
@@ -80,6 +89,31 @@ def cached_open_doc(db, doc_id, cache_expire=COUCH_CACHE_TIMEOUT, **params):
         return cached_doc
 
 
+def cached_open_docs(db, doc_ids, cache_expire=COUCH_CACHE_TIMEOUT):
+    """
+    Bulk version of cached_open_doc. Cached docs are read with one cache
+    request, the rest are fetched from couch with one request and then
+    cached with one more.
+
+    return: dict of doc_id -> doc for the docs that exist
+    """
+    from dimagi.utils.couch.bulk import get_docs
+    doc_ids = list(doc_ids)
+    try:
+        docs = _get_cached_docs_only(doc_ids)
+        interrupted = False
+    except ConnectionInterrupted:
+        docs = {}
+        interrupted = True
+    missing = [doc_id for doc_id in doc_ids if doc_id not in docs]
+    if missing:
+        fetched = get_docs(db, missing)
+        if not interrupted:
+            do_cache_docs(fetched, cache_expire=cache_expire)
+        docs.update((doc['_id'], doc) for doc in fetched)
+    return docs
+
+
 def invalidate_doc(doc, deleted=False):
     """
     For a given doc, delete it and all reverses.
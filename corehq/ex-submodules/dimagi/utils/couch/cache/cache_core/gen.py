@@ -7,7 +7,6 @@ from django.conf import settings
 from django_redis.exceptions import ConnectionInterrupted
 import simplejson
 from dimagi.utils.couch.cache.cache_core.const import INTERRUPTED, MISSING
-from couchdbkit import ResourceNotFound
 
 
 class GenerationCache(object):
@@ -95,6 +94,13 @@ class GenerationCache(object):
         if isinstance(doc_or_docid, dict):
             do_cache_doc(doc_or_docid, cache_expire=cache_expire)
 
+    def _cached_view_docs(self, docs, cache_expire=COUCH_CACHE_TIMEOUT):
+        """
+        Bulk version of _cached_view_doc for a list of docs
+        """
+        from .api import do_cache_docs
+        do_cache_docs([doc for doc in docs if isinstance(doc, dict)], cache_expire=cache_expire)
+
 
     def cached_view(self, db, view_name, wrapper=None, cache_expire=COUCH_CACHE_TIMEOUT, force_invalidate=False,
                     **params):
@@ -107,7 +113,7 @@ class GenerationCache(object):
 
         Note, a view call with include_docs=True will not be wrapped, you must wrap it on your own.
         """
-        from .api import cached_open_doc
+        from .api import cached_open_docs
 
         include_docs = params.get('include_docs', False)
 
@@ -134,23 +140,22 @@ class GenerationCache(object):
                     final_results['total_rows'] = results['total_rows']
                     final_results['offset'] = results['offset']
 
+                    # this feels hacky, but for some reason other views are squashing the master cached doc.
+                    # a more true invalidation scheme should have this more readily address this, but for now
+                    # do a db call here and cache it. Should be a _cached_doc_only call here
+                    docs = cached_open_docs(db, [stub['id'] for stub in row_stubs], cache_expire=cache_expire)
                     rows = []
                     for stub in row_stubs:
-                        try:
-                            row = {
-                                "id": stub['id'],
-                                "value": None,
-                                "key": stub["key"],
-                                # this feels hacky, but for some reason other views are squashing the master cached doc.
-                                # a more true invalidation scheme should have this more readily address this, but for now
-                                # do a db call here and cache it. Should be a _cached_doc_only call here
-                                "doc": cached_open_doc(db, stub['id'])
-                            }
-                            rows.append(row)
-                        except ResourceNotFound:
+                        if stub['id'] not in docs:
                             # maybe the doc was deleted just after we cached the view.
                             # in that scenario, just don't add it to the results rather than failing hard
-                            pass
+                            continue
+                        rows.append({
+                            "id": stub['id'],
+                            "value": None,
+                            "key": stub["key"],
+                            "doc": docs[stub['id']],
+                        })
                     if wrapper:
                         final_results = [wrapper(x['doc']) for x in rows]
                     else:
@@ -171,8 +176,8 @@ class GenerationCache(object):
                         "value": None,
                         "key": row["key"],
                     }
-                    self._cached_view_doc(row["doc"], cache_expire=cache_expire)
                     row_stubs.append(stub)
+                self._cached_view_docs([row["doc"] for row in view_results["rows"]], cache_expire=cache_expire)
 
                 cached_results = {
                     "total_rows": view_obj._total_rows,
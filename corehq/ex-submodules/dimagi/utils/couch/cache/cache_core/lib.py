@@ -21,3 +21,16 @@ def _get_cached_doc_only(doc_id):
         return simplejson.loads(doc)
     else:
         return None
+
+
+def _get_cached_docs_only(doc_ids):
+    """
+    Bulk version of _get_cached_doc_only, using a single cache request.
+
+    returns: dict of doc_id -> doc for the docs that are cached
+    """
+    if not CACHE_DOCS or not doc_ids:
+        return {}
+    keys = {key_doc_id(doc_id): doc_id for doc_id in doc_ids}
+    cached = rcache().get_many(list(keys))
+    return {keys[key]: simplejson.loads(doc) for key, doc in cached.items() if doc}
@@ -0,0 +1,35 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+from mock import patch
+
+from dimagi.utils.couch.cache import cache_core
+
+
+@patch('dimagi.utils.couch.cache.cache_core.api.CACHE_DOCS', True)
+@patch('dimagi.utils.couch.cache.cache_core.lib.CACHE_DOCS', True)
+class CachedOpenDocsTests(SimpleTestCase):
+
+    def setUp(self):
+        self.cache = LocMemCache('couch-cache-tests', {})
+        cache_core.MOCK_REDIS_CACHE = self.cache
+
+    def tearDown(self):
+        self.cache.clear()
+        cache_core.MOCK_REDIS_CACHE = None
+
+    def test_cached_open_docs(self):
+        cache_core.do_cache_doc({'_id': 'cached', 'name': 'a'})
+        with patch('dimagi.utils.couch.bulk.get_docs', return_value=[{'_id': 'missing', 'name': 'b'}]) as get_docs:
+            docs = cache_core.cached_open_docs('db', ['cached', 'missing', 'deleted'])
+        get_docs.assert_called_once_with('db', ['missing', 'deleted'])
+        self.assertEqual(docs, {
+            'cached': {'_id': 'cached', 'name': 'a'},
+            'missing': {'_id': 'missing', 'name': 'b'},
+        })
+
+        with patch('dimagi.utils.couch.bulk.get_docs', return_value=[]) as get_docs:
+            docs = cache_core.cached_open_docs('db', ['cached', 'missing'])
+        get_docs.assert_not_called()
+        self.assertEqual(set(docs), {'cached', 'missing'})
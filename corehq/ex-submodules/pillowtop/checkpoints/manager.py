@@ -131,7 +131,11 @@ class PillowCheckpointEventHandler(ChangeEventHandler):
         self.checkpoint_callback = checkpoint_callback
 
     def should_update_checkpoint(self, context):
-        frequency_hit = context.changes_seen % self.checkpoint_frequency == 0
+        # true if any of the changes processed since the last event hit the frequency
+        changes_before = context.changes_seen - context.changes_processed
+        frequency_hit = (
+            context.changes_seen // self.checkpoint_frequency > changes_before // self.checkpoint_frequency
+        )
         time_hit = False
         if self.max_checkpoint_delay:
             seconds_since_last_update = (datetime.utcnow() - self.last_update).total_seconds()
@@ -1,3 +1,6 @@
 
 CHECKPOINT_FREQUENCY = 100
 CHECKPOINT_MIN_WAIT = 300
+# maximum time (in milliseconds) to wait for a chunk to fill up before
+# handing it to the batch processors
+CHUNK_MAX_WAIT_MS = 1000
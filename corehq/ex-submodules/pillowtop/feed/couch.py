@@ -15,7 +15,7 @@ class CouchChangeFeed(ChangeFeed):
         self._extra_couch_view_params = extra_couch_view_params or {}
         self._last_processed_seq = None
 
-    def iter_changes(self, since, forever):
+    def iter_changes(self, since, forever, idle_timeout_ms=None):
         from corehq.apps.change_feed.data_sources import SOURCE_COUCH
         extra_args = {'feed': 'continuous'} if forever else {}
         extra_args.update(self._extra_couch_view_params)
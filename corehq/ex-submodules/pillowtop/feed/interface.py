@@ -137,9 +137,12 @@ class ChangeFeed(six.with_metaclass(ABCMeta, object)):
     sequence_format = 'text'
 
     @abstractmethod
-    def iter_changes(self, since, forever):
+    def iter_changes(self, since, forever, idle_timeout_ms=None):
         """
         Iterates through all changes since a certain sequence ID.
+
+        :param idle_timeout_ms: When waiting forever, yield None whenever no change
+        arrived for this many milliseconds. Feeds that can't time out ignore it.
         """
         pass
 
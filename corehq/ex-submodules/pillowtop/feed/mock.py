@@ -13,7 +13,7 @@ class MockChangeFeed(ChangeFeed):
     def __init__(self, queue):
         self._queue = queue
 
-    def iter_changes(self, since, forever=False):
+    def iter_changes(self, since, forever=False, idle_timeout_ms=None):
         self._since = since
         if forever:
             raise ValueError('Forever option not supported for mock feed!')
@@ -44,7 +44,7 @@ class RandomChangeFeed(ChangeFeed):
         self._change_generator = change_generator or random_change
         self._since = None
 
-    def iter_changes(self, since, forever=False):
+    def iter_changes(self, since, forever=False, idle_timeout_ms=None):
         self._since = since
         if forever:
             raise ValueError('Forever option not supported for random feed!')
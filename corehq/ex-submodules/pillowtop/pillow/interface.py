@@ -11,7 +11,7 @@ from corehq.util.datadog.gauges import datadog_counter, datadog_gauge, datadog_h
 from corehq.util.timer import TimingContext
 from dimagi.utils.logging import notify_exception
 from kafka.common import TopicAndPartition
-from pillowtop.const import CHECKPOINT_MIN_WAIT
+from pillowtop.const import CHECKPOINT_MIN_WAIT, CHUNK_MAX_WAIT_MS
 from pillowtop.dao.exceptions import DocumentMissingError
 from pillowtop.utils import force_seq_int
 from pillowtop.exceptions import PillowtopCheckpointReset
@@ -37,6 +37,8 @@ class PillowRuntimeContext(object):
 
     def __init__(self, changes_seen=0):
         self.changes_seen = changes_seen
+        # number of changes processed since the last change processed event, more than one for chunks
+        self.changes_processed = 1
 
 
 class PillowBase(six.with_metaclass(ABCMeta, object)):
@@ -48,6 +50,11 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
     # set to true to disable saving pillow retry errors
     retry_errors = True
 
+    # set to a positive number to hand changes to batch processors in chunks
+    processor_chunk_size = 0
+    # maximum time to wait for a chunk to fill up before processing it
+    processor_chunk_max_wait_ms = CHUNK_MAX_WAIT_MS
+
     @abstractproperty
     def pillow_id(self):
         """
@@ -112,21 +119,105 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
         Process changes from the changes stream.
         """
         context = PillowRuntimeContext(changes_seen=0)
+        chunked = bool(self.processor_chunk_size and self.batch_processors)
+        changes_chunk = []
+        chunk_started = None
+        # get control back from an idle feed to process the partial chunk
+        idle_timeout_ms = self.processor_chunk_max_wait_ms if chunked else None
         try:
-            for change in self.get_change_feed().iter_changes(since=since or None, forever=forever):
+            changes = self.get_change_feed().iter_changes(
+                since=since or None, forever=forever, idle_timeout_ms=idle_timeout_ms
+            )
+            for change in changes:
                 if change:
                     context.changes_seen += 1
-                    self.process_with_error_handling(change, context)
+                    if not chunked:
+                        self.process_with_error_handling(change, context)
+                        continue
+
+                    if not changes_chunk:
+                        chunk_started = datetime.utcnow()
+                    changes_chunk.append(change)
+                    if self._chunk_is_ready(changes_chunk, chunk_started):
+                        self.process_chunk_with_error_handling(changes_chunk, context)
+                        changes_chunk = []
                 else:
+                    if changes_chunk:
+                        self.process_chunk_with_error_handling(changes_chunk, context)
+                        changes_chunk = []
                     self._update_checkpoint(None, None)
+
+            if changes_chunk:
+                self.process_chunk_with_error_handling(changes_chunk, context)
         except PillowtopCheckpointReset:
             self.process_changes(since=self.get_last_checkpoint_sequence(), forever=forever)
 
+    def _chunk_is_ready(self, changes_chunk, chunk_started):
+        if len(changes_chunk) >= self.processor_chunk_size:
+            return True
+        elapsed_ms = (datetime.utcnow() - chunk_started).total_seconds() * 1000
+        return elapsed_ms >= self.processor_chunk_max_wait_ms
+
     def process_with_error_handling(self, change, context):
+        if self._process_with_error_handling(change, self.process_change):
+            self._update_checkpoint(change, context)
+
+    def process_chunk_with_error_handling(self, changes_chunk, context):
+        """
+        Hand the whole chunk to each batch processor. Changes that a batch processor
+        could not handle (or all changes, if it raised) are then retried one at a time
+        through that processor along with any processors that don't support batching,
+        using the regular per-change error handling.
+        """
+        failed_processors = {}
+        timer = TimingContext()
+        with timer:
+            for processor in self.batch_processors:
+                try:
+                    retry_changes = processor.process_changes_chunk(self, changes_chunk)
+                except Exception as e:
+                    notify_exception(None, 'batch processor error in pillow {} {}'.format(
+                        self.get_name(), e,
+                    ))
+                    retry_changes = changes_chunk
+                for change in retry_changes:
+                    failed_processors.setdefault(change, []).append(processor)
+
+        datadog_histogram('commcare.change_feed.chunk_processing_time', timer.duration, tags=[
+            'pillow_name:{}'.format(self.get_name()),
+        ])
+        datadog_counter('commcare.change_feed.chunk_retries', len(failed_processors), tags=[
+            'pillow_name:{}'.format(self.get_name()),
+        ])
+
+        for change in changes_chunk:
+            processors = self.serial_processors + failed_processors.get(change, [])
+            if processors:
+                self._process_with_error_handling(
+                    change, lambda change: self._process_change_with(processors, change)
+                )
+            else:
+                self._record_change_success_in_datadog(change)
+                self._record_change_in_datadog(change, None)
+
+        context.changes_processed = len(changes_chunk)
+        try:
+            self._update_checkpoint(changes_chunk[-1], context)
+        finally:
+            context.changes_processed = 1
+
+    def _process_change_with(self, processors, change):
+        for processor in processors:
+            processor.process_change(self, change)
+
+    def _process_with_error_handling(self, change, process_fn):
+        """
+        :return: True if the change was processed successfully otherwise False
+        """
         timer = TimingContext()
         try:
             with timer:
-                self.process_change(change)
+                process_fn(change)
         except Exception as ex:
             try:
                 handle_pillow_error(self, change, ex)
@@ -136,10 +227,28 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
                 ))
                 self._record_change_exception_in_datadog(change)
                 raise
+            success = False
         else:
-            self._update_checkpoint(change, context)
             self._record_change_success_in_datadog(change)
+            success = True
         self._record_change_in_datadog(change, timer)
+        return success
+
+    @property
+    def batch_processors(self):
+        """
+        Processors that are able to process changes in chunks.
+        Only used when ``processor_chunk_size`` is set.
+        """
+        return []
+
+    @property
+    def serial_processors(self):
+        """
+        Processors that must still see each change individually when
+        processing in chunks.
+        """
+        return []
 
     @abstractmethod
     def process_change(self, change):
@@ -231,7 +340,7 @@ class ConstructedPillow(PillowBase):
     """
 
     def __init__(self, name, checkpoint, change_feed, processor,
-                 change_processed_event_handler=None):
+                 change_processed_event_handler=None, processor_chunk_size=0):
         self._name = name
         self._checkpoint = checkpoint
         self._change_feed = change_feed
@@ -241,6 +350,7 @@ class ConstructedPillow(PillowBase):
             self.processors = [processor]
 
         self._change_processed_event_handler = change_processed_event_handler
+        self.processor_chunk_size = processor_chunk_size
 
     @property
     def pillow_id(self):
@@ -263,6 +373,14 @@ class ConstructedPillow(PillowBase):
         for processor in self.processors:
             processor.process_change(self, change)
 
+    @property
+    def batch_processors(self):
+        return [processor for processor in self.processors if processor.supports_batch_processing]
+
+    @property
+    def serial_processors(self):
+        return [processor for processor in self.processors if not processor.supports_batch_processing]
+
     def fire_change_processed_event(self, change, context):
         if self._change_processed_event_handler is not None:
             return self._change_processed_event_handler.fire_change_processed(change, context)
@@ -9,7 +9,7 @@ from pillowtop.dao.exceptions import DocumentNotFoundError
 from pillowtop.utils import ensure_matched_revisions, ensure_document_exists
 from pillowtop.exceptions import PillowtopIndexingError
 from pillowtop.logger import pillow_logging
-from .interface import PillowProcessor
+from .interface import BulkPillowProcessor
 
 
 def identity(x):
@@ -19,7 +19,7 @@ RETRY_INTERVAL = 2  # seconds, exponentially increasing
 MAX_RETRIES = 4  # exponential factor threshold for alerts
 
 
-class ElasticProcessor(PillowProcessor):
+class ElasticProcessor(BulkPillowProcessor):
 
     def __init__(self, elasticsearch, index_info, doc_prep_fn=None, doc_filter_fn=None):
         self.doc_filter_fn = doc_filter_fn
@@ -56,6 +56,56 @@ class ElasticProcessor(PillowProcessor):
             update=self._doc_exists(change.id),
         )
 
+    def process_changes_chunk(self, pillow_instance, changes_chunk):
+        """
+        Send the whole chunk to ES in a single ``_bulk`` request. Documents are
+        indexed with index-or-replace semantics so no existence check is needed
+        and deletions go into the same request.
+
+        :return: list of changes that failed and should be retried individually
+        """
+        retry_changes = []
+        actions = []
+        action_changes = []
+        for change in changes_chunk:
+            try:
+                action = self._get_bulk_action(change)
+            except Exception:
+                retry_changes.append(change)
+                continue
+            if action:
+                actions.extend(action)
+                action_changes.append(change)
+
+        if not actions:
+            return retry_changes
+
+        result = self.elasticsearch.bulk(actions)
+        if result.get('errors'):
+            for change, item in zip(action_changes, result['items']):
+                if _is_bulk_item_error(item):
+                    retry_changes.append(change)
+        return retry_changes
+
+    def _get_bulk_action(self, change):
+        meta = {
+            '_index': self.index_info.index,
+            '_type': self.index_info.type,
+            '_id': change.id,
+        }
+        if change.deleted and change.id:
+            return [{'delete': meta}]
+
+        doc = change.get_document()
+
+        ensure_document_exists(change)
+        ensure_matched_revisions(change)
+
+        if doc is None or (self.doc_filter_fn and self.doc_filter_fn(doc)):
+            return None
+
+        return [{'index': meta}, self.doc_transform_fn(doc)]
+
     def _doc_exists(self, doc_id):
         return self.elasticsearch.exists(self.index_info.index, self.index_info.type, doc_id)
 
@@ -64,6 +114,14 @@ class ElasticProcessor(PillowProcessor):
             self.elasticsearch.delete(self.index_info.index, self.index_info.type, doc_id)
 
 
+def _is_bulk_item_error(item):
+    (action, result), = item.items()
+    if action == 'delete' and result.get('status') == 404:
+        # deleting a doc that isn't in the index is not an error
+        return False
+    return 'error' in result
+
+
 def send_to_elasticsearch(index, doc_type, doc_id, es_getter, name, data=None, retries=MAX_RETRIES,
                           except_on_failure=False, update=False, delete=False, es_merge_update=False):
     """
@@ -10,6 +10,7 @@ from dimagi.utils.parsing import string_to_utc_datetime
 
 from corehq.apps.app_manager.dbaccessors import get_app
 from corehq.apps.users.models import CouchUser, LastSubmission, DeviceAppMeta
+from corehq.apps.users.reporting_metadata import buffer_submission_metadata
 from corehq.pillows.utils import format_form_meta_for_es
 from corehq.util.quickcache import quickcache
 from corehq.apps.receiverwrapper.util import get_app_version_info
@@ -90,15 +91,29 @@ def _last_submission_needs_update(last_submission, received_on_datetime, build_v
 
 
 def mark_latest_submission(domain, user_id, app_id, build_id, version, metadata, received_on):
+    if settings.USER_REPORTING_METADATA_BATCH_ENABLED:
+        buffer_submission_metadata(domain, user_id, app_id, build_id, version, metadata, received_on)
+        return
+
     user = CouchUser.get_by_user_id(user_id, domain)
 
     if not user or user.is_deleted():
         return
 
+    if update_latest_submission(user, domain, app_id, build_id, version, metadata, received_on):
+        user.save()
+
+
+def update_latest_submission(user, domain, app_id, build_id, version, metadata, received_on):
+    """
+    Update a user's reporting metadata from a form submission.
+    This function does not save the user.
+    :return: True if user updated
+    """
     try:
         received_on_datetime = string_to_utc_datetime(received_on)
     except ValueError:
-        return
+        return False
 
     last_submission = filter_by_app(user.reporting_metadata.last_submissions, app_id)
 
@@ -146,5 +161,5 @@ def mark_latest_submission(domain, user_id, app_id, build_id, version, metadata,
             last_submission=received_on_datetime,
         )
         update_device_meta(user, device_id, app_version_info.commcare_version, app_meta, save=False)
-
-        user.save()
+        return True
+    return False
@@ -4,9 +4,35 @@ import six
 
 
 class PillowProcessor(six.with_metaclass(ABCMeta, object)):
+    # set to True on processors that implement ``process_changes_chunk``
+    supports_batch_processing = False
+
     @abstractmethod
     def process_change(self, pillow_instance, change):
         pass
 
+    def process_changes_chunk(self, pillow_instance, changes_chunk):
+        """
+        Process a list of changes in one go. Only called on processors that
+        set ``supports_batch_processing`` and only when the pillow is
+        configured with a ``processor_chunk_size``.
+
+        :return: A list of changes from the chunk that could not be processed
+                 in bulk. These are retried one at a time through
+                 ``process_change`` using the regular pillow error handling.
+        """
+        raise NotImplementedError
+
     def checkpoint_updated(self):
         pass
+
+
+class BulkPillowProcessor(PillowProcessor):
+    """
+    A processor that can handle a whole chunk of changes at once.
+    """
+    supports_batch_processing = True
+
+    @abstractmethod
+    def process_changes_chunk(self, pillow_instance, changes_chunk):
+        pass
@@ -0,0 +1,108 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from django.test import SimpleTestCase
+from mock import MagicMock, patch
+
+from pillowtop.checkpoints.manager import PillowCheckpointEventHandler
+from pillowtop.feed.interface import Change
+from pillowtop.feed.mock import MockChangeFeed
+from pillowtop.pillow.interface import ConstructedPillow
+from pillowtop.processors.interface import BulkPillowProcessor
+from pillowtop.processors.sample import TestProcessor
+from six.moves import range
+
+
+class TestBulkProcessor(BulkPillowProcessor):
+
+    def __init__(self, fail_ids=None, raise_on_chunk=False):
+        self.fail_ids = fail_ids or set()
+        self.raise_on_chunk = raise_on_chunk
+        self.chunks = []
+        self.changes_seen = []
+
+    def process_changes_chunk(self, pillow_instance, changes_chunk):
+        if self.raise_on_chunk:
+            raise Exception('chunk failed')
+        self.chunks.append([change.id for change in changes_chunk])
+        return [change for change in changes_chunk if change.id in self.fail_ids]
+
+    def process_change(self, pillow_instance, change):
+        self.changes_seen.append(change.id)
+
+
+@patch('pillowtop.pillow.interface.notify_exception')
+class ChunkedPillowProcessingTest(SimpleTestCase):
+
+    def _get_pillow(self, processors, chunk_size, num_changes=5, changes=None, checkpoint=None,
+                    change_processed_event_handler=None):
+        if changes is None:
+            changes = [Change(id='doc{}'.format(i), sequence_id=i) for i in range(num_changes)]
+        pillow = ConstructedPillow(
+            name='test-chunked-pillow',
+            checkpoint=checkpoint,
+            change_feed=MockChangeFeed(changes),
+            processor=processors,
+            change_processed_event_handler=change_processed_event_handler,
+            processor_chunk_size=chunk_size,
+        )
+        pillow.retry_errors = False
+        return pillow
+
+    def test_changes_are_chunked(self, _):
+        processor = TestBulkProcessor()
+        pillow = self._get_pillow([processor], chunk_size=2)
+        pillow.process_changes(since=0, forever=False)
+        self.assertEqual([['doc0', 'doc1'], ['doc2', 'doc3'], ['doc4']], processor.chunks)
+        self.assertEqual([], processor.changes_seen)
+
+    def test_no_chunk_size_processes_serially(self, _):
+        processor = TestBulkProcessor()
+        pillow = self._get_pillow([processor], chunk_size=0, num_changes=2)
+        pillow.process_changes(since=0, forever=False)
+        self.assertEqual([], processor.chunks)
+        self.assertEqual(['doc0', 'doc1'], processor.changes_seen)
+
+    def test_failed_changes_retried_serially(self, _):
+        processor = TestBulkProcessor(fail_ids={'doc1', 'doc3'})
+        pillow = self._get_pillow([processor], chunk_size=5)
+        pillow.process_changes(since=0, forever=False)
+        self.assertEqual(['doc1', 'doc3'], processor.changes_seen)
+
+    def test_chunk_exception_retries_all(self, notify_exception):
+        processor = TestBulkProcessor(raise_on_chunk=True)
+        pillow = self._get_pillow([processor], chunk_size=5, num_changes=3)
+        pillow.process_changes(since=0, forever=False)
+        self.assertEqual(['doc0', 'doc1', 'doc2'], processor.changes_seen)
+        self.assertTrue(notify_exception.called)
+
+    def test_partial_chunk_processed_when_feed_idle(self, _):
+        processor = TestBulkProcessor()
+        # the feed yields None when no change arrived in time
+        changes = [Change(id='doc0', sequence_id=0), None, Change(id='doc1', sequence_id=1)]
+        pillow = self._get_pillow([processor], chunk_size=5, changes=changes, checkpoint=MagicMock())
+        pillow.process_changes(since=0, forever=False)
+        self.assertEqual([['doc0'], ['doc1']], processor.chunks)
+
+    @patch('pillowtop.checkpoints.manager.MAX_CHECKPOINT_DELAY', 0)
+    def test_checkpoint_frequency_hit_within_chunk(self, _):
+        checkpoint = MagicMock()
+        event_handler = PillowCheckpointEventHandler(checkpoint, checkpoint_frequency=3)
+        pillow = self._get_pillow(
+            [TestBulkProcessor()], chunk_size=2, checkpoint=checkpoint,
+            change_processed_event_handler=event_handler,
+        )
+        pillow.process_changes(since=0, forever=False)
+        # the second chunk (changes 3 and 4) contains the third change
+        checkpoint.update_to.assert_called_once_with(3)
+
+    def test_serial_processors_see_every_change(self, _):
+        bulk_processor = TestBulkProcessor(fail_ids={'doc2'})
+        serial_processor = TestProcessor()
+        pillow = self._get_pillow([bulk_processor, serial_processor], chunk_size=2)
+        pillow.process_changes(since=0, forever=False)
+        self.assertEqual(['doc2'], bulk_processor.changes_seen)
+        self.assertEqual(
+            ['doc0', 'doc1', 'doc2', 'doc3', 'doc4'],
+            [change.id for change in serial_processor.changes_seen]
+        )
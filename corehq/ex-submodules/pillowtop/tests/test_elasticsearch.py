@@ -14,7 +14,8 @@ from pillowtop.es_utils import INDEX_REINDEX_SETTINGS, INDEX_STANDARD_SETTINGS,
     set_index_reindex_settings, set_index_normal_settings, mapping_exists, initialize_index, \
     initialize_index_and_mapping, assume_alias
 from pillowtop.exceptions import PillowtopIndexingError
-from pillowtop.processors.elastic import send_to_elasticsearch
+from pillowtop.feed.interface import Change
+from pillowtop.processors.elastic import send_to_elasticsearch, ElasticProcessor
 from .utils import get_doc_count, get_index_mapping, TEST_INDEX_INFO
 
 
@@ -250,3 +251,62 @@ class TestSendToElasticsearch(SimpleTestCase):
 
         # attempt to create the same doc twice shouldn't fail
         self._send_to_es_and_check(doc)
+
+
+class TestElasticProcessorBulk(SimpleTestCase):
+
+    def setUp(self):
+        self.es = get_es_new()
+        self.index = TEST_INDEX_INFO.index
+        self.processor = ElasticProcessor(self.es, TEST_INDEX_INFO)
+
+        with trap_extra_setup(ConnectionError):
+            ensure_index_deleted(self.index)
+            initialize_index_and_mapping(self.es, TEST_INDEX_INFO)
+
+    def tearDown(self):
+        ensure_index_deleted(self.index)
+
+    def _change(self, doc, deleted=False):
+        return Change(id=doc['_id'], sequence_id=None, document=doc, deleted=deleted)
+
+    def test_index_and_replace(self):
+        doc1 = {'_id': uuid.uuid4().hex, 'doc_type': 'MyCoolDoc', 'property': 'foo'}
+        doc2 = {'_id': uuid.uuid4().hex, 'doc_type': 'MyCoolDoc', 'property': 'bar'}
+        retry = self.processor.process_changes_chunk(None, [self._change(doc1), self._change(doc2)])
+        self.assertEqual([], retry)
+        self.assertEqual(2, get_doc_count(self.es, self.index))
+
+        doc1 = {'_id': doc1['_id'], 'doc_type': 'MyCoolDoc', 'new_prop': 'baz'}
+        retry = self.processor.process_changes_chunk(None, [self._change(doc1)])
+        self.assertEqual([], retry)
+        es_doc = self.es.get_source(self.index, TEST_INDEX_INFO.type, doc1['_id'])
+        self.assertEqual('baz', es_doc['new_prop'])
+        self.assertNotIn('property', es_doc)
+
+    def test_delete_in_same_request(self):
+        doc1 = {'_id': uuid.uuid4().hex, 'doc_type': 'MyCoolDoc', 'property': 'foo'}
+        doc2 = {'_id': uuid.uuid4().hex, 'doc_type': 'MyCoolDoc', 'property': 'bar'}
+        self.processor.process_changes_chunk(None, [self._change(doc1)])
+
+        missing = {'_id': uuid.uuid4().hex}
+        retry = self.processor.process_changes_chunk(None, [
+            self._change(doc1, deleted=True),
+            self._change(missing, deleted=True),
+            self._change(doc2),
+        ])
+        self.assertEqual([], retry)
+        self.assertEqual(1, get_doc_count(self.es, self.index))
+
+    def test_failed_doc_returned_for_retry(self):
+        def _transform(doc):
+            if doc['property'] == 'bad':
+                raise Exception('bad doc')
+            return doc
+
+        processor = ElasticProcessor(self.es, TEST_INDEX_INFO, doc_prep_fn=_transform)
+        good = self._change({'_id': uuid.uuid4().hex, 'doc_type': 'MyCoolDoc', 'property': 'foo'})
+        bad = self._change({'_id': uuid.uuid4().hex, 'doc_type': 'MyCoolDoc', 'property': 'bad'})
+        retry = processor.process_changes_chunk(None, [good, bad])
+        self.assertEqual([bad], retry)
+        self.assertEqual(1, get_doc_count(self.es, self.index))
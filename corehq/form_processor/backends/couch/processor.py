@@ -103,7 +103,7 @@ class FormProcessorCouch(object):
         return (existing_form, new_form)
 
     @classmethod
-    def save_processed_models(cls, processed_forms, cases=None, stock_result=None):
+    def save_processed_models(cls, processed_forms, cases=None, stock_result=None, timing_context=None):
         docs = list(processed_forms)
         for form in docs:
             if form:
@@ -7,7 +7,7 @@ import logging
 import struct
 from abc import ABCMeta, abstractproperty
 from abc import abstractmethod
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from datetime import datetime
 from itertools import groupby
 from uuid import UUID
@@ -56,6 +56,7 @@ from corehq.form_processor.utils.sql import (
     fetchall_as_namedtuple
 )
 from corehq.sql_db.config import get_sql_db_aliases_in_use, partition_config
+from corehq.sql_db.parallel import run_on_databases
 from corehq.sql_db.routers import db_for_read_write
 from corehq.sql_db.util import split_list_by_db_partition
 from corehq.util.queries import fast_distinct_in_domain
@@ -990,49 +991,94 @@ class CaseAccessorSQL(AbstractCaseAccessor):
 
     @staticmethod
     def save_case(case):
-        transactions_to_save = case.get_live_tracked_models(CaseTransaction)
-
-        indices_to_save_or_update = case.get_live_tracked_models(CommCareCaseIndexSQL)
-        index_ids_to_delete = [index.id for index in case.get_tracked_models_to_delete(CommCareCaseIndexSQL)]
-
-        attachments_to_save = case.get_tracked_models_to_create(CaseAttachmentSQL)
-        attachment_ids_to_delete = [att.id for att in case.get_tracked_models_to_delete(CaseAttachmentSQL)]
-        for attachment in attachments_to_save:
-            if attachment.is_saved():
-                raise CaseSaveError(
-                    """Updating attachments is not supported.
-                    case id={}, attachment id={}""".format(
-                        case.case_id, attachment.attachment_id
-                    )
-                )
+        CaseAccessorSQL.save_cases([case])
 
-        try:
-            with transaction.atomic(using=case.db, savepoint=False):
-                case.save()
-                for case_transaction in transactions_to_save:
-                    case_transaction.save()
-
-                for index in indices_to_save_or_update:
-                    index.domain = case.domain  # ensure domain is set on indices
-                    update_fields = None
-                    if index.is_saved():
-                        # prevent changing identifier
-                        update_fields = ['referenced_id', 'referenced_type', 'relationship_id']
-                    index.save(update_fields=update_fields)
-
-                CommCareCaseIndexSQL.objects.using(case.db).filter(id__in=index_ids_to_delete).delete()
-
-                for attachment in attachments_to_save:
-                    attachment.save()
+    @staticmethod
+    def save_cases(cases):
+        """
+        Save cases along with their tracked transactions, indices and attachments
+
+        Cases are grouped by database and saved in one transaction per database.
+        New cases, transactions, indices and attachments are written with one
+        multi-row insert per table.
+        """
+        for case in cases:
+            for attachment in case.get_tracked_models_to_create(CaseAttachmentSQL):
+                if attachment.is_saved():
+                    raise CaseSaveError(
+                        """Updating attachments is not supported.
+                        case id={}, attachment id={}""".format(
+                            case.case_id, attachment.attachment_id
+                        )
+                    )
 
-                CaseAttachmentSQL.objects.using(case.db).filter(id__in=attachment_ids_to_delete).delete()
-                for attachment in case.get_tracked_models_to_delete(CaseAttachmentSQL):
-                    attachment.delete_content()
+        cases_by_db = defaultdict(list)
+        for case in cases:
+            cases_by_db[case.db].append(case)
 
-                case.clear_tracked_models()
+        try:
+            for db_name, db_cases in cases_by_db.items():
+                with transaction.atomic(using=db_name, savepoint=False):
+                    CaseAccessorSQL._save_cases_in_db(db_name, db_cases)
         except InternalError as e:
             raise CaseSaveError(e)
 
+    @staticmethod
+    def _save_cases_in_db(db_name, cases):
+        def _save(model_class, models, update_fields=None):
+            new_models = []
+            for model in models:
+                if model.is_saved():
+                    model.save(update_fields=update_fields)
+                else:
+                    new_models.append(model)
+            if new_models:
+                model_class.objects.using(db_name).bulk_create(new_models)
+
+        _save(CommCareCaseSQL, cases)
+        _save(CaseTransaction, [
+            case_transaction
+            for case in cases
+            for case_transaction in case.get_live_tracked_models(CaseTransaction)
+        ])
+
+        indices = []
+        for case in cases:
+            for index in case.get_live_tracked_models(CommCareCaseIndexSQL):
+                index.domain = case.domain  # ensure domain is set on indices
+                indices.append(index)
+        # prevent changing identifier
+        _save(CommCareCaseIndexSQL, indices, update_fields=['referenced_id', 'referenced_type', 'relationship_id'])
+
+        index_ids_to_delete = [
+            index.id
+            for case in cases
+            for index in case.get_tracked_models_to_delete(CommCareCaseIndexSQL)
+        ]
+        if index_ids_to_delete:
+            CommCareCaseIndexSQL.objects.using(db_name).filter(id__in=index_ids_to_delete).delete()
+
+        _save(CaseAttachmentSQL, [
+            attachment
+            for case in cases
+            for attachment in case.get_tracked_models_to_create(CaseAttachmentSQL)
+        ])
+
+        attachments_to_delete = [
+            attachment
+            for case in cases
+            for attachment in case.get_tracked_models_to_delete(CaseAttachmentSQL)
+        ]
+        if attachments_to_delete:
+            CaseAttachmentSQL.objects.using(db_name).filter(
+                id__in=[attachment.id for attachment in attachments_to_delete]
+            ).delete()
+            for attachment in attachments_to_delete:
+                attachment.delete_content()
+
+        for case in cases:
+            case.clear_tracked_models()
+
     @staticmethod
     def get_open_case_ids_for_owner(domain, owner_id):
         return CaseAccessorSQL._get_case_ids_in_domain(domain, owner_ids=[owner_id], is_closed=False)
@@ -1145,6 +1191,22 @@ class CaseAccessorSQL(AbstractCaseAccessor):
             [domain, external_id, case_type]
         ))
 
+    @staticmethod
+    def get_cases_by_external_ids(domain, external_ids, case_type=None):
+        from corehq.sql_db.util import get_db_aliases_for_partitioned_query
+
+        cases = []
+        for db_name in get_db_aliases_for_partitioned_query():
+            query = CommCareCaseSQL.objects.using(db_name).filter(
+                domain=domain,
+                external_id__in=external_ids,
+                deleted=False,
+            )
+            if case_type:
+                query = query.filter(type=case_type)
+            cases.extend(query)
+        return cases
+
     @staticmethod
     def get_case_by_domain_hq_user_id(domain, user_id, case_type):
         try:
@@ -1202,8 +1264,10 @@ class CaseAccessorSQL(AbstractCaseAccessor):
         from corehq.sql_db.util import get_db_aliases_for_partitioned_query
         db_aliases = get_db_aliases_for_partitioned_query()
         owner_ids = set()
-        for db_alias in db_aliases:
-            owner_ids.update(fast_distinct_in_domain(CommCareCaseSQL, 'owner_id', domain, using=db_alias))
+        for db_owner_ids in run_on_databases(
+                lambda db_alias: fast_distinct_in_domain(CommCareCaseSQL, 'owner_id', domain, using=db_alias),
+                db_aliases).values():
+            owner_ids.update(db_owner_ids)
 
         return owner_ids
 
@@ -11,6 +11,7 @@ from django.db import transaction
 from lxml import etree
 
 from casexml.apps.case.xform import get_case_updates
+from casexml.apps.phone.restore_caching import CaseXMLFragmentCache
 from corehq.form_processor.backends.sql.dbaccessors import (
     FormAccessorSQL, CaseAccessorSQL, LedgerAccessorSQL
 )
@@ -24,6 +25,8 @@ from corehq.form_processor.models import (
     XFormInstanceSQL, XFormAttachmentSQL, CaseTransaction,
     CommCareCaseSQL, FormEditRebuild, Attachment, XFormOperationSQL)
 from corehq.form_processor.utils import convert_xform_to_json, extract_meta_instance_id, extract_meta_user_id
+from corehq.toggles import RESTORE_CASE_XML_CACHE
+from corehq.util.timer import TimingContext
 from couchforms.const import ATTACHMENT_NAME
 from dimagi.utils.couch import acquire_lock, release_lock
 import six
@@ -115,7 +118,8 @@ class FormProcessorSQL(object):
         return (existing_form, new_form)
 
     @classmethod
-    def save_processed_models(cls, processed_forms, cases=None, stock_result=None, publish_to_kafka=True):
+    def save_processed_models(cls, processed_forms, cases=None, stock_result=None, publish_to_kafka=True,
+                              timing_context=None):
         db_names = {processed_forms.submitted.db}
         if processed_forms.deprecated:
             db_names |= {processed_forms.deprecated.db}
@@ -138,15 +142,19 @@ class FormProcessorSQL(object):
 
             FormAccessorSQL.save_new_form(processed_forms.submitted)
             if cases:
-                for case in cases:
-                    CaseAccessorSQL.save_case(case)
+                CaseAccessorSQL.save_cases(cases)
 
             if stock_result:
                 ledgers_to_save = stock_result.models_to_save
                 LedgerAccessorSQL.save_ledger_values(ledgers_to_save, stock_result)
 
+        if cases and RESTORE_CASE_XML_CACHE.enabled(processed_forms.submitted.domain):
+            CaseXMLFragmentCache.invalidate([case.case_id for case in cases])
+
         if publish_to_kafka:
-            cls._publish_changes(processed_forms, cases, stock_result)
+            timing_context = timing_context or TimingContext()
+            with timing_context('publish_changes'):
+                cls._publish_changes(processed_forms, cases, stock_result)
 
     @staticmethod
     def _publish_changes(processed_forms, cases, stock_result):
@@ -168,7 +168,7 @@ class FormProcessorInterface(object):
 
         return False
 
-    def save_processed_models(self, forms, cases=None, stock_result=None):
+    def save_processed_models(self, forms, cases=None, stock_result=None, timing_context=None):
         forms = _list_to_processed_forms_tuple(forms)
         if stock_result:
             assert stock_result.populated
@@ -177,6 +177,7 @@ class FormProcessorInterface(object):
                 forms,
                 cases=cases,
                 stock_result=stock_result,
+                timing_context=timing_context,
             )
         except BulkSaveError as e:
             logging.exception('BulkSaveError saving forms', extra={'details': {'errors': e.errors}})
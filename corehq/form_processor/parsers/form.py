@@ -12,8 +12,13 @@ from corehq.util.soft_assert.api import soft_assert
 from couchforms import XMLSyntaxError
 from couchforms.exceptions import DuplicateError, MissingXMLNSError
 from dimagi.utils.couch import LockManager, ReleaseOnError
+from dimagi.utils.couch.cache.cache_core import get_redis_default_cache
+from django.conf import settings
+from django_redis.exceptions import ConnectionInterrupted
 import six
 
+DUPLICATE_FORM_TIMEOUT = 60 * 60
+
 
 class MultiLockManager(list):
 
@@ -114,6 +119,14 @@ def _create_new_xform(domain, instance_xml, attachments=None, auth_context=None)
     attachments.append(Attachment(name='form.xml', raw_content=instance_xml, content_type='text/xml'))
     interface.store_attachments(xform, attachments)
 
+    if (settings.SKIP_FORM_LOCK_FOR_RECENT_DUPLICATES
+            and _is_recent_duplicate(domain, xform.form_id)
+            and interface.is_duplicate(xform.form_id, domain)):
+        # Another resubmission of a form this domain recently got a duplicate of,
+        # e.g. a phone retrying after timeouts. Skip the lock and the global
+        # duplicate check that _handle_id_conflict would be reached through.
+        return _handle_duplicate(xform)
+
     result = LockedFormProcessingResult(xform)
     with ReleaseOnError(result.lock):
         if interface.is_duplicate(xform.form_id):
@@ -122,6 +135,31 @@ def _create_new_xform(domain, instance_xml, attachments=None, auth_context=None)
     return result
 
 
+def _get_duplicate_form_key(domain, form_id):
+    return 'duplicate-form-{}-{}'.format(domain, form_id)
+
+
+def _is_recent_duplicate(domain, form_id):
+    """
+    :returns: True if a duplicate of this form was submitted to this domain in the
+    last ``DUPLICATE_FORM_TIMEOUT`` seconds. Only a hint, the form may have been
+    deleted since.
+    """
+    try:
+        return bool(get_redis_default_cache().get(_get_duplicate_form_key(domain, form_id)))
+    except ConnectionInterrupted:
+        return False
+
+
+def _mark_recent_duplicate(domain, form_id):
+    if not settings.SKIP_FORM_LOCK_FOR_RECENT_DUPLICATES:
+        return
+    try:
+        get_redis_default_cache().set(_get_duplicate_form_key(domain, form_id), True, DUPLICATE_FORM_TIMEOUT)
+    except ConnectionInterrupted:
+        pass
+
+
 def _get_submission_error(domain, instance, error):
     """
     Handle's a hard failure from posting a form to couch.
@@ -149,6 +187,8 @@ def _handle_id_conflict(xform, domain):
     interface = FormProcessorInterface(domain)
     if interface.is_duplicate(conflict_id, domain):
         # It looks like a duplicate/edit in the same domain so pursue that workflow.
+        # Only duplicates are recorded, so new forms cost no extra redis write.
+        _mark_recent_duplicate(domain, conflict_id)
         return _handle_duplicate(xform)
     else:
         # the same form was submitted to two domains, or a form was submitted with
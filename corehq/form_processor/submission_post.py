@@ -36,6 +36,7 @@ from corehq.form_processor.interfaces.processor import FormProcessorInterface
 from corehq.form_processor.parsers.form import process_xform_xml
 from corehq.form_processor.utils.metadata import scrub_meta
 from corehq.util.global_request import get_request
+from corehq.util.timer import TimingContext
 from couchforms import openrosa_response
 from couchforms.const import BadRequest, DEVICE_LOG_XMLNS
 from couchforms.models import DefaultAuthContext, UnfinishedSubmissionStub
@@ -68,7 +69,7 @@ class SubmissionPost(object):
                  domain=None, app_id=None, build_id=None, path=None,
                  location=None, submit_ip=None, openrosa_headers=None,
                  last_sync_token=None, received_on=None, date_header=None,
-                 partial_submission=False, case_db=None):
+                 partial_submission=False, case_db=None, timing_context=None):
         assert domain, domain
         assert instance, instance
         assert not isinstance(instance, HttpRequest), instance
@@ -92,6 +93,8 @@ class SubmissionPost(object):
         # always None except in the case where a system form is being processed as part of another submission
         # e.g. for closing extension cases
         self.case_db = case_db
+        # collects the time taken by each stage of processing the submission
+        self.timing_context = timing_context or TimingContext()
 
         self.is_openrosa_version3 = self.openrosa_headers.get(OPENROSA_VERSION_HEADER, '') == OPENROSA_VERSION_3
 
@@ -215,7 +218,8 @@ class SubmissionPost(object):
         if failure_response:
             return FormProcessingResult(failure_response, None, [], [], 'known_failures')
 
-        result = process_xform_xml(self.domain, self.instance, self.attachments, self.auth_context.to_json())
+        with self.timing_context('process_xml'):
+            result = process_xform_xml(self.domain, self.instance, self.attachments, self.auth_context.to_json())
         submitted_form = result.submitted_form
 
         self._post_process_form(submitted_form)
@@ -285,11 +289,12 @@ class SubmissionPost(object):
                         else:
                             openrosa_kwargs['error_nature'] = ResponseNature.POST_PROCESSING_FAILURE
                     else:
-                        self.interface.save_processed_models([instance])
+                        with self.timing_context('save_models'):
+                            self.interface.save_processed_models([instance], timing_context=self.timing_context)
                 elif not instance.is_error:
                     submission_type = 'normal'
                     try:
-                        case_stock_result = self.process_xforms_for_cases(xforms, case_db)
+                        case_stock_result = self.process_xforms_for_cases(xforms, case_db, self.timing_context)
                     except (IllegalCaseId, UsesReferrals, MissingProductId,
                             PhoneDateValueError, InvalidCaseIndex, CaseValueError) as e:
                         self._handle_known_error(e, instance, xforms)
@@ -357,33 +362,38 @@ class SubmissionPost(object):
         instance = xforms[0]
         try:
             with unfinished_submission(instance) as unfinished_submission_stub:
-                self.interface.save_processed_models(
-                    xforms,
-                    case_stock_result.case_models,
-                    case_stock_result.stock_result
-                )
+                with self.timing_context('save_models'):
+                    self.interface.save_processed_models(
+                        xforms,
+                        case_stock_result.case_models,
+                        case_stock_result.stock_result,
+                        timing_context=self.timing_context,
+                    )
 
                 if unfinished_submission_stub:
                     unfinished_submission_stub.saved = True
                     unfinished_submission_stub.save()
 
-                self.do_post_save_actions(case_db, xforms, case_stock_result)
+                self.do_post_save_actions(case_db, xforms, case_stock_result, self.timing_context)
         except PostSaveError:
             return "Error performing post save operations"
 
     @staticmethod
-    def do_post_save_actions(case_db, xforms, case_stock_result):
+    def do_post_save_actions(case_db, xforms, case_stock_result, timing_context=None):
+        timing_context = timing_context or TimingContext()
         instance = xforms[0]
         try:
             case_stock_result.case_result.commit_dirtiness_flags()
             case_stock_result.stock_result.finalize()
 
-            SubmissionPost._fire_post_save_signals(instance, case_stock_result.case_models)
+            with timing_context('post_save_signals'):
+                SubmissionPost._fire_post_save_signals(instance, case_stock_result.case_models)
 
-            case_stock_result.case_result.close_extensions(
-                case_db,
-                "SubmissionPost-%s-close_extensions" % instance.form_id
-            )
+            with timing_context('close_extensions'):
+                case_stock_result.case_result.close_extensions(
+                    case_db,
+                    "SubmissionPost-%s-close_extensions" % instance.form_id
+                )
         except PostSaveError:
             raise
         except Exception:
@@ -394,14 +404,17 @@ class SubmissionPost(object):
             raise PostSaveError
 
     @staticmethod
-    def process_xforms_for_cases(xforms, case_db):
+    def process_xforms_for_cases(xforms, case_db, timing_context=None):
         from casexml.apps.case.xform import process_cases_with_casedb
         from corehq.apps.commtrack.processing import process_stock
 
+        timing_context = timing_context or TimingContext()
         instance = xforms[0]
 
-        case_result = process_cases_with_casedb(xforms, case_db)
-        stock_result = process_stock(xforms, case_db)
+        with timing_context('process_cases'):
+            case_result = process_cases_with_casedb(xforms, case_db)
+        with timing_context('process_ledgers'):
+            stock_result = process_stock(xforms, case_db)
 
         modified_on_date = instance.received_on
         if getattr(instance, 'edited_on', None) and instance.edited_on > instance.received_on:
@@ -4,7 +4,7 @@ import uuid
 from collections import namedtuple
 from datetime import datetime
 
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
 
 from corehq.form_processor.backends.sql.dbaccessors import CaseAccessorSQL
 from corehq.form_processor.backends.sql.processor import FormProcessorSQL
@@ -16,6 +16,7 @@ from corehq.form_processor.models import XFormInstanceSQL, CommCareCaseSQL, \
 from corehq.form_processor.tests.utils import FormProcessorTestUtils, use_sql_backend
 from corehq.form_processor.tests.test_basics import _submit_case_block
 from corehq.sql_db.routers import db_for_read_write
+from corehq.sql_db.util import new_id_in_same_dbalias
 
 DOMAIN = 'test-case-accessor'
 CaseTransactionTrace = namedtuple('CaseTransactionTrace', 'form_id include')
@@ -373,6 +374,39 @@ class CaseAccessorTestsSQL(TestCase):
         with self.assertRaises(CaseSaveError):
             CaseAccessorSQL.save_case(case)
 
+    def test_save_cases(self):
+        form = XFormInstanceSQL(form_id=uuid.uuid4().hex, domain=DOMAIN, received_on=datetime.utcnow())
+        cases = []
+        first_case_id = uuid.uuid4().hex
+        case_ids = [first_case_id, new_id_in_same_dbalias(first_case_id), new_id_in_same_dbalias(first_case_id)]
+        for case_id in case_ids:
+            case = CommCareCaseSQL(
+                case_id=case_id,
+                domain=DOMAIN,
+                owner_id='user1',
+                modified_on=datetime.utcnow(),
+                server_modified_on=datetime.utcnow(),
+            )
+            case.track_create(CaseTransaction.form_transaction(case, form))
+            case.track_create(CommCareCaseIndexSQL(
+                case=case,
+                identifier='parent',
+                referenced_type='mother',
+                referenced_id=uuid.uuid4().hex,
+                relationship_id=CommCareCaseIndexSQL.CHILD
+            ))
+            cases.append(case)
+
+        with self.assertNumQueries(3, using=cases[0].db):
+            # one insert each for cases, transactions and indices
+            CaseAccessorSQL.save_cases(cases)
+
+        for case in cases:
+            self.assertTrue(case.is_saved())
+            self.assertFalse(case.has_tracked_models())
+            self.assertEqual([form.form_id], CaseAccessorSQL.get_case_xform_ids(case.case_id))
+            self.assertEqual(1, len(CaseAccessorSQL.get_indices(DOMAIN, case.case_id)))
+
     def test_get_case_ids_by_owners(self):
         case1 = _create_case(user_id="user1")
         case2 = _create_case(user_id="user1")
@@ -661,6 +695,26 @@ class CaseAccessorTestsSQL(TestCase):
         self.assertEqual({'user1', 'user2'}, owners)
 
 
+@use_sql_backend
+class CaseAccessorParallelQueryTestsSQL(TransactionTestCase):
+    # worker threads use their own connections, which can't see data written in a test's transaction
+    multi_db = True
+
+    def tearDown(self):
+        FormProcessorTestUtils.delete_all_sql_forms()
+        FormProcessorTestUtils.delete_all_sql_cases()
+        super(CaseAccessorParallelQueryTestsSQL, self).tearDown()
+
+    @override_settings(PARTITIONED_QUERY_WORKERS=2)
+    def test_get_case_owner_ids(self):
+        _create_case(user_id='user1', case_id='123')  # get's sharded to p1
+        _create_case(user_id='user2', case_id='125')  # get's sharded to p2
+        _create_case(domain='other_domain', user_id='user3')
+
+        self.assertEqual({'user1', 'user2'}, CaseAccessorSQL.get_case_owner_ids(DOMAIN))
+        self.assertEqual({'user3'}, CaseAccessorSQL.get_case_owner_ids('other_domain'))
+
+
 class CaseAccessorsTests(TestCase):
 
     def tearDown(self):
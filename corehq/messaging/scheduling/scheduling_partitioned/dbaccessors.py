@@ -111,7 +111,8 @@ def get_active_schedule_instance_ids(cls, due_before, due_after=None):
     for domain, schedule_instance_id, next_event_due in run_query_across_partitioned_databases(
         cls,
         active_filter,
-        values=['domain', 'schedule_instance_id', 'next_event_due']
+        values=['domain', 'schedule_instance_id', 'next_event_due'],
+        concurrent=True,
     ):
         yield domain, schedule_instance_id, next_event_due
 
@@ -138,7 +139,8 @@ def get_active_case_schedule_instance_ids(cls, due_before, due_after=None):
     for domain, case_id, schedule_instance_id, next_event_due in run_query_across_partitioned_databases(
         cls,
         active_filter,
-        values=['domain', 'case_id', 'schedule_instance_id', 'next_event_due']
+        values=['domain', 'case_id', 'schedule_instance_id', 'next_event_due'],
+        concurrent=True,
     ):
         yield (domain, case_id, schedule_instance_id, next_event_due)
 
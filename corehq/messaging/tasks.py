@@ -9,13 +9,19 @@ from corehq.form_processor.models import CommCareCaseSQL
 from corehq.form_processor.utils import should_use_sql_backend
 from corehq.messaging.scheduling.util import utcnow
 from corehq.messaging.util import MessagingRuleProgressHelper, use_phone_entries
-from corehq.sql_db.util import run_query_across_partitioned_databases
+from corehq.sql_db.util import run_query_across_partitioned_databases, split_list_by_db_partition
 from corehq.toggles import REMINDERS_MIGRATION_IN_PROGRESS
 from corehq.util.celery_utils import no_result_task
+from dimagi.utils.chunked import chunked
 from dimagi.utils.couch import CriticalSection
 from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
 
+# The number of cases each task processes when running a messaging rule
+# over all cases of its case type
+MESSAGING_RULE_CASE_CHUNK_SIZE = 100
+
 
 def get_sync_key(case_id):
     return 'sync-case-for-messaging-%s' % case_id
@@ -45,6 +51,16 @@ def sync_case_for_messaging_rule(self, domain, case_id, rule_id):
         self.retry(exc=e)
 
 
+@no_result_task(queue=settings.CELERY_REMINDER_CASE_UPDATE_QUEUE, acks_late=True,
+                default_retry_delay=5 * 60, max_retries=12, bind=True)
+def sync_case_chunk_for_messaging_rule(self, domain, case_ids, rule_id):
+    try:
+        with CriticalSection([get_sync_key(case_id) for case_id in sorted(case_ids)], timeout=5 * 60):
+            _sync_case_chunk_for_messaging_rule(domain, case_ids, rule_id)
+    except Exception as e:
+        self.retry(exc=e)
+
+
 def _sync_case_for_messaging(domain, case_id):
     case = CaseAccessors(domain).get_case(case_id)
     sms_tasks.clear_case_caches(case)
@@ -86,6 +102,27 @@ def _sync_case_for_messaging_rule(domain, case_id, rule_id):
         MessagingRuleProgressHelper(rule_id).increment_current_case_count()
 
 
+def _sync_case_chunk_for_messaging_rule(domain, case_ids, rule_id):
+    rule = _get_cached_rule(domain, rule_id)
+    if not rule:
+        return
+
+    cases = {case.case_id: case for case in CaseAccessors(domain).get_cases(case_ids)}
+    now = utcnow()
+    # Schedule instances are partitioned by case id, so running the rule over
+    # all cases that share a database in one transaction saves them with a
+    # single commit per database
+    for db_alias, db_case_ids in split_list_by_db_partition(case_ids):
+        with transaction.atomic(using=db_alias):
+            for case_id in db_case_ids:
+                if case_id in cases:
+                    rule.run_rule(cases[case_id], now)
+
+    # Cases that were deleted since the case ids were looked up are counted
+    # too so that the progress still reaches 100%
+    MessagingRuleProgressHelper(rule_id).increment_current_case_count(len(case_ids))
+
+
 def initiate_messaging_rule_run(domain, rule_id):
     MessagingRuleProgressHelper(rule_id).set_initial_progress()
     AutomaticUpdateRule.objects.filter(pk=rule_id).update(locked_for_editing=True)
@@ -118,11 +155,11 @@ def run_messaging_rule(domain, rule_id):
     total_count = 0
     progress_helper = MessagingRuleProgressHelper(rule_id)
 
-    for case_id in get_case_ids_for_messaging_rule(domain, rule.case_type):
-        sync_case_for_messaging_rule.delay(domain, case_id, rule_id)
-        total_count += 1
-        if total_count % 1000 == 0:
-            progress_helper.set_total_case_count(total_count)
+    case_ids = get_case_ids_for_messaging_rule(domain, rule.case_type)
+    for case_id_chunk in chunked(case_ids, MESSAGING_RULE_CASE_CHUNK_SIZE):
+        sync_case_chunk_for_messaging_rule.delay(domain, list(case_id_chunk), rule_id)
+        total_count += len(case_id_chunk)
+        progress_helper.set_total_case_count(total_count)
 
     progress_helper.set_total_case_count(total_count)
 
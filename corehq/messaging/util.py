@@ -38,9 +38,9 @@ class MessagingRuleProgressHelper(object):
     def set_rule_complete(self):
         self.client.set(self.in_progress_key, 0)
 
-    def increment_current_case_count(self, fail_hard=False):
+    def increment_current_case_count(self, amount=1, fail_hard=False):
         try:
-            self.client.incr(self.current_key)
+            self.client.incr(self.current_key, amount)
         except:
             if fail_hard:
                 raise
@@ -1,5 +1,6 @@
 from __future__ import absolute_import, unicode_literals
 
+import time
 from collections import OrderedDict
 from datetime import datetime
 
@@ -16,6 +17,10 @@ from corehq.apps.case_search.const import (
 )
 from corehq.apps.case_search.exceptions import CaseSearchNotEnabledException
 from corehq.apps.case_search.models import case_search_enabled_domains
+from corehq.apps.case_search.utils import (
+    CASE_SEARCH_CLEAR_INTERVAL,
+    clear_case_search_results_cache,
+)
 from corehq.apps.change_feed import topics
 from corehq.apps.change_feed.consumer.feed import (
     KafkaChangeFeed,
@@ -92,6 +97,12 @@ def _get_case_properties(doc_dict):
 
 
 class CaseSearchPillowProcessor(ElasticProcessor):
+    # the domain filter and cache invalidation below are only in process_change
+    supports_batch_processing = False
+
+    def __init__(self, *args, **kwargs):
+        super(CaseSearchPillowProcessor, self).__init__(*args, **kwargs)
+        self._results_cleared_at = {}  # (domain, case type) -> time.time()
 
     def process_change(self, pillow_instance, change):
         assert isinstance(change, Change)
@@ -104,6 +115,22 @@ class CaseSearchPillowProcessor(ElasticProcessor):
 
         if domain and domain_needs_search_index(domain):
             super(CaseSearchPillowProcessor, self).process_change(pillow_instance, change)
+            # The metadata still has the type of a hard deleted case. Searches
+            # for the type a case had before it was changed are not cleared,
+            # and can show it until they expire.
+            case_types = {(change.get_document() or {}).get('type')}
+            if change.metadata is not None:
+                case_types.add(change.metadata.document_subtype)
+            for case_type in case_types:
+                if case_type:
+                    self._clear_search_results_cache(domain, case_type)
+
+    def _clear_search_results_cache(self, domain, case_type):
+        now = time.time()
+        cleared_at = self._results_cleared_at.get((domain, case_type))
+        if cleared_at is None or now - cleared_at >= CASE_SEARCH_CLEAR_INTERVAL:
+            clear_case_search_results_cache(domain, case_type)
+            self._results_cleared_at[(domain, case_type)] = now
 
 
 def get_case_search_to_elasticsearch_pillow(pillow_id='CaseSearchToElasticsearchPillow', num_processes=1,
@@ -0,0 +1,263 @@
+"""
+Run the same query against several databases at once
+
+Queries that touch every form processing database would otherwise take as
+long as all of the databases added together. These helpers run the
+per-database queries on a bounded set of threads, each with its own
+database connection, and merge the results.
+
+``run_on_databases`` runs on a pool of threads that lives as long as the
+process. The threads close their connections after each call so that idle
+threads don't hold connections to every database. ``iter_across_databases``
+streams large results and starts a thread per worker for each query.
+
+Worker threads do not share the caller's connection, so they do not see
+changes made in a transaction that the caller has not committed yet. Cheap
+queries that may run inside a transaction are better off looping over the
+databases. The number of threads is limited by
+``settings.PARTITIONED_QUERY_WORKERS``; when that is 1, or there is only one
+database, everything runs in the calling thread.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import heapq
+import os
+import sys
+import threading
+
+import six
+from django import db
+from django.conf import settings
+from six.moves import queue, range
+
+from dimagi.utils.chunked import chunked
+
+CHUNK_SIZE = 1000
+QUEUE_SIZE = 4  # chunks buffered per database before its worker waits
+PUT_TIMEOUT = 1  # seconds between checks of whether the consumer has stopped
+
+
+def run_on_databases(fn, db_aliases, max_workers=None):
+    """
+    Call ``fn(db_alias)`` for every database, with at most ``max_workers``
+    calls running at the same time.
+
+    :returns: dict of db_alias -> return value of ``fn``
+    """
+    db_aliases = list(db_aliases)
+    num_workers = _get_num_workers(max_workers, len(db_aliases))
+    if num_workers <= 1 or _pool.in_worker():
+        # a nested call waiting on busy pool threads would never finish
+        return {db_alias: fn(db_alias) for db_alias in db_aliases}
+
+    pending = _queue_of(db_aliases)
+    finished = queue.Queue()
+    results = {}
+    errors = []
+
+    def worker():
+        try:
+            while not errors:
+                try:
+                    db_alias = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    results[db_alias] = fn(db_alias)
+                except Exception:
+                    errors.append(sys.exc_info())
+        finally:
+            finished.put(None)
+
+    _pool.submit(worker, num_workers)
+    for i in range(num_workers):
+        finished.get()
+    if errors:
+        six.reraise(*errors[0])
+    return results
+
+
+def iter_across_databases(get_queryset, db_aliases, key=None, max_workers=None):
+    """
+    Iterate over the results of ``get_queryset(db_alias)`` for every database
+
+    Results are streamed from the database in chunks of ``CHUNK_SIZE``.
+
+    :param key: If given, every queryset must be sorted by it and the results
+    are merged into one sorted stream. A merge needs the next result of every
+    database, so one worker per database is used regardless of ``max_workers``.
+    Otherwise results are yielded in the order they arrive.
+    """
+    db_aliases = list(db_aliases)
+    num_workers = _get_num_workers(max_workers, len(db_aliases))
+    if num_workers <= 1:
+        results = [get_queryset(db_alias).iterator() for db_alias in db_aliases]
+        if key is not None:
+            return merge_sorted(results, key)
+        return (result for iterator in results for result in iterator)
+
+    if key is not None:
+        return _iter_merged_in_threads(get_queryset, db_aliases, key)
+    return _iter_in_threads(get_queryset, db_aliases, num_workers)
+
+
+def merge_sorted(iterables, key):
+    """
+    Merge sorted iterables into one sorted iterator
+
+    Like ``heapq.merge`` with a ``key``, which Python 2 does not support.
+    """
+    heap = []
+    for index, iterable in enumerate(iterables):
+        iterator = iter(iterable)
+        for item in iterator:
+            heap.append((key(item), index, item, iterator))
+            break
+    heapq.heapify(heap)
+    while heap:
+        __, index, item, iterator = heap[0]
+        yield item
+        for item in iterator:
+            heapq.heapreplace(heap, (key(item), index, item, iterator))
+            break
+        else:
+            heapq.heappop(heap)
+
+
+def _iter_in_threads(get_queryset, db_aliases, num_workers):
+    pending = _queue_of(db_aliases)
+    results = queue.Queue(maxsize=QUEUE_SIZE * num_workers)
+    stopped = threading.Event()
+    for i in range(num_workers):
+        _start_worker(get_queryset, pending, results, stopped)
+    try:
+        for result in _iter_results(results, num_workers):
+            yield result
+    finally:
+        stopped.set()
+
+
+def _iter_merged_in_threads(get_queryset, db_aliases, key):
+    stopped = threading.Event()
+    iterators = []
+    for db_alias in db_aliases:
+        results = queue.Queue(maxsize=QUEUE_SIZE)
+        _start_worker(get_queryset, _queue_of([db_alias]), results, stopped)
+        iterators.append(_iter_results(results, 1))
+    try:
+        for result in merge_sorted(iterators, key):
+            yield result
+    finally:
+        stopped.set()
+
+
+def _start_worker(get_queryset, pending, results, stopped):
+    thread = threading.Thread(target=_fetch, args=(get_queryset, pending, results, stopped))
+    # don't keep the process alive if the consumer goes away without stopping
+    thread.daemon = True
+    thread.start()
+
+
+def _fetch(get_queryset, pending, results, stopped):
+    try:
+        while True:
+            try:
+                db_alias = pending.get_nowait()
+            except queue.Empty:
+                break
+            for chunk in chunked(get_queryset(db_alias).iterator(), CHUNK_SIZE):
+                if not _put(results, chunk, stopped):
+                    return
+        _put(results, _DONE, stopped)
+    except Exception:
+        _put(results, _FetchError(sys.exc_info()), stopped)
+    finally:
+        db.connections.close_all()
+
+
+def _put(results, item, stopped):
+    while not stopped.is_set():
+        try:
+            results.put(item, timeout=PUT_TIMEOUT)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _iter_results(results, num_workers):
+    done = 0
+    while done < num_workers:
+        item = results.get()
+        if item is _DONE:
+            done += 1
+        elif isinstance(item, _FetchError):
+            six.reraise(*item.exc_info)
+        else:
+            for result in item:
+                yield result
+
+
+class _ThreadPool(object):
+    """Daemon threads that run tasks, closing their database connections after each one"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._reset()
+
+    def _reset(self):
+        # threads don't survive a fork, so a forked process starts a new pool
+        self._pid = os.getpid()
+        self._tasks = queue.Queue()
+        self._threads = []
+
+    def submit(self, task, times):
+        """Run ``task`` ``times`` times, on at least as many threads"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            while len(self._threads) < times:
+                thread = threading.Thread(target=self._work)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+            tasks = self._tasks
+        for i in range(times):
+            tasks.put(task)
+
+    def in_worker(self):
+        return getattr(self._local, 'in_worker', False)
+
+    def _work(self):
+        self._local.in_worker = True
+        tasks = self._tasks
+        while True:
+            task = tasks.get()
+            try:
+                task()
+            finally:
+                db.connections.close_all()
+
+
+_pool = _ThreadPool()
+
+
+def _get_num_workers(max_workers, num_dbs):
+    return min(max_workers or settings.PARTITIONED_QUERY_WORKERS, num_dbs)
+
+
+def _queue_of(items):
+    pending = queue.Queue()
+    for item in items:
+        pending.put(item)
+    return pending
+
+
+_DONE = object()
+
+
+class _FetchError(object):
+
+    def __init__(self, exc_info):
+        self.exc_info = exc_info
@@ -0,0 +1,124 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import threading
+
+from django.db.models import Q
+from django.test import SimpleTestCase, override_settings
+from mock import patch
+
+from corehq.sql_db.parallel import iter_across_databases, merge_sorted, run_on_databases
+from corehq.sql_db.util import run_query_across_partitioned_databases
+
+RESULTS = {
+    'db1': [1, 4, 7, 10],
+    'db2': [2, 5],
+    'db3': [3, 6, 8, 9, 11],
+}
+
+
+class FakeQuerySet(object):
+
+    def __init__(self, results):
+        self.results = results
+
+    def iterator(self):
+        for result in self.results:
+            if isinstance(result, Exception):
+                raise result
+            yield result
+
+
+def _get_queryset(db_alias):
+    return FakeQuerySet(RESULTS[db_alias])
+
+
+@patch('corehq.sql_db.parallel.CHUNK_SIZE', 2)
+class ParallelQueryTests(SimpleTestCase):
+
+    def test_run_on_databases(self):
+        threads = set()
+
+        def fn(db_alias):
+            threads.add(threading.current_thread())
+            return len(RESULTS[db_alias])
+
+        results = run_on_databases(fn, ['db1', 'db2', 'db3'], max_workers=2)
+        self.assertEqual(results, {'db1': 4, 'db2': 2, 'db3': 5})
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_run_on_databases_error(self):
+        def fn(db_alias):
+            if db_alias == 'db2':
+                raise ValueError(db_alias)
+            return db_alias
+
+        with self.assertRaises(ValueError):
+            run_on_databases(fn, ['db1', 'db2', 'db3'], max_workers=3)
+
+    @override_settings(PARTITIONED_QUERY_WORKERS=2)
+    def test_run_on_databases_reuses_threads(self):
+        threads = set()
+
+        def fn(db_alias):
+            threads.add(threading.current_thread())
+
+        run_on_databases(fn, ['db1', 'db2', 'db3'])
+        first_threads = set(threads)
+        threads.clear()
+        run_on_databases(fn, ['db1', 'db2', 'db3'])
+        self.assertTrue(threads)
+        self.assertLessEqual(threads, first_threads)
+
+    @override_settings(PARTITIONED_QUERY_WORKERS=2)
+    def test_run_on_databases_nested(self):
+        def fn(db_alias):
+            return run_on_databases(len, ['db1', 'db2', 'db3'])
+
+        results = run_on_databases(fn, ['db1', 'db2', 'db3'])
+        self.assertEqual(results['db2'], {'db1': 3, 'db2': 3, 'db3': 3})
+
+    @override_settings(PARTITIONED_QUERY_WORKERS=1)
+    def test_run_on_databases_serial(self):
+        threads = set()
+
+        def fn(db_alias):
+            threads.add(threading.current_thread())
+
+        run_on_databases(fn, ['db1', 'db2'])
+        self.assertEqual(threads, {threading.current_thread()})
+
+    def test_iter_unordered(self):
+        results = list(iter_across_databases(_get_queryset, ['db1', 'db2', 'db3'], max_workers=2))
+        self.assertEqual(sorted(results), list(range(1, 12)))
+
+    def test_iter_ordered(self):
+        results = iter_across_databases(_get_queryset, ['db1', 'db2', 'db3'], key=lambda x: x, max_workers=2)
+        self.assertEqual(list(results), list(range(1, 12)))
+
+    @override_settings(PARTITIONED_QUERY_WORKERS=1)
+    def test_iter_serial(self):
+        results = iter_across_databases(_get_queryset, ['db1', 'db2', 'db3'], key=lambda x: x)
+        self.assertEqual(list(results), list(range(1, 12)))
+
+    def test_iter_error(self):
+        def get_queryset(db_alias):
+            return FakeQuerySet([1, 2, 3, ValueError(db_alias)])
+
+        with self.assertRaises(ValueError):
+            list(iter_across_databases(get_queryset, ['db1', 'db2'], max_workers=2))
+
+    def test_iter_stop_early(self):
+        results = iter_across_databases(_get_queryset, ['db1', 'db2', 'db3'], key=lambda x: x, max_workers=3)
+        self.assertEqual(next(results), 1)
+        results.close()
+
+    @patch('corehq.sql_db.util.iter_across_databases', return_value=[])
+    def test_partitioned_query_serial_unless_concurrent(self, iter_across_databases):
+        list(run_query_across_partitioned_databases(None, Q()))
+        self.assertEqual(iter_across_databases.call_args[1]['max_workers'], 1)
+        list(run_query_across_partitioned_databases(None, Q(), concurrent=True))
+        self.assertIsNone(iter_across_databases.call_args[1]['max_workers'])
+
+    def test_merge_sorted(self):
+        merged = merge_sorted([[(1, 'a'), (3, 'b')], [], [(1, 'c'), (2, 'd')]], key=lambda x: x[0])
+        self.assertEqual(list(merged), [(1, 'a'), (1, 'c'), (2, 'd'), (3, 'b')])
@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 from __future__ import division
 from __future__ import unicode_literals
+import operator
 import uuid
 from collections import defaultdict
 from numpy import random
@@ -14,6 +15,7 @@ import six
 from memoized import memoized
 
 from corehq.sql_db.config import partition_config
+from corehq.sql_db.parallel import iter_across_databases
 from corehq.util.quickcache import quickcache
 
 
@@ -21,7 +23,8 @@ ACCEPTABLE_STANDBY_DELAY_SECONDS = 3
 STALE_CHECK_FREQUENCY = 30
 
 
-def run_query_across_partitioned_databases(model_class, q_expression, values=None, annotate=None):
+def run_query_across_partitioned_databases(model_class, q_expression, values=None, annotate=None,
+                                           order_by=None, concurrent=False):
     """
     Runs a query across all partitioned databases and produces a generator
     with the results.
@@ -39,6 +42,14 @@ def run_query_across_partitioned_databases(model_class, q_expression, values=Non
     :param annotate: (optional) If specified, should by a dictionary of annotated fields
     and their calculations. The dictionary will be splatted into the `.annotate` function
 
+    :param order_by: (optional) A list of field names to sort the results by, in
+    ascending order. If ``values`` is given the fields must be included in it.
+    Without it results from different databases are interleaved.
+
+    :param concurrent: (optional) Query the databases at the same time, see
+    ``corehq.sql_db.parallel``. The queries then run on other connections, so
+    they don't see writes in the caller's uncommitted transaction.
+
     :return: A generator with the results
     """
     db_names = get_db_aliases_for_partitioned_query()
@@ -46,20 +57,38 @@ def run_query_across_partitioned_databases(model_class, q_expression, values=Non
     if values and not isinstance(values, (list, tuple)):
         raise ValueError("Expected a list or tuple")
 
-    for db_name in db_names:
+    key = _get_sort_key(order_by, values) if order_by else None
+
+    def get_queryset(db_name):
         qs = model_class.objects.using(db_name)
         if annotate:
             qs = qs.annotate(**annotate)
 
         qs = qs.filter(q_expression)
+        if order_by:
+            qs = qs.order_by(*order_by)
         if values:
             if len(values) == 1:
                 qs = qs.values_list(*values, flat=True)
             else:
                 qs = qs.values_list(*values)
-
-        for result in qs:
-            yield result
+        return qs
+
+    max_workers = None if concurrent else 1
+    for result in iter_across_databases(get_queryset, db_names, key=key, max_workers=max_workers):
+        yield result
+
+
+def _get_sort_key(order_by, values):
+    if any(field.startswith('-') for field in order_by):
+        raise ValueError("Only ascending order is supported")
+    if not values:
+        return operator.attrgetter(*order_by)
+    if not set(order_by).issubset(values):
+        raise ValueError("order_by fields must be included in values")
+    if len(values) == 1:
+        return lambda value: value
+    return operator.itemgetter(*[values.index(field) for field in order_by])
 
 
 def split_list_by_db_partition(partition_values):
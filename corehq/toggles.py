@@ -657,6 +657,20 @@ LIVEQUERY_SYNC = StaticToggle(
     namespaces=[NAMESPACE_DOMAIN]
 )
 
+RESTORE_CASE_XML_CACHE = StaticToggle(
+    'restore_case_xml_cache',
+    'Cache serialized case blocks in restores so cases shared by many users are only rendered once',
+    TAG_INTERNAL,
+    namespaces=[NAMESPACE_DOMAIN]
+)
+
+LIVEQUERY_PIPELINED_RESTORE = StaticToggle(
+    'livequery_pipelined_restore',
+    'Fetch the next batch of cases while serializing the current one in livequery restores',
+    TAG_INTERNAL,
+    namespaces=[NAMESPACE_DOMAIN]
+)
+
 NO_VELLUM = StaticToggle(
     'no_vellum',
     'Allow disabling Form Builder per form '
@@ -0,0 +1,93 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from django.core.management.base import BaseCommand
+
+from corehq.util.quickcache import (
+    MEMORY_HIT,
+    MISS,
+    MISS_SECONDS,
+    SHARED_HIT,
+    VALUE_BYTES,
+    VALUE_SAMPLES,
+    get_shared_quickcache_stats,
+    reset_shared_quickcache_stats,
+)
+
+SORT_KEYS = {
+    'calls': lambda row: row['calls'],
+    'misses': lambda row: row['misses'],
+    'hit_rate': lambda row: row['hit_rate'],
+    'miss_ms': lambda row: row['miss_ms'],
+    'saved': lambda row: row['saved_seconds'],
+}
+
+
+class Command(BaseCommand):
+    """
+    Prints hit rates, miss latency and value sizes of quickcached functions,
+    aggregated over all processes since the stats were last reset.
+
+    Value bytes is the average size of the sampled values, see
+    ``VALUE_SIZE_SAMPLE_RATE``. Estimated time saved is the number of hits
+    multiplied by the average time the function took on a miss.
+
+    Example usages:
+    python manage.py quickcache_stats
+    python manage.py quickcache_stats --sort hit_rate --limit 20
+    python manage.py quickcache_stats --reset
+    """
+    help = "Show quickcache hit/miss statistics per function"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='saved')
+        parser.add_argument('--limit', type=int, default=None)
+        parser.add_argument('--reset', action='store_true', default=False,
+                            help="Clear the collected stats")
+
+    def handle(self, sort, limit, reset, **options):
+        if reset:
+            reset_shared_quickcache_stats()
+            print("quickcache stats reset")
+            return
+
+        rows = [_get_row(name, counts) for name, counts in get_shared_quickcache_stats().items()]
+        rows.sort(key=SORT_KEYS[sort], reverse=sort != 'hit_rate')
+        if limit:
+            rows = rows[:limit]
+        if not rows:
+            print('(no stats recorded)')
+            return
+
+        row_format = '{:<70} {:>10} {:>10} {:>10} {:>8} {:>10} {:>12} {:>10}'
+        print(row_format.format('function', 'memory', 'shared', 'misses', 'hit %',
+                                'miss ms', 'value bytes', 'saved s'))
+        for row in rows:
+            print(row_format.format(
+                row['name'], row['memory_hits'], row['shared_hits'], row['misses'],
+                '{:.1f}'.format(row['hit_rate'] * 100),
+                '{:.1f}'.format(row['miss_ms']),
+                int(row['value_bytes']),
+                int(row['saved_seconds']),
+            ))
+
+
+def _get_row(name, counts):
+    memory_hits = int(counts[MEMORY_HIT])
+    shared_hits = int(counts[SHARED_HIT])
+    misses = int(counts[MISS])
+    calls = memory_hits + shared_hits + misses
+    miss_seconds = counts[MISS_SECONDS] / misses if misses else 0
+    value_samples = counts[VALUE_SAMPLES]
+    return {
+        'name': name,
+        'memory_hits': memory_hits,
+        'shared_hits': shared_hits,
+        'misses': misses,
+        'calls': calls,
+        'hit_rate': (memory_hits + shared_hits) / calls if calls else 0,
+        'miss_ms': miss_seconds * 1000,
+        'value_bytes': counts[VALUE_BYTES] / value_samples if value_samples else 0,
+        'saved_seconds': (memory_hits + shared_hits) * miss_seconds,
+    }
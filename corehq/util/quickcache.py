@@ -1,14 +1,36 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+import logging
+import random
+import threading
+import time
 import warnings
 import hashlib
+from collections import Counter, defaultdict
+
+import redis
+from six.moves import cPickle as pickle
 from quickcache.django_quickcache import get_django_quickcache
-from quickcache import ForceSkipCache
+from quickcache import ForceSkipCache, QuickCacheHelper
 from celery._state import get_current_task
 from corehq.util.global_request import get_request
 
 from corehq.util.soft_assert import soft_assert
 
+logger = logging.getLogger(__name__)
+
+MEMORY_HIT = 'memory_hit'
+SHARED_HIT = 'shared_hit'
+MISS = 'miss'
+MISS_SECONDS = 'miss_seconds'
+VALUE_BYTES = 'value_bytes'
+VALUE_SAMPLES = 'value_samples'
+
+STATS_REDIS_KEY = 'quickcache-stats'
+STATS_FLUSH_INTERVAL = 60  # seconds
+# measuring a value means pickling it again, so only a sample of misses are measured
+VALUE_SIZE_SAMPLE_RATE = 0.05
+
 quickcache_soft_assert = soft_assert(
     notify_admins=True,
     fail_if_debug=False,
@@ -42,9 +64,156 @@ def get_session_key():
         raise ForceSkipCache("Not part of a session")
 
 
+class QuickCacheStats(object):
+    """
+    Per function counts of where quickcache values come from in this process
+
+    The counts are added to datadog and to a redis hash shared by all
+    processes every ``STATS_FLUSH_INTERVAL`` seconds. See the
+    ``quickcache_stats`` management command.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pending = defaultdict(Counter)  # function name -> Counter
+        self.last_flush = time.time()
+
+    def record(self, name, stat, value=1):
+        with self._lock:
+            self.pending[name][stat] += value
+        self._flush_if_due()
+
+    def record_miss(self, name, seconds, value_bytes=None):
+        """
+        :param value_bytes: pickled size of the value, or None if it wasn't sampled
+        """
+        # imported here to avoid a circular import through corehq.toggles
+        from corehq.util.datadog.gauges import datadog_histogram
+        with self._lock:
+            counts = self.pending[name]
+            counts[MISS] += 1
+            counts[MISS_SECONDS] += seconds
+            if value_bytes is not None:
+                counts[VALUE_BYTES] += value_bytes
+                counts[VALUE_SAMPLES] += 1
+        tags = ['function:{}'.format(name)]
+        datadog_histogram('commcare.quickcache.miss_duration', seconds * 1000, tags=tags)
+        if value_bytes is not None:
+            datadog_histogram('commcare.quickcache.value_size', value_bytes, tags=tags)
+        self._flush_if_due()
+
+    def _flush_if_due(self):
+        if time.time() - self.last_flush > STATS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        from corehq.util.datadog.gauges import datadog_counter
+        from dimagi.utils.couch.cache.cache_core import RedisClientError
+        with self._lock:
+            pending, self.pending = self.pending, defaultdict(Counter)
+            self.last_flush = time.time()
+        if not pending:
+            return
+
+        for name, counts in pending.items():
+            for stat in (MEMORY_HIT, SHARED_HIT, MISS):
+                if counts[stat]:
+                    datadog_counter('commcare.quickcache.calls', counts[stat], tags=[
+                        'function:{}'.format(name),
+                        'status:{}'.format(stat),
+                    ])
+
+        try:
+            client = _get_redis_client()
+            pipeline = client.pipeline()
+            for name, counts in pending.items():
+                for stat, value in counts.items():
+                    pipeline.hincrbyfloat(STATS_REDIS_KEY, '{}:{}'.format(name, stat), value)
+            pipeline.execute()
+        except (RedisClientError, redis.RedisError):
+            logger.exception("Unable to save quickcache stats")
+
+
+quickcache_stats = QuickCacheStats()
+
+
+def get_shared_quickcache_stats():
+    """
+    :returns: dict of function name -> {stat: value} for all processes
+    """
+    client = _get_redis_client()
+    stats = defaultdict(Counter)
+    for field, value in client.hgetall(STATS_REDIS_KEY).items():
+        if isinstance(field, bytes):
+            field = field.decode('utf-8')
+        name, stat = field.rsplit(':', 1)
+        stats[name][stat] = float(value)
+    return stats
+
+
+def reset_shared_quickcache_stats():
+    _get_redis_client().delete(STATS_REDIS_KEY)
+
+
+def _get_redis_client():
+    from dimagi.utils.couch.cache.cache_core import get_redis_client
+    return get_redis_client().client.get_client()
+
+
+class StatsQuickCacheHelper(QuickCacheHelper):
+    """
+    Records in ``quickcache_stats`` which cache tier each value came from,
+    and how long the function took on a miss. The size of the value is
+    recorded for ``VALUE_SIZE_SAMPLE_RATE`` of the misses.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super(StatsQuickCacheHelper, self).__init__(fn, *args, **kwargs)
+        self.stats_name = '{}.{}'.format(fn.__module__, fn.__name__)
+
+    def call(self, *args, **kwargs):
+        key = self.get_cache_key(*args, **kwargs)
+        content, stat = self._get_cached(key)
+        if content is not Ellipsis:
+            quickcache_stats.record(self.stats_name, stat)
+            return content
+
+        start = time.time()
+        content = self.fn(*args, **kwargs)
+        seconds = time.time() - start
+        self.cache.set(key, content)
+        if random.random() < VALUE_SIZE_SAMPLE_RATE:
+            quickcache_stats.record_miss(self.stats_name, seconds, _get_value_size(content))
+        else:
+            quickcache_stats.record_miss(self.stats_name, seconds)
+        return content
+
+    def _get_cached(self, key):
+        # same as TieredCache.get but also returns which tier the value came from
+        caches = getattr(self.cache, 'caches', [self.cache])
+        missed = []
+        for cache in caches:
+            content = cache.get(key, default=Ellipsis)
+            if content is not Ellipsis:
+                for missed_cache in missed:
+                    missed_cache.set(key, content)
+                # the last tier is the shared (redis) cache, the ones before it are local memory
+                return content, SHARED_HIT if cache is caches[-1] else MEMORY_HIT
+            missed.append(cache)
+        return Ellipsis, MISS
+
+
+def _get_value_size(value):
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
 quickcache = get_django_quickcache(timeout=5 * 60, memoize_timeout=10,
                                    assert_function=quickcache_soft_assert,
-                                   session_function=get_session_key)
+                                   session_function=get_session_key,
+                                   helper_class=StatsQuickCacheHelper)
 
 
 def skippable_quickcache(*args, **kwargs):
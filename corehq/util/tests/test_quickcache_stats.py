@@ -0,0 +1,76 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+from mock import patch
+from quickcache import get_quickcache
+from quickcache.cache_helpers import CacheWithPresets, TieredCache
+
+from corehq.util.quickcache import (
+    MEMORY_HIT,
+    MISS,
+    SHARED_HIT,
+    VALUE_BYTES,
+    VALUE_SAMPLES,
+    QuickCacheStats,
+    StatsQuickCacheHelper,
+)
+
+
+class QuickCacheStatsTest(SimpleTestCase):
+
+    def setUp(self):
+        self.memory = LocMemCache('quickcache-stats-memory', {})
+        self.shared = LocMemCache('quickcache-stats-shared', {})
+        self.stats = QuickCacheStats()
+        patcher = patch('corehq.util.quickcache.quickcache_stats', self.stats)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('corehq.util.quickcache.VALUE_SIZE_SAMPLE_RATE', 1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        quickcache = get_quickcache(
+            cache=TieredCache([CacheWithPresets(self.memory, 10), CacheWithPresets(self.shared, 60)]),
+            helper_class=StatsQuickCacheHelper,
+        )
+        self.calls = []
+
+        @quickcache(['value'])
+        def cached(value):
+            self.calls.append(value)
+            return value * 2
+
+        self.cached = cached
+
+    def _counts(self):
+        return self.stats.pending['{}.cached'.format(__name__)]
+
+    def test_tiers(self):
+        self.assertEqual(self.cached('a'), 'aa')
+        self.assertEqual(self.cached('a'), 'aa')
+        self.memory.clear()
+        self.assertEqual(self.cached('a'), 'aa')
+        self.assertEqual(self.cached('a'), 'aa')
+        self.assertEqual(self.calls, ['a'])
+        counts = self._counts()
+        self.assertEqual(counts[MISS], 1)
+        self.assertEqual(counts[MEMORY_HIT], 2)
+        self.assertEqual(counts[SHARED_HIT], 1)
+        self.assertGreater(counts[VALUE_BYTES], 0)
+        self.assertEqual(counts[VALUE_SAMPLES], 1)
+
+    def test_value_size_not_sampled(self):
+        with patch('corehq.util.quickcache.VALUE_SIZE_SAMPLE_RATE', 0):
+            self.cached('a')
+        counts = self._counts()
+        self.assertEqual(counts[MISS], 1)
+        self.assertEqual(counts[VALUE_SAMPLES], 0)
+        self.assertEqual(counts[VALUE_BYTES], 0)
+
+    def test_clear_recomputes(self):
+        self.cached('a')
+        self.cached.clear('a')
+        self.cached('a')
+        self.assertEqual(self.calls, ['a', 'a'])
+        self.assertEqual(self._counts()[MISS], 2)
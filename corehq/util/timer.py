@@ -116,6 +116,16 @@ class TimingContext(object):
     def peek(self):
         return self.stack[-1]
 
+    def add_timer(self, timer):
+        """Add a finished ``NestableTimer`` under the currently running timer
+
+        Used to merge timings that were collected on another thread, which
+        can't share this (non thread safe) context.
+        """
+        self.peek().append(timer)
+        for sub in timer.to_list(exclude_root=True):
+            sub.root = self.root
+
     def is_finished(self):
         return not self.stack
 
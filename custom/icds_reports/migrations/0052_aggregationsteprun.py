@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.13 on 2018-06-12 10:21
+from __future__ import unicode_literals
+
+from __future__ import absolute_import
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icds_reports', '0051_added_zscore_grading_wfh_hfa_rec_in_month_to_agg_child_health'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AggregationStepRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('step', models.TextField()),
+                ('state_id', models.TextField(blank=True)),
+                ('month', models.DateField()),
+                ('completed_at', models.DateTimeField()),
+                ('source_inserted_at', models.DateTimeField(null=True)),
+                ('source_row_count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'icds_aggregation_step_run',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='aggregationsteprun',
+            unique_together=set([('step', 'state_id', 'month')]),
+        ),
+    ]
@@ -26,6 +26,7 @@ from custom.icds_reports.models.views import (
 from custom.icds_reports.models.util import (
     UcrTableNameMapping,
     AggregateSQLProfile,
+    AggregationStepRun,
     ICDSAuditEntryRecord
 )
 from custom.icds_reports.models.helper import (
@@ -16,6 +16,22 @@ class AggregateSQLProfile(models.Model):
     duration = models.PositiveIntegerField()
 
 
+class AggregationStepRun(models.Model):
+    """Latest completion of an aggregation step for a partition, see utils/aggregation_dag.py"""
+    step = models.TextField()
+    # blank for steps that aggregate all states at once
+    state_id = models.TextField(blank=True)
+    month = models.DateField()
+    completed_at = models.DateTimeField()
+    source_inserted_at = models.DateTimeField(null=True)
+    source_row_count = models.BigIntegerField(default=0)
+
+    class Meta(object):
+        app_label = 'icds_reports'
+        db_table = 'icds_aggregation_step_run'
+        unique_together = ('step', 'state_id', 'month')
+
+
 class UcrTableNameMapping(models.Model):
     table_type = models.TextField(primary_key=True)
     table_name = models.TextField(blank=True, null=True)
@@ -27,7 +27,13 @@ from corehq.util.decorators import serial_task
 from corehq.util.log import send_HTML_email
 from corehq.util.soft_assert import soft_assert
 from corehq.util.view_utils import reverse
-from custom.icds_reports.const import DASHBOARD_DOMAIN
+from custom.icds_reports.const import (
+    AGG_CHILD_HEALTH_PNC_TABLE,
+    AGG_CHILD_HEALTH_THR_TABLE,
+    AGG_COMP_FEEDING_TABLE,
+    AGG_GROWTH_MONITORING_TABLE,
+    DASHBOARD_DOMAIN,
+)
 from custom.icds_reports.models import (
     AggChildHealthMonthly,
     AggregateComplementaryFeedingForms,
@@ -37,6 +43,14 @@ from custom.icds_reports.models import (
     UcrTableNameMapping)
 from custom.icds_reports.reports.issnip_monthly_register import ISSNIPMonthlyReport
 from custom.icds_reports.utils import zip_folder, create_pdf_file, icds_pre_release_features, track_time
+from custom.icds_reports.utils.aggregation_dag import (
+    AggregationDAG,
+    AggregationStep,
+    SourceWatermarks,
+    UcrSource,
+    get_step_runs,
+    record_step_completion,
+)
 from dimagi.utils.chunked import chunked
 from dimagi.utils.dates import force_to_date
 from dimagi.utils.logging import notify_exception
@@ -112,7 +126,12 @@ def run_move_ucr_data_into_aggregation_tables_task(date=None):
 
 
 @serial_task('move-ucr-data-into-aggregate-tables', timeout=30 * 60, queue='icds_aggregation_queue')
-def move_ucr_data_into_aggregation_tables(date=None, intervals=2):
+def move_ucr_data_into_aggregation_tables(date=None, intervals=2, force=False):
+    """
+    Aggregates the dashboard tables for the month of ``date`` and the
+    ``intervals - 1`` months before it. Only the partitions whose UCR data
+    changed since they were last aggregated are recomputed, unless ``force``.
+    """
     date = date or datetime.utcnow().date()
     monthly_dates = []
 
@@ -136,47 +155,31 @@ def move_ucr_data_into_aggregation_tables(date=None, intervals=2):
             _create_views(cursor)
             _update_aggregate_locations_tables(cursor)
 
+        state_ids = list(SQLLocation.objects
+                         .filter(domain=DASHBOARD_DOMAIN, location_type__name='state')
+                         .values_list('location_id', flat=True))
+        monthly_date_by_month = {force_to_date(day).replace(day=1): day for day in monthly_dates}
+        stages = AGGREGATION_DAG.get_stages(
+            state_ids,
+            list(monthly_date_by_month),
+            SourceWatermarks().get_watermark,
+            get_step_runs(list(monthly_date_by_month)),
+            force=force,
+        )
+        celery_task_logger.info("Aggregating {} partitions in {} stages".format(
+            sum(len(stage) for stage in stages), len(stages)
+        ))
+
         tasks = []
-        state_ids = (SQLLocation.objects
-                     .filter(domain=DASHBOARD_DOMAIN, location_type__name='state')
-                     .values_list('location_id', flat=True))
-
-        for monthly_date in monthly_dates:
-            calculation_date = monthly_date.strftime('%Y-%m-%d')
-            stage_1_tasks = [
-                icds_state_aggregation_task.si(state_id=state_id, date=monthly_date, func=_aggregate_gm_forms)
-                for state_id in state_ids
+        for stage in stages:
+            stage_tasks = [
+                icds_aggregation_step_task.si(
+                    partition=partition, date=monthly_date_by_month[partition.month], watermark=watermark
+                ) for partition, watermark in stage
             ]
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(state_id=state_id, date=monthly_date, func=_aggregate_cf_forms)
-                for state_id in state_ids
-            ])
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(state_id=state_id, date=monthly_date, func=_aggregate_thr_forms)
-                for state_id in state_ids
-            ])
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(
-                    state_id=state_id, date=monthly_date, func=_aggregate_child_health_pnc_forms
-                ) for state_id in state_ids
-            ])
-            stage_1_tasks.append(icds_aggregation_task.si(date=calculation_date, func=_update_months_table))
-            tasks.extend([
-                group(*stage_1_tasks),
-                group(
-                    icds_aggregation_task.si(date=calculation_date, func=_child_health_monthly_table),
-                    icds_aggregation_task.si(date=calculation_date, func=_ccs_record_monthly_table),
-                    icds_aggregation_task.si(date=calculation_date, func=_daily_attendance_table),
-                ),
-                group(
-                    icds_aggregation_task.si(date=calculation_date, func=_agg_child_health_table),
-                    icds_aggregation_task.si(date=calculation_date, func=_agg_ccs_record_table),
-                ),
-                group(
-                    icds_aggregation_task.si(date=calculation_date, func=_agg_awc_table),
-                    no_op_task_for_celery_bug.si(),
-                )
-            ])
+            if len(stage_tasks) == 1:
+                stage_tasks.append(no_op_task_for_celery_bug.si())
+            tasks.append(group(*stage_tasks))
 
         tasks.append(group(
             icds_aggregation_task.si(date=date.strftime('%Y-%m-%d'), func=aggregate_awc_daily),
@@ -282,29 +285,34 @@ def icds_aggregation_task(self, date, func):
 
 
 @task(queue='icds_aggregation_queue', bind=True, default_retry_delay=15 * 60, acks_late=True)
-def icds_state_aggregation_task(self, state_id, date, func):
+def icds_aggregation_step_task(self, partition, date, watermark):
     db_alias = get_icds_ucr_db_alias()
     if not db_alias:
         return
 
-    celery_task_logger.info("Starting icds reports {} {} {}".format(state_id, date, func.__name__))
+    step = AGGREGATION_DAG.get_step(partition.step)
+    celery_task_logger.info("Starting icds reports {} {} {}".format(partition.state_id, date, step.name))
 
     try:
-        func(state_id, date)
+        if step.per_state:
+            step.func(partition.state_id, date)
+        else:
+            step.func(date.strftime('%Y-%m-%d'))
     except Error as exc:
         _dashboard_team_soft_assert(
             False,
             "{} aggregation failed on {} for {} on {}. This task will be retried in 15 minutes".format(
-                func.__name__, settings.SERVER_ENVIRONMENT, state_id, date
+                step.name, settings.SERVER_ENVIRONMENT, partition.state_id or 'all states', date
             )
         )
         notify_exception(
             None, message="Error occurred during ICDS aggregation",
-            details={'func': func.__name__, 'date': date, 'state_id': state_id, 'error': exc}
+            details={'func': step.name, 'date': date, 'state_id': partition.state_id, 'error': exc}
         )
         self.retry(exc=exc)
 
-    celery_task_logger.info("Ended icds reports {} {} {}".format(state_id, date, func.__name__))
+    record_step_completion(partition, watermark)
+    celery_task_logger.info("Ended icds reports {} {} {}".format(partition.state_id, date, step.name))
 
 
 @track_time
@@ -395,6 +403,95 @@ def _agg_awc_table(day):
     ], day)
 
 
+AGGREGATION_DAG = AggregationDAG([
+    AggregationStep(
+        _aggregate_gm_forms,
+        inputs=[UcrSource('static-dashboard_growth_monitoring_forms', 'state_id', 'timeend')],
+        outputs=[AGG_GROWTH_MONITORING_TABLE],
+        per_state=True,
+        uses_previous_month=True,
+    ),
+    AggregationStep(
+        _aggregate_cf_forms,
+        inputs=[UcrSource('static-complementary_feeding_forms', 'state_id', 'timeend')],
+        outputs=[AGG_COMP_FEEDING_TABLE],
+        per_state=True,
+        uses_previous_month=True,
+    ),
+    AggregationStep(
+        _aggregate_thr_forms,
+        inputs=[UcrSource('static-dashboard_thr_forms', 'state_id', 'timeend')],
+        outputs=[AGG_CHILD_HEALTH_THR_TABLE],
+        per_state=True,
+    ),
+    AggregationStep(
+        _aggregate_child_health_pnc_forms,
+        inputs=[UcrSource('static-postnatal_care_forms', 'state_id', 'timeend')],
+        outputs=[AGG_CHILD_HEALTH_PNC_TABLE],
+        per_state=True,
+        uses_previous_month=True,
+    ),
+    AggregationStep(_update_months_table, outputs=['icds_months']),
+    AggregationStep(
+        _child_health_monthly_table,
+        inputs=[
+            'icds_months',
+            AGG_COMP_FEEDING_TABLE,
+            AGG_GROWTH_MONITORING_TABLE,
+            AGG_CHILD_HEALTH_PNC_TABLE,
+            AGG_CHILD_HEALTH_THR_TABLE,
+            UcrSource(CHILD_HEALTH_MONTHLY_UCR, 'state_id', 'month'),
+            UcrSource('static-child_health_cases', 'state_id', None),
+            UcrSource('static-child_tasks_cases', 'state_id', None),
+        ],
+        outputs=['child_health_monthly'],
+    ),
+    AggregationStep(
+        _ccs_record_monthly_table,
+        inputs=[
+            'icds_months',
+            UcrSource(CCS_RECORD_MONTHLY_UCR, 'state_id', 'month'),
+            UcrSource('static-pregnant-tasks_cases', 'state_id', None),
+        ],
+        outputs=['ccs_record_monthly'],
+    ),
+    AggregationStep(
+        _daily_attendance_table,
+        inputs=['icds_months', UcrSource('static-daily_feeding_forms', 'state_id', 'month')],
+        outputs=['daily_attendance'],
+    ),
+    AggregationStep(
+        _agg_child_health_table,
+        inputs=['child_health_monthly', UcrSource(CHILD_HEALTH_MONTHLY_UCR, 'state_id', 'month')],
+        outputs=['agg_child_health'],
+    ),
+    AggregationStep(
+        _agg_ccs_record_table,
+        inputs=['ccs_record_monthly', UcrSource(CCS_RECORD_MONTHLY_UCR, 'state_id', 'month')],
+        outputs=['agg_ccs_record'],
+    ),
+    AggregationStep(
+        _agg_awc_table,
+        inputs=[
+            'agg_child_health',
+            'agg_ccs_record',
+            'child_health_monthly',
+            'ccs_record_monthly',
+            UcrSource('static-daily_feeding_forms', 'state_id', 'month'),
+            UcrSource('static-awc_location', 'state_id', None),
+            UcrSource('static-usage_forms', None, None),
+            UcrSource('static-vhnd_form', 'state_id', None),
+            UcrSource('static-awc_mgt_forms', None, None),
+            UcrSource('static-infrastructure_form', 'state_id', None),
+            UcrSource('static-household_cases', 'state_id', None),
+            UcrSource('static-person_cases_v2', 'state_id', None),
+        ],
+        outputs=['agg_awc'],
+        uses_previous_month=True,
+    ),
+])
+
+
 @task(queue='icds_aggregation_queue')
 def email_dashboad_team(aggregation_date):
     # temporary soft assert to verify it's completing
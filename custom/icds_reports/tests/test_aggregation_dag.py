@@ -0,0 +1,140 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from datetime import date, datetime
+
+from django.test import SimpleTestCase
+
+from custom.icds_reports.models import AggregationStepRun
+from custom.icds_reports.utils.aggregation_dag import (
+    ALL_STATES,
+    AggregationDAG,
+    AggregationStep,
+    Partition,
+    UcrSource,
+    Watermark,
+)
+
+MAY = date(2017, 5, 1)
+JUNE = date(2017, 6, 1)
+STATE_IDS = ['st1', 'st2']
+
+
+def forms(state_id, day):
+    pass
+
+
+def monthly(day):
+    pass
+
+
+def agg(day):
+    pass
+
+
+def cases(day):
+    pass
+
+
+class AggregationDAGTest(SimpleTestCase):
+
+    def setUp(self):
+        self.dag = AggregationDAG([
+            AggregationStep(agg, inputs=['monthly_table'], outputs=['agg_table']),
+            AggregationStep(monthly, inputs=['forms_table'], outputs=['monthly_table']),
+            AggregationStep(
+                forms,
+                inputs=[UcrSource('static-forms', 'state_id', 'timeend')],
+                outputs=['forms_table'],
+                per_state=True,
+                uses_previous_month=True,
+            ),
+        ])
+        self.watermarks = {}
+
+    def _get_watermark(self, step, state_id, month):
+        if step.reads_whole_tables:
+            return None
+        return self.watermarks.get((step.name, state_id, month), Watermark(None, 0))
+
+    def _completed_runs(self, months, completed_at=datetime(2017, 6, 2)):
+        runs = {}
+        for stage in self.dag.get_stages(STATE_IDS, months, self._get_watermark, {}):
+            for partition, watermark in stage:
+                watermark = watermark or Watermark(None, 0)
+                runs[partition] = AggregationStepRun(
+                    step=partition.step,
+                    state_id=partition.state_id,
+                    month=partition.month,
+                    completed_at=completed_at,
+                    source_inserted_at=watermark.inserted_at,
+                    source_row_count=watermark.row_count,
+                )
+        return runs
+
+    def _get_partitions(self, runs, force=False):
+        stages = self.dag.get_stages(STATE_IDS, [MAY, JUNE], self._get_watermark, runs, force=force)
+        return [[partition for partition, watermark in stage] for stage in stages]
+
+    def test_steps_sorted_by_inputs(self):
+        self.assertEqual([step.name for step in self.dag.steps], ['forms', 'monthly', 'agg'])
+
+    def test_circular_inputs(self):
+        with self.assertRaises(ValueError):
+            AggregationDAG([
+                AggregationStep(monthly, inputs=['agg_table'], outputs=['monthly_table']),
+                AggregationStep(agg, inputs=['monthly_table'], outputs=['agg_table']),
+            ])
+
+    def test_nothing_run(self):
+        self.assertEqual(self._get_partitions({}), [
+            [Partition('forms', 'st1', MAY), Partition('forms', 'st2', MAY)],
+            [
+                Partition('forms', 'st1', JUNE),
+                Partition('forms', 'st2', JUNE),
+                Partition('monthly', ALL_STATES, MAY),
+            ],
+            [Partition('agg', ALL_STATES, MAY), Partition('monthly', ALL_STATES, JUNE)],
+            [Partition('agg', ALL_STATES, JUNE)],
+        ])
+
+    def test_up_to_date(self):
+        runs = self._completed_runs([MAY, JUNE])
+        self.assertEqual(self._get_partitions(runs), [])
+        self.assertEqual(len(sum(self._get_partitions(runs, force=True), [])), 8)
+
+    def test_source_changed(self):
+        runs = self._completed_runs([MAY, JUNE])
+        self.watermarks[('forms', 'st2', JUNE)] = Watermark(datetime(2017, 6, 3), 1)
+        self.assertEqual(self._get_partitions(runs), [
+            [Partition('forms', 'st2', JUNE)],
+            [Partition('monthly', ALL_STATES, JUNE)],
+            [Partition('agg', ALL_STATES, JUNE)],
+        ])
+
+    def test_previous_month_changed(self):
+        runs = self._completed_runs([MAY, JUNE])
+        self.watermarks[('forms', 'st1', MAY)] = Watermark(datetime(2017, 6, 3), 1)
+        self.assertEqual(self._get_partitions(runs), [
+            [Partition('forms', 'st1', MAY)],
+            [Partition('forms', 'st1', JUNE), Partition('monthly', ALL_STATES, MAY)],
+            [Partition('agg', ALL_STATES, MAY), Partition('monthly', ALL_STATES, JUNE)],
+            [Partition('agg', ALL_STATES, JUNE)],
+        ])
+
+    def test_whole_table_source_always_recomputed(self):
+        self.dag = AggregationDAG(self.dag.steps + [
+            AggregationStep(cases, inputs=['monthly_table', UcrSource('static-cases', 'state_id', None)]),
+        ])
+        runs = self._completed_runs([MAY, JUNE])
+        self.assertEqual(self._get_partitions(runs), [
+            [Partition('cases', ALL_STATES, MAY), Partition('cases', ALL_STATES, JUNE)],
+        ])
+
+    def test_resume_after_failure(self):
+        runs = self._completed_runs([MAY, JUNE])
+        # forms were recomputed for June but the run failed before reaching monthly
+        runs[Partition('forms', 'st1', JUNE)].completed_at = datetime(2017, 6, 3)
+        self.assertEqual(self._get_partitions(runs), [
+            [Partition('monthly', ALL_STATES, JUNE)],
+            [Partition('agg', ALL_STATES, JUNE)],
+        ])
@@ -0,0 +1,259 @@
+"""
+Dependency aware scheduling of the dashboard aggregation
+
+Each ``AggregationStep`` declares the tables it reads (``inputs``) and the
+tables it writes (``outputs``); a step depends on the steps that write its
+inputs. The remaining inputs are ``UcrSource``s. A step runs for a partition:
+one state and month for state level steps, or one month for steps that
+aggregate all states at once (``ALL_STATES``).
+
+Every completed partition is recorded in ``AggregationStepRun`` along with the
+watermark (latest ``inserted_at`` and number of rows) its UCR sources had when
+it was planned. A partition is only recomputed when that watermark changed,
+when a partition it reads is recomputed, or when a partition it reads was
+completed after it. Partitions are recorded as they complete, so running the
+aggregation again after a failure resumes from the partitions that didn't.
+
+Steps that read whole UCR tables (sources without a ``month_column``) are
+recomputed on every run: the watermark of a whole table is a full scan of it,
+and these tables change every day anyway.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from collections import defaultdict, namedtuple
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.db import connections
+
+from corehq.apps.userreports.util import get_table_name
+from corehq.sql_db.connections import get_icds_ucr_db_alias
+from custom.icds_reports.const import DASHBOARD_DOMAIN
+from custom.icds_reports.utils.aggregation import month_formatter, transform_day_to_month
+
+ALL_STATES = ''
+
+# state_column and month_column are None when the step reads the whole table
+UcrSource = namedtuple('UcrSource', ['data_source_id', 'state_column', 'month_column'])
+Partition = namedtuple('Partition', ['step', 'state_id', 'month'])
+Watermark = namedtuple('Watermark', ['inserted_at', 'row_count'])
+
+EMPTY_WATERMARK = Watermark(None, 0)
+
+
+class AggregationStep(object):
+    """
+    :param func: called with (state_id, day) for state level steps and with
+        (day) for the others
+    :param uses_previous_month: the step reads its own output for the
+        previous month
+    """
+
+    def __init__(self, func, inputs=(), outputs=(), per_state=False, uses_previous_month=False):
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.per_state = per_state
+        self.uses_previous_month = uses_previous_month
+
+    @property
+    def name(self):
+        return self.func.__name__
+
+    @property
+    def sources(self):
+        return [input_ for input_ in self.inputs if isinstance(input_, UcrSource)]
+
+    @property
+    def reads_whole_tables(self):
+        return any(source.month_column is None for source in self.sources)
+
+    def __repr__(self):
+        return 'AggregationStep({})'.format(self.name)
+
+
+class AggregationDAG(object):
+
+    def __init__(self, steps):
+        writers = {}
+        for step in steps:
+            for output in step.outputs:
+                if output in writers:
+                    raise ValueError("{} is written by {} and {}".format(output, writers[output].name, step.name))
+                writers[output] = step
+        self._upstream_steps = {
+            step.name: _unique(writers[input_] for input_ in step.inputs if input_ in writers)
+            for step in steps
+        }
+        self.steps = self._sort(steps)
+        self._steps_by_name = {step.name: step for step in steps}
+
+    def _sort(self, steps):
+        sorted_steps = []
+        remaining = list(steps)
+        while remaining:
+            ready = [
+                step for step in remaining
+                if all(upstream in sorted_steps for upstream in self._upstream_steps[step.name])
+            ]
+            if not ready:
+                raise ValueError("Aggregation steps have circular inputs: {}".format(remaining))
+            sorted_steps.extend(ready)
+            remaining = [step for step in remaining if step not in ready]
+        return sorted_steps
+
+    def get_step(self, name):
+        return self._steps_by_name[name]
+
+    def get_upstream_partitions(self, partition, state_ids):
+        step = self.get_step(partition.step)
+        for upstream_step in self._upstream_steps[step.name]:
+            if not upstream_step.per_state:
+                yield Partition(upstream_step.name, ALL_STATES, partition.month)
+            elif step.per_state:
+                yield Partition(upstream_step.name, partition.state_id, partition.month)
+            else:
+                for state_id in state_ids:
+                    yield Partition(upstream_step.name, state_id, partition.month)
+        if step.uses_previous_month:
+            yield Partition(step.name, partition.state_id, partition.month - relativedelta(months=1))
+
+    def get_stages(self, state_ids, months, get_watermark, runs, force=False):
+        """
+        :param months: first days of the months to aggregate
+        :param get_watermark: function of (step, state_id, month) returning
+            the current ``Watermark`` of the step's sources, or None if the
+            step must always be recomputed
+        :param runs: dict of ``Partition`` -> ``AggregationStepRun``
+        :param force: recompute all partitions
+        :returns: list of stages, each a list of (``Partition``, ``Watermark``)
+            that only read partitions from earlier stages
+        """
+        stage_by_partition = {}
+        watermarks = {}
+        for month in sorted(months):
+            for step in self.steps:
+                for state_id in (state_ids if step.per_state else [ALL_STATES]):
+                    partition = Partition(step.name, state_id, month)
+                    watermark = get_watermark(step, state_id, month)
+                    upstream = list(self.get_upstream_partitions(partition, state_ids))
+                    upstream_stages = [stage_by_partition[p] for p in upstream if p in stage_by_partition]
+                    if force or upstream_stages or _is_stale(runs.get(partition), watermark, upstream, runs):
+                        stage_by_partition[partition] = max(upstream_stages) + 1 if upstream_stages else 0
+                        watermarks[partition] = watermark
+
+        stages = defaultdict(list)
+        for partition, stage in stage_by_partition.items():
+            stages[stage].append((partition, watermarks[partition]))
+        return [sorted(stages[stage]) for stage in sorted(stages)]
+
+
+def _is_stale(run, watermark, upstream, runs):
+    if run is None or watermark is None:
+        return True
+    if Watermark(run.source_inserted_at, run.source_row_count) != watermark:
+        return True
+    return any(p in runs and runs[p].completed_at > run.completed_at for p in upstream)
+
+
+def _unique(items):
+    unique = []
+    for item in items:
+        if item not in unique:
+            unique.append(item)
+    return unique
+
+
+def get_step_runs(months):
+    """
+    :returns: dict of ``Partition`` -> ``AggregationStepRun`` for the months
+        and the month before them
+    """
+    from custom.icds_reports.models import AggregationStepRun
+
+    months = set(months) | {month - relativedelta(months=1) for month in months}
+    return {
+        Partition(run.step, run.state_id, run.month): run
+        for run in AggregationStepRun.objects.filter(month__in=months)
+    }
+
+
+def record_step_completion(partition, watermark):
+    from custom.icds_reports.models import AggregationStepRun
+
+    watermark = watermark or EMPTY_WATERMARK
+    AggregationStepRun.objects.update_or_create(
+        step=partition.step,
+        state_id=partition.state_id,
+        month=partition.month,
+        defaults={
+            'completed_at': datetime.utcnow(),
+            'source_inserted_at': watermark.inserted_at,
+            'source_row_count': watermark.row_count,
+        }
+    )
+
+
+class SourceWatermarks(object):
+    """Reads the watermarks of UCR sources, once per source and month"""
+
+    def __init__(self):
+        self._watermarks = {}
+
+    def get_watermark(self, step, state_id, month):
+        if step.reads_whole_tables:
+            return None
+        watermarks = []
+        for source in step.sources:
+            watermarks_by_state = self._get_source_watermarks(source, month)
+            if step.per_state and source.state_column:
+                watermarks.append(watermarks_by_state.get(state_id, EMPTY_WATERMARK))
+            else:
+                watermarks.extend(watermarks_by_state.values())
+        return combine_watermarks(watermarks)
+
+    def _get_source_watermarks(self, source, month):
+        key = (source, month)
+        if key not in self._watermarks:
+            self._watermarks[key] = _query_source_watermarks(source, month)
+        return self._watermarks[key]
+
+
+def combine_watermarks(watermarks):
+    inserted_ats = [watermark.inserted_at for watermark in watermarks if watermark.inserted_at]
+    return Watermark(
+        max(inserted_ats) if inserted_ats else None,
+        sum(watermark.row_count for watermark in watermarks),
+    )
+
+
+def _query_source_watermarks(source, month):
+    """
+    :returns: dict of state_id -> ``Watermark`` of the source's rows for the
+        month, with all rows under ``ALL_STATES`` if the source has no state column
+    """
+    columns = ['MAX(inserted_at)', 'COUNT(*)']
+    if source.state_column:
+        columns.insert(0, '"{}"'.format(source.state_column))
+    query = (
+        'SELECT {columns} FROM "{tablename}" '
+        'WHERE "{month_column}" >= %(month_start)s AND "{month_column}" < %(next_month_start)s'
+    ).format(
+        columns=', '.join(columns),
+        tablename=get_table_name(DASHBOARD_DOMAIN, source.data_source_id),
+        month_column=source.month_column,
+    )
+    month = transform_day_to_month(month)
+    params = {
+        'month_start': month_formatter(month),
+        'next_month_start': month_formatter(month + relativedelta(months=1)),
+    }
+    if source.state_column:
+        query += ' GROUP BY "{}"'.format(source.state_column)
+
+    with connections[get_icds_ucr_db_alias()].cursor() as cursor:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+    if source.state_column:
+        return {state_id: Watermark(inserted_at, count) for state_id, inserted_at, count in rows}
+    return {ALL_STATES: Watermark(rows[0][0], rows[0][1])}
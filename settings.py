@@ -502,6 +502,10 @@ ICDS_ENVS = ('icds', 'icds-new')
 # minimum minutes between updates to user reporting metadata
 USER_REPORTING_METADATA_UPDATE_FREQUENCY = 15
 
+# buffer user reporting metadata updates in redis and save them to users in periodic batches
+# (see corehq.apps.users.reporting_metadata)
+USER_REPORTING_METADATA_BATCH_ENABLED = False
+
 BASE_ADDRESS = 'localhost:8000'
 J2ME_ADDRESS = ''
 
@@ -547,6 +551,15 @@ RESTORE_PAYLOAD_DIR_NAME = None
 SHARED_TEMP_DIR_NAME = None
 SHARED_BLOB_DIR_NAME = 'blobdb'
 
+# Optional read-through cache of blob content on local disk. Example:
+# BLOB_DB_LOCAL_CACHE = {
+#     "path": "/tmp",  # cache directory is created inside this directory
+#     "max_size": 2 * 1024 ** 3,  # bytes
+#     "max_item_size": 10 * 1024 ** 2,  # bytes, larger blobs are not cached
+#     "timeout": 60 * 60,  # seconds a cached blob is served for
+# }
+BLOB_DB_LOCAL_CACHE = None
+
 ## django-transfer settings
 # These settings must match the apache / nginx config
 TRANSFER_SERVER = None  # 'apache' or 'nginx'
@@ -813,9 +826,21 @@ PL_PROXY_CLUSTER_NAME = 'commcarehq'
 
 USE_PARTITIONED_DATABASE = False
 
+# Maximum number of form processing databases that a concurrent query across
+# all of them runs against at the same time. 1 queries them one after another.
+PARTITIONED_QUERY_WORKERS = 8
+
+# Remember forms that were submitted again for an hour in redis, and process
+# further resubmissions of them without taking the form lock
+SKIP_FORM_LOCK_FOR_RECENT_DUPLICATES = False
+
 # number of days since last access after which a saved export is considered unused
 SAVED_EXPORT_ACCESS_CUTOFF = 35
 
+# Fraction of form submissions whose per stage timings are sent to datadog and kept
+# for the submission_timing_report command. See corehq.apps.receiverwrapper.timing
+SUBMISSION_TIMING_SAMPLE_RATE = 0.01
+
 # override for production
 DEFAULT_PROTOCOL = 'http'
 
@@ -4,7 +4,7 @@ from __future__ import unicode_literals
 import uuid
 
 from django.test import TestCase, override_settings
-from mock import MagicMock, patch
+from mock import MagicMock, call, patch
 
 from corehq.apps.case_search.const import SPECIAL_CASE_PROPERTIES_MAP
 from corehq.apps.case_search.exceptions import CaseSearchNotEnabledException
@@ -139,6 +139,37 @@ class CaseSearchPillowTest(TestCase):
 
         self._assert_case_in_es(self.domain, case)
 
+    @patch('corehq.pillows.case_search.CASE_SEARCH_CLEAR_INTERVAL', 0)
+    def test_search_results_cache_cleared(self):
+        case = self._make_case()
+        processor = self.pillow.processors[0]
+        with patch('corehq.pillows.case_search.domain_needs_search_index', new=MagicMock(return_value=True)), \
+                patch('corehq.pillows.case_search.clear_case_search_results_cache') as clear_cache:
+            processor.process_change(self.pillow, doc_to_change(case.to_json()))
+            self.assertEqual(clear_cache.call_args_list, [call(self.domain, case.type)])
+
+            clear_cache.reset_mock()
+            case_json = case.to_json()
+            case_json['type'] = 'new-type'
+            processor.process_change(self.pillow, doc_to_change(case_json))
+            self.assertEqual(clear_cache.call_args_list, [call(self.domain, 'new-type')])
+
+            clear_cache.reset_mock()
+            change = doc_to_change(case_json)
+            change.document = None
+            change.deleted = True
+            processor.process_change(self.pillow, change)
+            self.assertEqual(clear_cache.call_args_list, [call(self.domain, 'new-type')])
+
+    def test_search_results_cache_cleared_at_most_every_interval(self):
+        case = self._make_case()
+        processor = self.pillow.processors[0]
+        with patch('corehq.pillows.case_search.domain_needs_search_index', new=MagicMock(return_value=True)), \
+                patch('corehq.pillows.case_search.clear_case_search_results_cache') as clear_cache:
+            processor.process_change(self.pillow, doc_to_change(case.to_json()))
+            processor.process_change(self.pillow, doc_to_change(case.to_json()))
+            self.assertEqual(clear_cache.call_args_list, [call(self.domain, case.type)])
+
     def _get_kafka_seq(self):
         # KafkaChangeFeed listens for multiple topics (case, case-sql) in the case search pillow,
         # so we need to provide a dict of seqs to kafka
@@ -56,6 +56,10 @@ if "SKIP_TESTS_REQUIRING_EXTRA_SETUP" not in globals():
     SKIP_TESTS_REQUIRING_EXTRA_SETUP = False
 
 CELERY_ALWAYS_EAGER = True
+
+# test data is written in a transaction that other threads' connections can't see
+PARTITIONED_QUERY_WORKERS = 1
+
 # keep a copy of the original PILLOWTOPS setting around in case other tests want it.
 _PILLOWTOPS = PILLOWTOPS
 PILLOWTOPS = {}